@@ -1,14 +1,53 @@
 import streamlit as st
-import sqlite3
 import pandas as pd
 import matplotlib.pyplot as plt
+import inspect
 import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from base_datos import version_db
+from ligas import cargar_ligas, LIGA_PRINCIPAL
+import consultas
+import descargas
+import perfilador
+from consultas import (
+    obtener_tarjetas_por_jugador,
+    obtener_tarjetas_por_rival_equipo,
+    obtener_evolucion_equipo,
+    obtener_estadisticas_arbitro_equipo,
+    obtener_goles_por_jugador,
+    obtener_goleadores_por_equipo,
+    obtener_rendimiento_equipo,
+    obtener_estadisticas_rendimiento,
+    obtener_jugadores_mas_amonestados,
+    obtener_jugadores_mas_expulsados,
+    obtener_tabla_historica_acumulada,
+    obtener_estadisticas_versus,
+    obtener_evolucion_goles_equipo,
+    obtener_evolucion_puntos_equipo,
+    obtener_evolucion_equipos,
+    armar_campania,
+    armar_historial_versus,
+)
+from records import MotorRecords
+from forma import MotorForma
+from elo import MotorElo
+from simulacion import proyectar_campeonato
+from precalentador import Precalentador, ruta_accesos
+from cache_disco import CacheDisco
+from en_vivo import TablaEnVivo
+import zonas
+import campeonatos
+from carreras import AlmacenCarreras
+from busqueda import IndiceBusqueda, TIPOS as ICONOS_BUSQUEDA
+from vigilante import VigilanteDB, INTERVALO as INTERVALO_VIGILANCIA
 
 # =====================================
 # CONFIGURACIÓN INICIAL
 # =====================================
-DB = "football_nueva.db"
 
 st.set_page_config(
     page_title="🏆 SEstadísticas de la Liga Deportiva del Sur",
@@ -16,6 +55,24 @@ st.set_page_config(
     layout="wide"
 )
 
+# =====================================
+# PERFILADO DE LA CORRIDA (OPCIONAL)
+# =====================================
+# LDDS_PERFIL=<fracción> muestrea esa parte de las corridas; ?perfil=1 muestrea esta y la muestra al pie.
+# Si la corrida no llega al final (st.stop, st.rerun, una excepción) el muestreo se corta solo y no se guarda.
+perfil_pedido = st.query_params.get("perfil") == "1"
+muestreo = perfilador.iniciar(__file__, forzar=perfil_pedido)
+
+# =====================================
+# LIGA ACTIVA
+# =====================================
+LIGAS, LIGAS_FALTANTES = cargar_ligas()
+# El selector está en el sidebar; su valor ya está en session_state al empezar la corrida
+if st.session_state.get("sidebar_liga") not in LIGAS:
+    st.session_state["sidebar_liga"] = LIGA_PRINCIPAL
+DB = LIGAS[st.session_state["sidebar_liga"]]
+consultas.usar_base(DB)
+
 # =====================================
 # VERIFICAR BASE DE DATOS
 # =====================================
@@ -30,861 +87,299 @@ if not os.path.exists(DB):
     st.stop()
 
 # =====================================
-# FUNCIONES AUXILIARES
+# PRESUPUESTO Y CANCELACIÓN DE CONSULTAS
 # =====================================
-def parse_fecha(fecha_str):
-    """Convierte fecha de 'dd/mm/yyyy' a datetime para ordenar correctamente."""
+def rerun_pendiente(ctx):
+    """True si la sesión ya pidió un rerun más nuevo (o se cerró): esta corrida se va a descartar."""
+    estado = getattr(getattr(ctx, "script_requests", None), "_state", None)
+    return getattr(estado, "name", "CONTINUE") != "CONTINUE"
+
+# Cada corrida del script arranca una ejecución nueva y cancela las consultas que la anterior
+# de esta misma sesión haya dejado en curso; las de esta se cortan si llega un rerun más nuevo.
+_ctx = get_script_run_ctx()
+st.session_state["_ejecucion_consultas"] = consultas.iniciar_ejecucion(
+    st.session_state.get("_ejecucion_consultas"),
+    superada=(lambda: rerun_pendiente(_ctx)) if _ctx else None,
+)
+
+@contextmanager
+def consultas_protegidas():
+    """Si una consulta del bloque se cancela (presupuesto agotado o rerun más nuevo),
+    muestra el aviso en lugar de un error y sigue con el resto de la página."""
     try:
-        return pd.to_datetime(fecha_str, format='%d/%m/%Y')
-    except:
-        return pd.NaT
-        
-def formatear_goleador(nombre, goles):
-    """Formatea nombre: inicial del primer nombre + apellido, con (n) si hizo más de 1 gol.
-    Maneja formato: 'Apellido, Nombre' → 'C. Apellido'"""
-    if not nombre or pd.isna(nombre):
-        return "-"
-    
-    nombre = nombre.strip()
-    
-    # Si el nombre tiene formato "Apellido, Nombre"
-    if ',' in nombre:
-        partes = nombre.split(',', 1)
-        apellido = partes[0].strip()
-        nombre_parte = partes[1].strip()
-        
-        # Obtener inicial del primer nombre
-        nombres = nombre_parte.split()
-        if nombres:
-            inicial = nombres[0][0].upper()
-            resultado = f"{inicial}. {apellido}"
-        else:
-            resultado = apellido
-    else:
-        # Formato normal "Nombre Apellido"
-        partes = nombre.split()
-        if len(partes) >= 2:
-            inicial_nombre = partes[0][0].upper()
-            apellido = " ".join(partes[1:])
-            resultado = f"{inicial_nombre}. {apellido}"
-        else:
-            resultado = nombre
-    
-    # Agregar cantidad de goles si es más de 1
-    if goles > 1:
-        resultado += f" ({goles})"
-    
-    return resultado
+        yield
+    except consultas.ConsultaCancelada as e:
+        st.info(f"⏹️ Consulta cancelada: {e}.")
 
 # =====================================
-# FUNCIONES DE BASE DE DATOS
+# FUNCIONES DE BASE DE DATOS (CACHEADAS)
 # =====================================
+# La base de la liga es parte de la clave: cada liga tiene sus propias listas
 @st.cache_data(ttl=300)
-def obtener_valores_unicos(columna, tabla="partidos"):
-    try:
-        conn = sqlite3.connect(DB)
-        cur = conn.cursor()
-        cur.execute(f"""
-            SELECT DISTINCT {columna}
-            FROM {tabla}
-            WHERE {columna} IS NOT NULL AND TRIM({columna}) <> ''
-            ORDER BY {columna}
-        """)
-        valores = [r[0] for r in cur.fetchall()]
-        conn.close()
-        return valores
-    except:
-        return []
+def _valores_unicos(db, columna):
+    with consultas.en_base(db):
+        return consultas.obtener_valores_unicos(columna)
 
 @st.cache_data(ttl=300)
-def obtener_equipos():
-    try:
-        conn = sqlite3.connect(DB)
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT DISTINCT equipo FROM (
-                SELECT equipo_local AS equipo FROM partidos
-                UNION
-                SELECT equipo_visitante FROM partidos
-            ) WHERE equipo IS NOT NULL AND equipo <> ''
-            ORDER BY equipo
-        """)
-        equipos = [r[0] for r in cur.fetchall()]
-        conn.close()
-        return equipos if equipos else []
-    except:
-        return []
+def _equipos(db):
+    with consultas.en_base(db):
+        return consultas.obtener_equipos()
 
 @st.cache_data(ttl=300)
+def _jugadores(db):
+    with consultas.en_base(db):
+        return consultas.obtener_jugadores()
+
+def obtener_valores_unicos(columna):
+    return _valores_unicos(DB, columna)
+
+def obtener_equipos():
+    return _equipos(DB)
+
 def obtener_jugadores():
-    try:
-        conn = sqlite3.connect(DB)
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT DISTINCT jugador FROM tarjetas
-            WHERE jugador IS NOT NULL AND TRIM(jugador) <> ''
-            ORDER BY jugador
-        """)
-        jugadores = [r[0] for r in cur.fetchall()]
-        conn.close()
-        return jugadores if jugadores else []
-    except:
-        return []
-
-def obtener_tarjetas_por_jugador(anio=None, campeonato=None, equipo=None, solo_expulsados=False):
-    query = """
-        SELECT
-            t.jugador,
-            CASE
-                WHEN t.equipo = 'Local' THEN p.equipo_local
-                WHEN t.equipo = 'Visitante' THEN p.equipo_visitante
-            END AS equipo_jugador,
-            SUM(CASE WHEN t.tipo = 'Amonestado' THEN 1 ELSE 0 END) AS amon,
-            SUM(CASE WHEN t.tipo = 'Expulsado' THEN 1 ELSE 0 END) AS exp
-        FROM partidos p
-        INNER JOIN tarjetas t ON t.partido_id = p.id
-        WHERE p.arbitro IS NOT NULL AND p.arbitro <> ''
-          AND t.jugador IS NOT NULL AND TRIM(t.jugador) <> ''
-    """
-    params = []
-    if anio:
-        query += " AND SUBSTR(p.fecha, 7, 4) = ?"
-        params.append(anio)
-    if campeonato:
-        query += " AND p.campeonato = ?"
-        params.append(campeonato)
-    if equipo:
-        query += " AND (p.equipo_local = ? OR p.equipo_visitante = ?)"
-        params.extend([equipo, equipo])
-    if solo_expulsados:
-        query += " AND t.tipo = 'Expulsado'"
-    query += """
-        GROUP BY t.jugador, equipo_jugador
-        HAVING (amon + exp) > 0
-        ORDER BY (amon + exp) DESC, t.jugador
-    """
-    conn = sqlite3.connect(DB)
-    df = pd.read_sql_query(query, conn, params=params)
-    conn.close()
-    return df
-
-# NUEVA FUNCIÓN: Tarjetas por equipo (no por jugador)
-def obtener_tarjetas_por_equipo(anio=None, campeonato=None, equipo=None, solo_expulsados=False):
-    """Obtiene tarjetas agrupadas por equipo (no por jugador)."""
-    query = """
-        SELECT
-            CASE
-                WHEN t.equipo = 'Local' THEN p.equipo_local
-                WHEN t.equipo = 'Visitante' THEN p.equipo_visitante
-            END AS equipo,
-            SUM(CASE WHEN t.tipo = 'Amonestado' THEN 1 ELSE 0 END) AS amon,
-            SUM(CASE WHEN t.tipo = 'Expulsado' THEN 1 ELSE 0 END) AS exp
-        FROM partidos p
-        INNER JOIN tarjetas t ON t.partido_id = p.id
-        WHERE p.arbitro IS NOT NULL AND p.arbitro <> ''
-    """
-    params = []
-    if anio:
-        query += " AND SUBSTR(p.fecha, 7, 4) = ?"
-        params.append(anio)
-    if campeonato:
-        query += " AND p.campeonato = ?"
-        params.append(campeonato)
-    if equipo:
-        query += " AND (p.equipo_local = ? OR p.equipo_visitante = ?)"
-        params.extend([equipo, equipo])
-    if solo_expulsados:
-        query += " AND t.tipo = 'Expulsado'"
-    
-    query += """
-        GROUP BY equipo
-        HAVING (amon + exp) > 0
-        ORDER BY (amon + exp) DESC, equipo
-    """
-    
-    conn = sqlite3.connect(DB)
-    df = pd.read_sql_query(query, conn, params=params)
-    conn.close()
-    return df
-
-def obtener_tarjetas_por_rival_equipo(equipo):
-    """Obtiene tarjetas recibidas por un equipo contra cada rival."""
-    query = """
-        SELECT
-            CASE
-                WHEN (p.equipo_local = ? AND t.equipo = 'Local') THEN p.equipo_visitante
-                WHEN (p.equipo_visitante = ? AND t.equipo = 'Visitante') THEN p.equipo_local
-            END AS rival,
-            SUM(CASE WHEN t.tipo = 'Amonestado' THEN 1 ELSE 0 END) AS amon,
-            SUM(CASE WHEN t.tipo = 'Expulsado' THEN 1 ELSE 0 END) AS exp
-        FROM partidos p
-        INNER JOIN tarjetas t ON t.partido_id = p.id
-        WHERE p.arbitro IS NOT NULL AND p.arbitro <> ''
-        AND (
-            (p.equipo_local = ? AND t.equipo = 'Local')
-            OR
-            (p.equipo_visitante = ? AND t.equipo = 'Visitante')
-        )
-        GROUP BY rival
-        ORDER BY (amon + exp) DESC
-    """
-    
-    conn = sqlite3.connect(DB)
-    df = pd.read_sql_query(query, conn, params=(equipo, equipo, equipo, equipo))
-    conn.close()
-    return df
-
-def obtener_evolucion_equipo(equipo):
-    query = """
-        SELECT
-            SUBSTR(p.fecha, 7, 4) AS anio,
-            SUM(CASE WHEN t.tipo = 'Amonestado' THEN 1 ELSE 0 END) AS amon,
-            SUM(CASE WHEN t.tipo = 'Expulsado' THEN 1 ELSE 0 END) AS exp
-        FROM partidos p
-        JOIN tarjetas t ON t.partido_id = p.id
-        WHERE (p.equipo_local = ? AND t.equipo = 'Local')
-           OR (p.equipo_visitante = ? AND t.equipo = 'Visitante')
-        GROUP BY anio
-        ORDER BY anio
-    """
-    conn = sqlite3.connect(DB)
-    df = pd.read_sql_query(query, conn, params=(equipo, equipo))
-    conn.close()
-    return df
-
-def obtener_estadisticas_arbitro_equipo(arbitro, equipo, anio=None, campeonato=None):
-    query = """
-        SELECT
-            COUNT(DISTINCT p.id) AS partidos,
-            SUM(CASE WHEN t.tipo = 'Amonestado' THEN 1 ELSE 0 END) AS amonestados,
-            SUM(CASE WHEN t.tipo = 'Expulsado' THEN 1 ELSE 0 END) AS expulsados
-        FROM partidos p
-        LEFT JOIN tarjetas t ON t.partido_id = p.id
-        WHERE p.arbitro = ?
-        AND (p.equipo_local = ? OR p.equipo_visitante = ?)
-    """
-    params = [arbitro, equipo, equipo]
-    if anio:
-        query += " AND SUBSTR(p.fecha,7,4) = ?"
-        params.append(anio)
-    if campeonato:
-        query += " AND p.campeonato = ?"
-        params.append(campeonato)
-    conn = sqlite3.connect(DB)
-    cur = conn.cursor()
-    cur.execute(query, params)
-    resultado = cur.fetchone()
-    conn.close()
-    return {
-        "partidos": resultado[0] or 0,
-        "amonestados": resultado[1] or 0,
-        "expulsados": resultado[2] or 0
-    }
+    return _jugadores(DB)
 
-def obtener_resumen_equipo(equipo):
-    query = """
-        SELECT
-            SUM(CASE WHEN t.tipo = 'Amonestado' THEN 1 ELSE 0 END) AS amon,
-            SUM(CASE WHEN t.tipo = 'Expulsado' THEN 1 ELSE 0 END) AS exp
-        FROM partidos p
-        JOIN tarjetas t ON t.partido_id = p.id
-        WHERE p.arbitro IS NOT NULL
-          AND p.arbitro <> ''
-          AND (p.equipo_local = ? OR p.equipo_visitante = ?)
-    """
-    conn = sqlite3.connect(DB)
-    cur = conn.cursor()
-    cur.execute(query, (equipo, equipo))
-    amon, exp = cur.fetchone()
-    conn.close()
-    return {
-        "amonestaciones": amon or 0,
-        "expulsiones": exp or 0,
-        "total": (amon or 0) + (exp or 0)
-    }
+@st.cache_resource
+def obtener_vigilante(db):
+    """Vigilante de cambios en la base de una liga, compartido por todas las sesiones del proceso.
+    Ante un cambio vacía las listas de opciones (equipos, campeonatos, jugadores) sin esperar el ttl."""
+    vigilante = VigilanteDB(db)
+    vigilante.suscribir(lambda ids, equipos: (
+        _valores_unicos.clear(), _equipos.clear(), _jugadores.clear()
+    ))
+    return vigilante.iniciar()
 
-def obtener_goles_por_jugador(anio=None, campeonato=None, equipo=None):
-    """Obtiene goles por jugador, sin importar para qué equipo jugó."""
-    query = """
-        SELECT
-            g.jugador,
-            COUNT(*) AS goles
-        FROM partidos p
-        INNER JOIN goles g ON g.partido_id = p.id
-        WHERE g.jugador IS NOT NULL AND TRIM(g.jugador) <> ''
-    """
-    params = []
-    if anio:
-        query += " AND SUBSTR(p.fecha, 7, 4) = ?"
-        params.append(anio)
-    if campeonato:
-        query += " AND p.campeonato = ?"
-        params.append(campeonato)
-    if equipo:
-        query += " AND (p.equipo_local = ? OR p.equipo_visitante = ?)"
-        params.extend([equipo, equipo])
-    
-    query += """
-        GROUP BY g.jugador
-        HAVING goles > 0
-        ORDER BY goles DESC, g.jugador
-    """
-    
-    conn = sqlite3.connect(DB)
-    df = pd.read_sql_query(query, conn, params=params)
-    conn.close()
-    return df
-
-def obtener_goleadores_por_equipo(equipo):
-    query = """
-        SELECT
-            g.jugador,
-            COUNT(*) AS goles
-        FROM partidos p
-        INNER JOIN goles g ON g.partido_id = p.id
-        WHERE g.jugador IS NOT NULL AND TRIM(g.jugador) <> ''
-        AND (
-            (p.equipo_local = ? AND g.equipo = 'Local')
-            OR 
-            (p.equipo_visitante = ? AND g.equipo = 'Visitante')
-        )
-        GROUP BY g.jugador
-        ORDER BY goles DESC
-    """
-    conn = sqlite3.connect(DB)
-    df = pd.read_sql_query(query, conn, params=(equipo, equipo))
-    conn.close()
-    return df
-
-def obtener_top_goleadores(limite=20):
-    query = """
-        SELECT
-            g.jugador,
-            CASE
-                WHEN g.equipo = 'Local' THEN p.equipo_local
-                WHEN g.equipo = 'Visitante' THEN p.equipo_visitante
-            END AS equipo,
-            COUNT(*) AS goles
-        FROM partidos p
-        INNER JOIN goles g ON g.partido_id = p.id
-        WHERE g.jugador IS NOT NULL AND TRIM(g.jugador) <> ''
-        GROUP BY g.jugador, equipo
-        ORDER BY goles DESC
-        LIMIT ?
-    """
-    conn = sqlite3.connect(DB)
-    df = pd.read_sql_query(query, conn, params=(limite,))
-    conn.close()
-    return df
-
-def obtener_rendimiento_equipo(equipo, anio=None, campeonato=None):
-    query = """
-        SELECT
-            p.fecha,
-            p.campeonato,
-            p.equipo_local,
-            p.equipo_visitante,
-            p.goles_local,
-            p.goles_visitante,
-            CASE
-                WHEN p.equipo_local = ? AND p.goles_local > p.goles_visitante THEN 'Ganado'
-                WHEN p.equipo_visitante = ? AND p.goles_visitante > p.goles_local THEN 'Ganado'
-                WHEN p.goles_local = p.goles_visitante THEN 'Empatado'
-                ELSE 'Perdido'
-            END AS resultado
-        FROM partidos p
-        WHERE (p.equipo_local = ? OR p.equipo_visitante = ?)
-    """
-    params = [equipo, equipo, equipo, equipo]
-    if anio:
-        query += " AND SUBSTR(p.fecha, 7, 4) = ?"
-        params.append(anio)
-    if campeonato:
-        query += " AND p.campeonato = ?"
-        params.append(campeonato)
-    
-    # ORDEN CORREGIDO: año, mes, día
-    query += " ORDER BY SUBSTR(p.fecha, 7, 4) DESC, SUBSTR(p.fecha, 4, 2) DESC, SUBSTR(p.fecha, 1, 2) DESC"
-    
-    conn = sqlite3.connect(DB)
-    df = pd.read_sql_query(query, conn, params=params)
-    conn.close()
-    return df
-
-def obtener_estadisticas_rendimiento(equipo, anio=None, campeonato=None):
-    query = """
-        SELECT
-            COUNT(*) AS partidos_jugados,
-            SUM(CASE
-                WHEN (p.equipo_local = ? AND p.goles_local > p.goles_visitante) OR
-                     (p.equipo_visitante = ? AND p.goles_visitante > p.goles_local)
-                THEN 1 ELSE 0 END) AS ganados,
-            SUM(CASE WHEN p.goles_local = p.goles_visitante THEN 1 ELSE 0 END) AS empatados,
-            SUM(CASE
-                WHEN (p.equipo_local = ? AND p.goles_local < p.goles_visitante) OR
-                     (p.equipo_visitante = ? AND p.goles_visitante < p.goles_local)
-                THEN 1 ELSE 0 END) AS perdidos,
-            SUM(CASE
-                WHEN p.equipo_local = ? THEN p.goles_local
-                WHEN p.equipo_visitante = ? THEN p.goles_visitante
-                ELSE 0 END) AS goles_favor,
-            SUM(CASE
-                WHEN p.equipo_local = ? THEN p.goles_visitante
-                WHEN p.equipo_visitante = ? THEN p.goles_local
-                ELSE 0 END) AS goles_contra
-        FROM partidos p
-        WHERE (p.equipo_local = ? OR p.equipo_visitante = ?)
-    """
-    params = [equipo, equipo, equipo, equipo, equipo, equipo, equipo, equipo, equipo, equipo]
-    if anio:
-        query += " AND SUBSTR(p.fecha, 7, 4) = ?"
-        params.append(anio)
-    if campeonato:
-        query += " AND p.campeonato = ?"
-        params.append(campeonato)
-    conn = sqlite3.connect(DB)
-    cur = conn.cursor()
-    cur.execute(query, params)
-    resultado = cur.fetchone()
-    conn.close()
-    if resultado:
-        pj, g, e, p, gf, gc = resultado
-        return {
-            "partidos_jugados": pj or 0,
-            "ganados": g or 0,
-            "empatados": e or 0,
-            "perdidos": p or 0,
-            "goles_favor": gf or 0,
-            "goles_contra": gc or 0,
-            "diferencia": (gf or 0) - (gc or 0)
-        }
-    return {
-        "partidos_jugados": 0, "ganados": 0, "empatados": 0, "perdidos": 0,
-        "goles_favor": 0, "goles_contra": 0, "diferencia": 0
-    }
+# =====================================
+# VISTAS CACHEADAS POR VERSIÓN DE LOS DATOS + PRECALENTADO
+# =====================================
+VISTAS = {
+    "tabla_historica": obtener_tabla_historica_acumulada,
+    "goles_por_jugador": obtener_goles_por_jugador,
+    "estadisticas_rendimiento": obtener_estadisticas_rendimiento,
+    "campania": armar_campania,
+    "evolucion_puntos": obtener_evolucion_puntos_equipo,
+    "evolucion_goles": obtener_evolucion_goles_equipo,
+    "evolucion_equipos": obtener_evolucion_equipos,
+    "estadisticas_versus": obtener_estadisticas_versus,
+    "historial_versus": armar_historial_versus,
+}
 
-def obtener_jugadores_mas_amonestados(limite=20):
-    query = """
-        SELECT
-            t.jugador,
-            CASE
-                WHEN t.equipo = 'Local' THEN p.equipo_local
-                WHEN t.equipo = 'Visitante' THEN p.equipo_visitante
-            END AS equipo,
-            COUNT(*) AS amonestaciones
-        FROM partidos p
-        INNER JOIN tarjetas t ON t.partido_id = p.id
-        WHERE t.tipo = 'Amonestado'
-        AND t.jugador IS NOT NULL AND TRIM(t.jugador) <> ''
-        GROUP BY t.jugador, equipo
-        ORDER BY amonestaciones DESC
-        LIMIT ?
-    """
-    conn = sqlite3.connect(DB)
-    df = pd.read_sql_query(query, conn, params=(limite,))
-    conn.close()
-    return df
-
-def obtener_jugadores_mas_expulsados(limite=20):
-    query = """
-        SELECT
-            t.jugador,
-            CASE
-                WHEN t.equipo = 'Local' THEN p.equipo_local
-                WHEN t.equipo = 'Visitante' THEN p.equipo_visitante
-            END AS equipo,
-            COUNT(*) AS expulsiones
-        FROM partidos p
-        INNER JOIN tarjetas t ON t.partido_id = p.id
-        WHERE t.tipo = 'Expulsado'
-        AND t.jugador IS NOT NULL AND TRIM(t.jugador) <> ''
-        GROUP BY t.jugador, equipo
-        ORDER BY expulsiones DESC
-        LIMIT ?
-    """
-    conn = sqlite3.connect(DB)
-    df = pd.read_sql_query(query, conn, params=(limite,))
-    conn.close()
-    return df
-
-def calcular_puntos(goles_local, goles_visitante, equipo_local, equipo_visitante, equipo_buscar, anio):
-    puntos_victoria = 3 if int(anio) >= 1995 else 2
-    if goles_local > goles_visitante:
-        return (puntos_victoria, 1, 0, 0) if equipo_local == equipo_buscar else (0, 0, 0, 1)
-    elif goles_local < goles_visitante:
-        return (puntos_victoria, 1, 0, 0) if equipo_visitante == equipo_buscar else (0, 0, 0, 1)
-    else:
-        return (1, 0, 1, 0)
+# Equipos de los que depende cada vista según sus argumentos (None = de toda la base):
+# un cambio en un partido solo invalida las vistas de sus dos equipos y las globales.
+ALCANCES = {
+    "tabla_historica": lambda args: None,
+    "goles_por_jugador": lambda args: (args[2],) if args[2] else None,
+    "estadisticas_rendimiento": lambda args: (args[0],),
+    "campania": lambda args: (args[0],),
+    "evolucion_puntos": lambda args: (args[0],),
+    "evolucion_goles": lambda args: (args[0],),
+    "evolucion_equipos": lambda args: tuple(args[0]),
+    "estadisticas_versus": lambda args: (args[0], args[1]),
+    "historial_versus": lambda args: (args[0], args[1]),
+}
 
-def obtener_tabla_historica_acumulada():
-    """Obtiene tabla de posiciones acumulada de TODOS los partidos históricos.
-    Respeta regla histórica: 2 puntos (hasta 1994), 3 puntos (desde 1995)."""
-    conn = sqlite3.connect(DB)
-    cur = conn.cursor()
-    
-    # Obtener TODOS los partidos (sin filtrar por árbitro)
-    cur.execute("""
-        SELECT
-            p.fecha,
-            p.equipo_local,
-            p.goles_local,
-            p.equipo_visitante,
-            p.goles_visitante
-        FROM partidos p
-        WHERE p.equipo_local IS NOT NULL AND p.equipo_local <> ''
-          AND p.equipo_visitante IS NOT NULL AND p.equipo_visitante <> ''
-        ORDER BY p.fecha
-    """)
-    
-    partidos = cur.fetchall()
-    conn.close()
-    
-    # Diccionario para acumular estadísticas por equipo
-    tabla = {}
-    
-    for partido in partidos:
-        fecha, local, gl, visitante, gv = partido
-        
-        # Convertir goles a enteros (manejar NULL)
-        try:
-            gl = int(gl) if gl is not None else 0
-        except:
-            gl = 0
-        try:
-            gv = int(gv) if gv is not None else 0
-        except:
-            gv = 0
-        
-        # Obtener año para determinar sistema de puntos
-        try:
-            anio = int(fecha.split('/')[2]) if fecha else 0
-        except:
-            anio = 0
-        
-        # Inicializar equipos si no existen
-        if local not in tabla:
-            tabla[local] = {"PJ": 0, "PG": 0, "PE": 0, "PP": 0, "GF": 0, "GC": 0, "Puntos": 0}
-        if visitante not in tabla:
-            tabla[visitante] = {"PJ": 0, "PG": 0, "PE": 0, "PP": 0, "GF": 0, "GC": 0, "Puntos": 0}
-        
-        # Acumular partidos jugados y goles
-        tabla[local]["PJ"] += 1
-        tabla[visitante]["PJ"] += 1
-        tabla[local]["GF"] += gl
-        tabla[local]["GC"] += gv
-        tabla[visitante]["GF"] += gv
-        tabla[visitante]["GC"] += gl
-        
-        # Determinar puntos según el año (REGLA HISTÓRICA CORRECTA)
-        puntos_victoria = 3 if anio >= 1995 else 2
-        
-        # Asignar resultados y puntos
-        if gl > gv:
-            tabla[local]["PG"] += 1
-            tabla[visitante]["PP"] += 1
-            tabla[local]["Puntos"] += puntos_victoria
-        elif gl < gv:
-            tabla[visitante]["PG"] += 1
-            tabla[local]["PP"] += 1
-            tabla[visitante]["Puntos"] += puntos_victoria
+def version_vista(nombre, args):
+    """Huella del contenido del que depende la vista: igual en todos los procesos, sirve también
+    de clave para la caché en disco."""
+    return obtener_vigilante(DB).huella(ALCANCES[nombre](args))
+
+@st.cache_resource
+def obtener_cache_disco(db):
+    """Caché de resultados en disco, compartida por todos los procesos y réplicas que usen la carpeta."""
+    return CacheDisco(db)
+
+# Nivel en memoria chico a propósito: la caché en disco es compartida por todos los procesos y
+# resuelve el resto, así la memoria no crece con la cantidad de procesos de `streamlit run`
+VISTAS_EN_MEMORIA = int(os.environ.get("LDDS_CACHE_MEMORIA", "50"))
+
+@st.cache_data(show_spinner=False, max_entries=VISTAS_EN_MEMORIA)
+def _vista_cacheada(db, nombre, version, args):
+    with consultas.en_base(db):
+        return obtener_cache_disco(db).calcular(nombre, args, version, lambda: VISTAS[nombre](*args))
+
+@st.cache_resource
+def obtener_precalentador(db):
+    """Precalentador de una liga, compartido por todas las sesiones del proceso."""
+    vigilante = obtener_vigilante(db)
+    return Precalentador(
+        lambda nombre, args: _vista_cacheada(db, nombre, vigilante.huella(ALCANCES[nombre](args)), args),
+        archivo_accesos=ruta_accesos(db),
+    )
+
+def vista(nombre, *args):
+    """Resultado de una vista cacheado por (vista, argumentos, versión de los datos de los que depende);
+    registra el acceso."""
+    obtener_precalentador(DB).registrar(nombre, args)
+    return _vista_cacheada(DB, nombre, version_vista(nombre, args), args)
+
+def en_paralelo(**llamadas):
+    """Corre las consultas independientes de una vista en el pool compartido y junta los resultados.
+    Si una falla o supera el tiempo límite se avisa y su resultado queda en None."""
+    ctx = get_script_run_ctx()
+    
+    def con_contexto(funcion):
+        def llamada(*args):
+            add_script_run_ctx(threading.current_thread(), ctx)
+            try:
+                return funcion(*args)
+            finally:
+                add_script_run_ctx(threading.current_thread(), None)
+        return llamada
+    
+    resultados, errores = consultas.ejecutar_concurrente(
+        {nombre: (con_contexto(funcion), *args) for nombre, (funcion, *args) in llamadas.items()}
+    )
+    for nombre, error in errores.items():
+        if isinstance(error, consultas.ConsultaCancelada):
+            st.info(f"⏹️ Consulta cancelada ('{nombre}'): {error}.")
         else:
-            tabla[local]["PE"] += 1
-            tabla[visitante]["PE"] += 1
-            tabla[local]["Puntos"] += 1
-            tabla[visitante]["Puntos"] += 1
-    
-    # Convertir a lista ordenada
-    posiciones = []
-    for equipo, datos in tabla.items():
-        dg = datos["GF"] - datos["GC"]
-        posiciones.append((
-            equipo,
-            datos["PJ"],
-            datos["PG"],
-            datos["PE"],
-            datos["PP"],
-            datos["GF"],
-            datos["GC"],
-            dg,
-            datos["Puntos"]
-        ))
-    
-    # Ordenar por: Puntos, DG, GF (descendente)
-    posiciones.sort(key=lambda x: (x[8], x[7], x[5]), reverse=True)
-    
-    return posiciones, len(partidos)
+            st.warning(f"⚠️ No se pudo obtener '{nombre}': {error}")
+    return {nombre: resultados.get(nombre) for nombre in llamadas}
 
+def vistas_a_precalentar():
+    """Vistas candidatas en orden de prioridad por defecto (se reordenan por frecuencia de acceso)."""
+    candidatas = [("tabla_historica", ()), ("goles_por_jugador", ("", "", ""))]
+    for equipo in obtener_equipos():
+        candidatas += [
+            ("estadisticas_rendimiento", (equipo, None, None)),
+            ("campania", (equipo, None, None, True)),
+            ("evolucion_puntos", (equipo,)),
+            ("evolucion_goles", (equipo,)),
+        ]
+    return candidatas
+
+obtener_precalentador(DB).asegurar(obtener_vigilante(DB).version(), vistas_a_precalentar())
 
 # =====================================
-# NUEVAS FUNCIONES: CAMPAÑAS Y VERSUS
+# RACHAS Y RÉCORDS
 # =====================================
+@st.cache_resource
+def obtener_motor_records(db):
+    """Motor de récords compartido entre sesiones; se actualiza en segundo plano cuando cambia la base."""
+    motor = MotorRecords(db)
+    # Primero la suscripción y después la carga: un cambio avisado en el medio no se pierde
+    obtener_vigilante(db).suscribir(lambda ids, equipos: motor.actualizar())
+    motor.actualizar()
+    return motor
 
-def obtener_campania_equipo(equipo, anio=None, campeonato=None):
-    """Obtiene todos los partidos de un equipo con sus goleadores."""
-    query = """
-        SELECT
-            p.id,
-            p.fecha,
-            p.campeonato,
-            p.equipo_local,
-            p.equipo_visitante,
-            p.goles_local,
-            p.goles_visitante,
-            CASE
-                WHEN p.equipo_local = ? THEN 'Local'
-                ELSE 'Visitante'
-            END AS lugar,
-            CASE
-                WHEN p.equipo_local = ? AND p.goles_local > p.goles_visitante THEN 'Ganado'
-                WHEN p.equipo_visitante = ? AND p.goles_visitante > p.goles_local THEN 'Ganado'
-                WHEN p.goles_local = p.goles_visitante THEN 'Empatado'
-                ELSE 'Perdido'
-            END AS resultado,
-            CASE
-                WHEN p.equipo_local = ? THEN p.goles_local
-                ELSE p.goles_visitante
-            END AS goles_favor,
-            CASE
-                WHEN p.equipo_local = ? THEN p.goles_visitante
-                ELSE p.goles_local
-            END AS goles_contra
-        FROM partidos p
-        WHERE (p.equipo_local = ? OR p.equipo_visitante = ?)
-    """
-    params = [equipo, equipo, equipo, equipo, equipo, equipo, equipo]
-    if anio:
-        query += " AND SUBSTR(p.fecha, 7, 4) = ?"
-        params.append(anio)
-    if campeonato:
-        query += " AND p.campeonato = ?"
-        params.append(campeonato)
-    
-    # ORDEN CORREGIDO: año, mes, día
-    query += " ORDER BY SUBSTR(p.fecha, 7, 4) DESC, SUBSTR(p.fecha, 4, 2) DESC, SUBSTR(p.fecha, 1, 2) DESC"
-    
-    conn = sqlite3.connect(DB)
-    df = pd.read_sql_query(query, conn, params=params)
-    conn.close()
-    return df
-
-def obtener_goleadores_partido(partido_id, equipo):
-    """Obtiene los goleadores de un equipo en un partido específico."""
-    query = """
-        SELECT
-            g.jugador,
-            COUNT(*) AS goles
-        FROM goles g
-        JOIN partidos p ON p.id = g.partido_id
-        WHERE g.partido_id = ?
-        AND (
-            (p.equipo_local = ? AND g.equipo = 'Local')
-            OR 
-            (p.equipo_visitante = ? AND g.equipo = 'Visitante')
-        )
-        GROUP BY g.jugador
-        ORDER BY goles DESC
-    """
-    
-    conn = sqlite3.connect(DB)
-    df = pd.read_sql_query(query, conn, params=(partido_id, equipo, equipo))
-    conn.close()
-    return df
-
-def obtener_historial_versus(equipo1, equipo2, anio=None, campeonato=None):
-    """Obtiene el historial de enfrentamientos entre dos equipos."""
-    query = """
-        SELECT
-            p.fecha,
-            p.campeonato,
-            p.equipo_local,
-            p.equipo_visitante,
-            p.goles_local,
-            p.goles_visitante,
-            CASE
-                WHEN p.goles_local > p.goles_visitante THEN p.equipo_local
-                WHEN p.goles_visitante > p.goles_local THEN p.equipo_visitante
-                ELSE 'Empate'
-            END AS ganador
-        FROM partidos p
-        WHERE (
-            (p.equipo_local = ? AND p.equipo_visitante = ?)
-            OR
-            (p.equipo_local = ? AND p.equipo_visitante = ?)
-        )
-    """
-    params = [equipo1, equipo2, equipo2, equipo1]
-    
-    if anio:
-        query += " AND SUBSTR(p.fecha, 7, 4) = ?"
-        params.append(anio)
-    if campeonato:
-        query += " AND p.campeonato = ?"
-        params.append(campeonato)
-    
-    # ORDEN CORREGIDO: año, mes, día
-    query += " ORDER BY SUBSTR(p.fecha, 7, 4) DESC, SUBSTR(p.fecha, 4, 2) DESC, SUBSTR(p.fecha, 1, 2) DESC"
-    
-    conn = sqlite3.connect(DB)
-    df = pd.read_sql_query(query, conn, params=params)
-    conn.close()
-    return df
-
-def obtener_estadisticas_versus(equipo1, equipo2, anio=None, campeonato=None):
-    """Obtiene estadísticas resumen del enfrentamiento entre dos equipos."""
-    query = """
-        SELECT
-            COUNT(*) AS total_partidos,
-            SUM(CASE WHEN p.equipo_local = ? AND p.goles_local > p.goles_visitante THEN 1
-                     WHEN p.equipo_visitante = ? AND p.goles_visitante > p.goles_local THEN 1
-                     ELSE 0 END) AS victorias_eq1,
-            SUM(CASE WHEN p.equipo_local = ? AND p.goles_local > p.goles_visitante THEN 1
-                     WHEN p.equipo_visitante = ? AND p.goles_visitante > p.goles_local THEN 1
-                     ELSE 0 END) AS victorias_eq2,
-            SUM(CASE WHEN p.goles_local = p.goles_visitante THEN 1 ELSE 0 END) AS empates,
-            SUM(CASE WHEN p.equipo_local = ? THEN p.goles_local ELSE p.goles_visitante END) AS goles_eq1,
-            SUM(CASE WHEN p.equipo_local = ? THEN p.goles_visitante ELSE p.goles_local END) AS goles_eq2
-        FROM partidos p
-        WHERE (
-            (p.equipo_local = ? AND p.equipo_visitante = ?)
-            OR
-            (p.equipo_local = ? AND p.equipo_visitante = ?)
-        )
-    """
-    params = [equipo1, equipo1, equipo2, equipo2, equipo1, equipo1, equipo1, equipo2, equipo2, equipo1]
-    
-    if anio:
-        query += " AND SUBSTR(p.fecha, 7, 4) = ?"
-        params.append(anio)
-    if campeonato:
-        query += " AND p.campeonato = ?"
-        params.append(campeonato)
-    
-    conn = sqlite3.connect(DB)
-    cur = conn.cursor()
-    cur.execute(query, params)
-    resultado = cur.fetchone()
-    conn.close()
-    
-    if resultado:
-        total, v1, v2, emp, g1, g2 = resultado
-        return {
-            "total_partidos": total or 0,
-            "victorias_eq1": v1 or 0,
-            "victorias_eq2": v2 or 0,
-            "empates": emp or 0,
-            "goles_eq1": g1 or 0,
-            "goles_eq2": g2 or 0
-        }
+@st.cache_resource
+def obtener_motor_forma(db):
+    """Forma de los últimos 5 y 10 partidos de todos los equipos; los partidos nuevos solo extienden la serie."""
+    motor = MotorForma(db)
+    obtener_vigilante(db).suscribir(lambda ids, equipos: motor.actualizar())
+    motor.actualizar()
+    return motor
+
+@st.cache_resource
+def obtener_motor_elo(db):
+    """Motor de rating Elo compartido; reanuda desde su checkpoint en disco."""
+    motor = MotorElo(db)
+    obtener_vigilante(db).suscribir(lambda ids, equipos: motor.actualizar())
+    motor.actualizar()
+    return motor
+
+@st.cache_resource
+def obtener_tabla_en_vivo(db):
+    """Posiciones y goleadores en vivo: cada partido cargado o corregido aplica solo su diferencia."""
+    return TablaEnVivo(db, suscribir=obtener_vigilante(db).suscribir)
+
+@st.cache_data(show_spinner=False, max_entries=20)
+def obtener_zonas(db, version):
+    """Dimensión de zonas (nombres y equipo → código entero), releída solo si cambia el archivo."""
+    return zonas.leer_zonas(db)
+
+@st.cache_data(show_spinner=False, max_entries=20)
+def vista_zonas(db, version_tabla, version_zonas):
+    """Tablas por zona armadas desde los acumulados por equipo y por cruce de la tabla en vivo
+    (sin volver a recorrer partidos): resumen, cruces y, por zona, posiciones y goleadores."""
+    acumulados = obtener_tabla_en_vivo(db).acumulados()
+    dimension = obtener_zonas(db, version_zonas)
     return {
-        "total_partidos": 0, "victorias_eq1": 0, "victorias_eq2": 0,
-        "empates": 0, "goles_eq1": 0, "goles_eq2": 0
+        "resumen": zonas.tabla_por_zona(acumulados, dimension),
+        "cruces": zonas.cruces_por_zona(acumulados, dimension),
+        "posiciones": {z: zonas.posiciones_zona(acumulados, dimension, z) for z in dimension[0]},
+        "goleadores": {z: zonas.goleadores_zona(acumulados, dimension, z) for z in dimension[0]},
     }
 
 # =====================================
-# NUEVAS FUNCIONES: EVOLUCIÓN DE GOLES Y PUNTOS
+# POSICIONES POR CAMPEONATO
 # =====================================
+@st.cache_data(show_spinner=False, max_entries=20)
+def obtener_hechos_campeonatos(db, version):
+    """Partidos de fase regular (uno por equipo) y totales de todos los campeonatos, en una pasada."""
+    hechos = campeonatos.leer_hechos(db)
+    return hechos, campeonatos.acumular(hechos)
 
-def obtener_evolucion_goles_equipo(equipo):
-    """Obtiene evolución anual de goles por equipo."""
-    query = """
-        SELECT
-            SUBSTR(p.fecha, 7, 4) AS anio,
-            SUM(CASE
-                WHEN p.equipo_local = ? THEN p.goles_local
-                WHEN p.equipo_visitante = ? THEN p.goles_visitante
-                ELSE 0 END) AS goles_favor,
-            SUM(CASE
-                WHEN p.equipo_local = ? THEN p.goles_visitante
-                WHEN p.equipo_visitante = ? THEN p.goles_local
-                ELSE 0 END) AS goles_contra
-        FROM partidos p
-        WHERE (p.equipo_local = ? OR p.equipo_visitante = ?)
-        GROUP BY anio
-        ORDER BY anio
-    """
-    
-    conn = sqlite3.connect(DB)
-    df = pd.read_sql_query(query, conn, params=(equipo, equipo, equipo, equipo, equipo, equipo))
-    conn.close()
-    return df
-
-def obtener_evolucion_puntos_equipo(equipo):
-    """Obtiene evolución anual de puntos por equipo (respetando regla 2/3 puntos)."""
-    conn = sqlite3.connect(DB)
-    cur = conn.cursor()
-    
-    # Obtener todos los partidos del equipo con sus años
-    cur.execute("""
-        SELECT
-            SUBSTR(p.fecha, 7, 4) AS anio,
-            p.equipo_local,
-            p.goles_local,
-            p.equipo_visitante,
-            p.goles_visitante
-        FROM partidos p
-        WHERE p.arbitro IS NOT NULL AND p.arbitro <> ''
-        AND (p.equipo_local = ? OR p.equipo_visitante = ?)
-        ORDER BY p.fecha
-    """, (equipo, equipo))
-    
-    partidos = cur.fetchall()
-    conn.close()
-    
-    # Acumular puntos por año
-    puntos_por_anio = {}
-    
-    for partido in partidos:
-        anio, local, gl, visitante, gv = partido
-        
-        # Convertir goles a enteros
-        try:
-            gl = int(gl) if gl is not None else 0
-        except:
-            gl = 0
-        try:
-            gv = int(gv) if gv is not None else 0
-        except:
-            gv = 0
-        
-        # Determinar puntos según el año
-        puntos_victoria = 3 if int(anio) >= 1995 else 2
-        
-        # Calcular puntos obtenidos por el equipo
-        if local == equipo:
-            if gl > gv:
-                puntos = puntos_victoria
-            elif gl == gv:
-                puntos = 1
-            else:
-                puntos = 0
-        else:  # visitante == equipo
-            if gv > gl:
-                puntos = puntos_victoria
-            elif gv == gl:
-                puntos = 1
-            else:
-                puntos = 0
-        
-        # Acumular
-        if anio not in puntos_por_anio:
-            puntos_por_anio[anio] = 0
-        puntos_por_anio[anio] += puntos
-    
-    # Convertir a DataFrame
-    df = pd.DataFrame([
-        {"anio": anio, "puntos": puntos}
-        for anio, puntos in sorted(puntos_por_anio.items())
-    ])
-    
-    return df
+@st.cache_data(show_spinner=False, max_entries=200)
+def tabla_campeonato(db, version, anio, campeonato):
+    """Posiciones de un campeonato con desempates; los enfrentamientos se cruzan solo entre empatados."""
+    return campeonatos.posiciones(*obtener_hechos_campeonatos(db, version), anio, campeonato)
+
+@st.cache_resource
+def obtener_almacen_carreras(db):
+    """Carreras de jugadores por temporada y club; se pone al día al arrancar y luego partido a partido."""
+    almacen = AlmacenCarreras(db)
+    obtener_vigilante(db).suscribir(lambda ids, equipos: almacen.aplicar(ids))
+    almacen.actualizar()
+    return almacen
+
+# =====================================
+# BÚSQUEDA Y SUGERENCIAS
+# =====================================
+@st.cache_resource(max_entries=2 * len(LIGAS), show_spinner=False)
+def obtener_indice_busqueda(db, version):
+    """Índice de nombres (equipos, jugadores, árbitros, campeonatos); se rearma al cambiar los datos."""
+    return IndiceBusqueda.desde_db(db)
+
+def buscar(texto, limite=10, tipos=None):
+    return obtener_indice_busqueda(DB, obtener_vigilante(DB).version()).buscar(texto, limite, tipos)
+
+def buscador(etiqueta, tipo, key, limite=10):
+    """Campo con sugerencias mientras se escribe, en lugar de un selectbox con la lista completa.
+    Devuelve el nombre elegido ('' si todavía no hay)."""
+    texto = st.text_input(etiqueta, placeholder="Escriba para buscar...", key=f"{key}_texto")
+    if not texto.strip():
+        return ""
+    sugerencias = [nombre for _, nombre in buscar(texto, limite, (tipo,))]
+    if not sugerencias:
+        st.caption("Sin resultados.")
+        return ""
+    return st.selectbox(f"{etiqueta} (sugerencias)", sugerencias, key=key)
+
+# =====================================
+# CONSULTAS ENTRE LIGAS (CACHEADAS POR VERSIÓN DE CADA BASE)
+# =====================================
+# `ligas` es una tupla de (nombre, base) y `versiones` la de cada archivo: publicar una liga
+# solo invalida las combinaciones que la incluyen. Con ttl, un error de una liga no queda fijo.
+@st.cache_data(show_spinner=False, ttl=60, max_entries=200)
+def goleadores_entre_ligas(ligas, versiones, anio):
+    ranking, errores = consultas.obtener_goleadores_ligas(dict(ligas), anio or None)
+    return ranking, {liga: str(e) for liga, e in errores.items()}
+
+@st.cache_data(show_spinner=False, ttl=60, max_entries=50)
+def equipos_entre_ligas(ligas, versiones):
+    resultados, _ = consultas.en_ligas(dict(ligas), consultas.obtener_equipos)
+    return sorted({equipo for equipos in resultados.values() for equipo in equipos})
+
+@st.cache_data(show_spinner=False, ttl=60, max_entries=500)
+def versus_entre_ligas(ligas, versiones, equipo1, equipo2):
+    resumen, historial, errores = consultas.obtener_versus_ligas(dict(ligas), equipo1, equipo2)
+    return resumen, historial, {liga: str(e) for liga, e in errores.items()}
 
 # =====================================
 # SIDEBAR: LOGO + FILTROS
 # =====================================
 st.sidebar.image("logo.png", width=200)
 st.sidebar.markdown("---")
-st.sidebar.title("Liga Deportiva del Sur")
-anio = st.sidebar.text_input("Año", placeholder="Ej: 2024", key="sidebar_anio")
+st.sidebar.title(st.session_state["sidebar_liga"])
+if len(LIGAS) > 1:
+    st.sidebar.selectbox("🌎 Liga", list(LIGAS), key="sidebar_liga")
+if LIGAS_FALTANTES:
+    st.sidebar.warning(f"⚠️ Ligas registradas sin base: {', '.join(LIGAS_FALTANTES)}")
+anio = st.sidebar.text_input("Año", placeholder="Ej: 2024", key="sidebar_anio").strip()
+if anio and not (anio.isdigit() and len(anio) == 4):
+    st.sidebar.warning("⚠️ Año inválido (usar 4 dígitos): se ignora el filtro.")
+    anio = ""
 campeonato = st.sidebar.selectbox(
     "Campeonato",
     [""] + obtener_valores_unicos("campeonato"),
@@ -901,10 +396,68 @@ solo_expulsados = st.sidebar.checkbox("✅ Solo expulsados", key="sidebar_solo_e
 st.sidebar.markdown("---")
 st.sidebar.caption("💡 Filtros apara aplicar en las pestañas: Goles x jugador, Tarjetas x jugador")
 
+# Destino de cada tipo de resultado: el campo que se completa al elegirlo
+DESTINOS_BUSQUEDA = {
+    "jugador": ("tab16_jugador_texto", "👤 Jugador"),
+    "arbitro": ("tab4_arbitro_texto", "⚖️ Árbitro vs Equipo"),
+    "equipo": ("tab10_equipo", "🗓️ Campañas"),
+    "campeonato": ("sidebar_campeonato", "filtro del sidebar"),
+}
+
+def ir_a_resultado(tipo, nombre):
+    st.session_state[DESTINOS_BUSQUEDA[tipo][0]] = nombre
+
+st.sidebar.markdown("---")
+texto_busqueda = st.sidebar.text_input("🔍 Buscar", placeholder="Equipo, jugador, árbitro...", key="sidebar_buscar")
+if texto_busqueda.strip():
+    resultados = buscar(texto_busqueda, 8)
+    if not resultados:
+        st.sidebar.caption("Sin resultados.")
+    for i, (tipo, nombre) in enumerate(resultados):
+        st.sidebar.button(
+            f"{ICONOS_BUSQUEDA[tipo]} {nombre}",
+            help=f"Abrir en {DESTINOS_BUSQUEDA[tipo][1]}",
+            on_click=ir_a_resultado,
+            args=(tipo, nombre),
+            key=f"sidebar_buscar_{i}",
+        )
+
+@st.fragment(run_every=2 if obtener_precalentador(DB).estado()[0] else None)
+def estado_precalentado():
+    activo, hechas, total, errores = obtener_precalentador(DB).estado()
+    if activo and total:
+        st.progress(hechas / total, text=f"🔥 Precalentando caché: {hechas}/{total}")
+    elif total:
+        st.caption(f"✅ Caché lista ({total} vistas)" + (f" · ⚠️ {errores} errores" if errores else ""))
+
+with st.sidebar:
+    estado_precalentado()
+
+# Versión de los datos con la que se dibujó esta corrida; el fragmento la compara con la actual
+st.session_state["version_mostrada"] = obtener_vigilante(DB).version()
+refresco_automatico = st.sidebar.toggle("🔄 Refrescar al cambiar la base", key="sidebar_refresco")
+
+@st.fragment(run_every=INTERVALO_VIGILANCIA if refresco_automatico else None)
+def datos_actualizados():
+    cambio = obtener_vigilante(DB).ultimo_cambio()
+    if cambio is None:
+        return
+    version, ids, equipos, momento = cambio
+    if version != st.session_state.get("version_mostrada"):
+        if refresco_automatico:
+            st.rerun(scope="app")
+        st.caption(f"🆕 Hay datos nuevos ({len(ids)} partidos): cambiá cualquier filtro para verlos.")
+    else:
+        st.caption(f"🕒 Datos actualizados a las {datetime.fromtimestamp(momento):%H:%M:%S} "
+                   f"({len(ids)} partidos, {len(equipos)} equipos)")
+
+with st.sidebar:
+    datos_actualizados()
+
 # =====================================
 # PESTAÑAS
 # =====================================
-tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9, tab10, tab11, tab12, tab13 = st.tabs([
+PESTANIAS = [
     "📋 Posiciones",
     "🗓️ Campañas",
     "⚔️ Versus",
@@ -917,17 +470,19 @@ tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9, tab10, tab11, tab12, tab13
     "🆚 Tarjetas x Rival",
     "📈 Evolución Equipo",
     "🔝 Top Tarjetas",
-    "⚖️ Árbitro vs Equipo"    
-    
-])
+    "⚖️ Árbitro vs Equipo",
+    "🏅 Récords",
+    "🎲 Proyección",
+    "👤 Jugador",
+    "🌎 Entre Ligas",
+    "🗺️ Zonas",
+    "⬇️ Exportar",
+    "📉 Comparar"
+]
+tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9, tab10, tab11, tab12, tab13, tab14, tab15, tab16, tab17, tab18, tab19, tab20 = st.tabs(PESTANIAS)
 
-# Tab 1: Tabla de Posiciones (HISTORIAL COMPLETO PRIMERO)
-with tab1:
-    st.markdown("## 📋 Tabla Histórica - Todos los Partidos")
-    
-    # Obtener datos acumulados
-    posiciones, total_partidos = obtener_tabla_historica_acumulada()
-    
+def mostrar_posiciones(posiciones, total_partidos):
+    """Tabla de posiciones con sus destacados (la histórica cacheada o la del modo en vivo)."""
     if not posiciones:
         st.warning("⚠️ No hay datos disponibles.")
     else:
@@ -981,9 +536,72 @@ with tab1:
             top_dg = df_posiciones.sort_values("DG", ascending=False).head(5)[["Equipo", "DG"]].reset_index(drop=True)
             top_dg.index = top_dg.index + 1
             st.dataframe(top_dg, use_container_width=True, hide_index=False)
+        
+        st.markdown("---")
+
+# Tab 1: Tabla de Posiciones (HISTORIAL COMPLETO PRIMERO)
+with tab1, consultas_protegidas():
+    st.markdown("## 📋 Tabla Histórica - Todos los Partidos")
+    
+    en_vivo = st.toggle("🔴 En vivo (se actualiza sola al cargarse resultados)", key="tab1_en_vivo")
+    if en_vivo:
+        @st.fragment(run_every=INTERVALO_VIGILANCIA)
+        def posiciones_en_vivo():
+            tabla_en_vivo = obtener_tabla_en_vivo(DB)
+            mostrar_posiciones(*tabla_en_vivo.posiciones())
+            st.markdown("### ⚽ Goleadores")
+            goleadores = pd.DataFrame(tabla_en_vivo.goleadores(10), columns=["Jugador", "Goles"])
+            goleadores.index = goleadores.index + 1
+            st.dataframe(goleadores, use_container_width=True, hide_index=False)
+        
+        posiciones_en_vivo()
+    else:
+        # Obtener datos acumulados
+        mostrar_posiciones(*vista("tabla_historica"))
+    
+    # Posiciones de un campeonato (con desempates por enfrentamientos directos)
+    st.markdown("### 🏆 Posiciones por Campeonato")
+    _, totales_camp = obtener_hechos_campeonatos(DB, version_db(DB))
+    torneos = campeonatos.campeonatos_disponibles(totales_camp)
+    if torneos:
+        anio_camp, nombre_camp = st.selectbox(
+            "Campeonato", torneos, format_func=lambda t: f"{t[1]} {t[0]}", key="tab1_campeonato"
+        )
+        df_camp = tabla_campeonato(DB, version_db(DB), anio_camp, nombre_camp)
+        for zona_camp, df_zona in df_camp.groupby("Zona", sort=True):
+            if df_camp["Zona"].nunique() > 1:
+                st.markdown(f"#### {zona_camp}")
+            st.dataframe(
+                df_zona.drop(columns="Zona"),
+                column_config={"Puntos": st.column_config.NumberColumn("PTS", format="%d")},
+                use_container_width=True,
+                hide_index=True
+            )
+        st.caption("Empates en puntos: enfrentamientos entre los empatados (puntos, diferencia y goles), "
+                   "luego diferencia de gol y goles a favor generales. Solo fase regular.")
+    
+    # Ranking Elo (a la fecha elegida o actual)
+    st.markdown("### 📈 Ranking Elo")
+    fecha_elo = st.text_input("Ranking a la fecha (opcional)", placeholder="Ej: 31/12/2019", key="tab1_fecha_elo")
+    try:
+        df_elo = obtener_motor_elo(DB).tabla_a_fecha(fecha_elo or None)
+    except ValueError:
+        st.warning("⚠️ Fecha inválida. Use el formato dd/mm/aaaa.")
+        df_elo = pd.DataFrame()
+    if not df_elo.empty:
+        df_elo.index = df_elo.index + 1
+        st.dataframe(
+            df_elo,
+            column_config={
+                "Rating": st.column_config.NumberColumn("📈 Rating", format="%d"),
+                "PJ": st.column_config.NumberColumn("PJ", format="%d"),
+            },
+            use_container_width=True,
+            hide_index=False
+        )
 
 # Tab 2: Campañas (CON ORDEN CORREGIDO Y SIN ID)
-with tab2:
+with tab2, consultas_protegidas():
     st.markdown("## 🗓️ Campaña de un Equipo")
     
     col1, col2 = st.columns([1, 3])
@@ -997,77 +615,41 @@ with tab2:
     
     with col2:
         if equipo_campania:
-            # Obtener estadísticas generales
-            stats = obtener_estadisticas_rendimiento(equipo_campania, anio_campania or None, camp_campania or None)
-            
-            st.markdown(f"### 📊 Resumen de la Campaña: {equipo_campania}")
-            
-            col_a, col_b, col_c, col_d = st.columns(4)
-            with col_a:
-                st.metric("⚽ Partidos", stats["partidos_jugados"])
-            with col_b:
-                st.metric("✅ Ganados", stats["ganados"])
-            with col_c:
-                st.metric("🤝 Empatados", stats["empatados"])
-            with col_d:
-                st.metric("❌ Perdidos", stats["perdidos"])
+            # Estadísticas generales y partidos detallados (consultas independientes, en paralelo)
+            datos = en_paralelo(
+                stats=(vista, "estadisticas_rendimiento", equipo_campania, anio_campania or None, camp_campania or None),
+                partidos=(vista, "campania", equipo_campania, anio_campania or None, camp_campania or None, mostrar_goleadores),
+            )
+            stats, df_display = datos["stats"], datos["partidos"]
             
-            col_e, col_f, col_g = st.columns(3)
-            with col_e:
-                st.metric("⚽ GF", stats["goles_favor"])
-            with col_f:
-                st.metric("🥅 GC", stats["goles_contra"])
-            with col_g:
-                st.metric("⚖️ DG", stats["diferencia"])
-            
-            st.markdown("---")
-            
-            # Obtener partidos detallados
-            df_partidos = obtener_campania_equipo(equipo_campania, anio_campania or None, camp_campania or None)
-            
-            if df_partidos.empty:
-                st.warning("⚠️ No hay partidos para mostrar con los filtros aplicados.")
-            else:
-                st.markdown(f"### 📋 Partidos ({len(df_partidos)} encontrados)")
+            if stats is not None:
+                st.markdown(f"### 📊 Resumen de la Campaña: {equipo_campania}")
                 
-                # Mostrar tabla de partidos
-                partidos_display = []
+                col_a, col_b, col_c, col_d = st.columns(4)
+                with col_a:
+                    st.metric("⚽ Partidos", stats["partidos_jugados"])
+                with col_b:
+                    st.metric("✅ Ganados", stats["ganados"])
+                with col_c:
+                    st.metric("🤝 Empatados", stats["empatados"])
+                with col_d:
+                    st.metric("❌ Perdidos", stats["perdidos"])
                 
-                for idx, partido in df_partidos.iterrows():
-                    # Determinar rival
-                    rival = partido['equipo_visitante'] if partido['equipo_local'] == equipo_campania else partido['equipo_local']
-                    
-                    # Formatear resultado
-                    if partido['equipo_local'] == equipo_campania:
-                        resultado = f"{partido['goles_favor']}-{partido['goles_contra']}"
-                    else:
-                        resultado = f"{partido['goles_contra']}-{partido['goles_favor']}"
-                    
-                    # Obtener goleadores si está activado
-                    goleadores_str = ""
-                    if mostrar_goleadores:
-                        df_goleadores = obtener_goleadores_partido(partido['id'], equipo_campania)
-                        if not df_goleadores.empty:
-                            goles_lista = []
-                            for _, gol in df_goleadores.iterrows():
-                                goles_lista.append(formatear_goleador(gol['jugador'], gol['goles']))
-                            goleadores_str = ", ".join(goles_lista)
-                    
-                    partidos_display.append({
-                        "Fecha": partido['fecha'],
-                        "Lugar": partido['lugar'],
-                        "Torneo": partido['campeonato'],
-                        "Rival": rival,
-                        "Resultado": resultado,
-                        "GF": partido['goles_favor'],
-                        "GC": partido['goles_contra'],
-                        "⚽": partido['resultado'],
-                        "Goleadores": goleadores_str if goleadores_str else "-"
-                    })
+                col_e, col_f, col_g = st.columns(3)
+                with col_e:
+                    st.metric("⚽ GF", stats["goles_favor"])
+                with col_f:
+                    st.metric("🥅 GC", stats["goles_contra"])
+                with col_g:
+                    st.metric("⚖️ DG", stats["diferencia"])
                 
-                df_display = pd.DataFrame(partidos_display)
+            st.markdown("---")
+            
+            if df_display is not None and df_display.empty:
+                st.warning("⚠️ No hay partidos para mostrar con los filtros aplicados.")
+            elif df_display is not None:
+                st.markdown(f"### 📋 Partidos ({len(df_display)} encontrados)")
                 
-                # Reordenar columnas
                 # Reordenar columnas (sin GF y GC)
                 columnas_orden = ["Fecha", "Lugar", "Torneo", "Rival", "Resultado"]
                 if mostrar_goleadores:
@@ -1081,7 +663,7 @@ with tab2:
                 )
 
 # Tab 3: Versus (CON ORDEN CORREGIDO Y SIN ID)
-with tab3:
+with tab3, consultas_protegidas():
     st.markdown("## ⚔️ Versus: Comparativa entre Equipos")
     
     col1, col2 = st.columns([1, 2])
@@ -1099,70 +681,56 @@ with tab3:
     
     with col2:
         if equipo1 and equipo2 and equipo1 != equipo2:
-            # Obtener estadísticas resumen
-            stats = obtener_estadisticas_versus(equipo1, equipo2, anio_versus or None, camp_versus or None)
-            
-            st.markdown(f"### 📊 Historial: {equipo1} vs {equipo2}")
-            
-            col_a, col_b, col_c = st.columns(3)
-            with col_a:
-                st.metric("⚽ Partidos", stats["total_partidos"])
-            with col_b:
-                st.metric(f"✅ {equipo1}", stats["victorias_eq1"])
-            with col_c:
-                st.metric(f"✅ {equipo2}", stats["victorias_eq2"])
-            
-            col_d, col_e, col_f = st.columns(3)
-            with col_d:
-                st.metric("🤝 Empates", stats["empates"])
-            with col_e:
-                st.metric(f"⚽ GF {equipo1}", stats["goles_eq1"])
-            with col_f:
-                st.metric(f"⚽ GF {equipo2}", stats["goles_eq2"])
+            # Estadísticas resumen e historial detallado (consultas independientes, en paralelo)
+            datos = en_paralelo(
+                stats=(vista, "estadisticas_versus", equipo1, equipo2, anio_versus or None, camp_versus or None),
+                historial=(vista, "historial_versus", equipo1, equipo2, anio_versus or None, camp_versus or None),
+            )
+            stats, df_display = datos["stats"], datos["historial"]
             
-            # Calcular porcentajes
-            if stats["total_partidos"] > 0:
-                st.markdown("---")
-                st.markdown("### 📈 Porcentajes")
+            if stats is not None:
+                st.markdown(f"### 📊 Historial: {equipo1} vs {equipo2}")
                 
-                porc_eq1 = (stats["victorias_eq1"] / stats["total_partidos"]) * 100
-                porc_eq2 = (stats["victorias_eq2"] / stats["total_partidos"]) * 100
-                porc_emp = (stats["empates"] / stats["total_partidos"]) * 100
+                col_a, col_b, col_c = st.columns(3)
+                with col_a:
+                    st.metric("⚽ Partidos", stats["total_partidos"])
+                with col_b:
+                    st.metric(f"✅ {equipo1}", stats["victorias_eq1"])
+                with col_c:
+                    st.metric(f"✅ {equipo2}", stats["victorias_eq2"])
+                
+                col_d, col_e, col_f = st.columns(3)
+                with col_d:
+                    st.metric("🤝 Empates", stats["empates"])
+                with col_e:
+                    st.metric(f"⚽ GF {equipo1}", stats["goles_eq1"])
+                with col_f:
+                    st.metric(f"⚽ GF {equipo2}", stats["goles_eq2"])
+                
+                # Calcular porcentajes
+                if stats["total_partidos"] > 0:
+                    st.markdown("---")
+                    st.markdown("### 📈 Porcentajes")
+                    
+                    porc_eq1 = (stats["victorias_eq1"] / stats["total_partidos"]) * 100
+                    porc_eq2 = (stats["victorias_eq2"] / stats["total_partidos"]) * 100
+                    porc_emp = (stats["empates"] / stats["total_partidos"]) * 100
+                    
+                    col_x, col_y, col_z = st.columns(3)
+                    with col_x:
+                        st.metric(f"% {equipo1}", f"{porc_eq1:.1f}%")
+                    with col_y:
+                        st.metric(f"% {equipo2}", f"{porc_eq2:.1f}%")
+                    with col_z:
+                        st.metric("% Empates", f"{porc_emp:.1f}%")
                 
-                col_x, col_y, col_z = st.columns(3)
-                with col_x:
-                    st.metric(f"% {equipo1}", f"{porc_eq1:.1f}%")
-                with col_y:
-                    st.metric(f"% {equipo2}", f"{porc_eq2:.1f}%")
-                with col_z:
-                    st.metric("% Empates", f"{porc_emp:.1f}%")
             
             st.markdown("---")
             
-            # Obtener historial detallado
-            df_historial = obtener_historial_versus(equipo1, equipo2, anio_versus or None, camp_versus or None)
-            
-            if df_historial.empty:
+            if df_display is not None and df_display.empty:
                 st.warning("⚠️ No hay enfrentamientos entre estos equipos con los filtros aplicados.")
-            else:
-                st.markdown(f"### 📋 Historial de Enfrentamientos ({len(df_historial)} partidos)")
-                
-                # Formatear tabla
-                historial_display = []
-                
-                for idx, partido in df_historial.iterrows():
-                    resultado = f"{partido['goles_local']}-{partido['goles_visitante']}"
-                    
-                    historial_display.append({
-                        "Fecha": partido['fecha'],
-                        "Torneo": partido['campeonato'],
-                        "Local": partido['equipo_local'],
-                        "Visitante": partido['equipo_visitante'],
-                        "Resultado": resultado,
-                        "🏆 Ganador": partido['ganador'] if partido['ganador'] != 'Empate' else "🤝 Empate"
-                    })
-                
-                df_display = pd.DataFrame(historial_display)
+            elif df_display is not None:
+                st.markdown(f"### 📋 Historial de Enfrentamientos ({len(df_display)} partidos)")
                 
                 st.dataframe(
                     df_display,
@@ -1171,7 +739,7 @@ with tab3:
                     hide_index=True
                 )
 # Tab4: Evolucion de puntos 
-with tab4:
+with tab4, consultas_protegidas():
     st.markdown("## ⭐ Evolución de Puntos por Equipo")
     
     col1, col2 = st.columns([1, 3])
@@ -1182,7 +750,7 @@ with tab4:
     
     with col2:
         if equipo_puntos:
-            df_puntos = obtener_evolucion_puntos_equipo(equipo_puntos)
+            df_puntos = vista("evolucion_puntos", equipo_puntos)
             
             if df_puntos.empty:
                 st.info("No hay datos para este equipo.")
@@ -1254,7 +822,7 @@ with tab4:
                     st.info(f"📝 **Sistema de puntos**: 3 puntos por victoria ({primer_anio} - {ultimo_anio})")
 
 # Tab 5: Rendimiento
-with tab5:
+with tab5, consultas_protegidas():
     st.markdown("## 📊 Rendimiento por Equipo")
     
     col1, col2 = st.columns([1, 3])
@@ -1266,7 +834,7 @@ with tab5:
     
     with col2:
         if equipo:
-            stats = obtener_estadisticas_rendimiento(equipo, anio_rend or None, camp_rend or None)
+            stats = vista("estadisticas_rendimiento", equipo, anio_rend or None, camp_rend or None)
             col_a, col_b, col_c, col_d = st.columns(4)
             with col_a:
                 st.metric("⚽ PJ", stats["partidos_jugados"])
@@ -1299,12 +867,58 @@ with tab5:
                     "resultado": "Resultado"
                 })
                 st.dataframe(df_display.head(20), use_container_width=True, hide_index=True)
+            
+            # Forma: puntos y diferencia de gol de los últimos 5 y 10 partidos
+            df_forma = obtener_motor_forma(DB).serie_equipo(equipo)
+            if not df_forma.empty:
+                st.markdown("---")
+                st.markdown("### 🔥 Forma")
+                actual = df_forma.iloc[-1]
+                col_a, col_b, col_c, col_d = st.columns(4)
+                with col_a:
+                    st.metric("Últimos 5", actual["Últimos 5"])
+                with col_b:
+                    st.metric("Pts (últimos 5)", int(actual["Pts 5"]), f"DG {int(actual['DG 5']):+d}", delta_color="off")
+                with col_c:
+                    st.metric("Últimos 10", actual["Últimos 10"])
+                with col_d:
+                    st.metric("Pts (últimos 10)", int(actual["Pts 10"]), f"DG {int(actual['DG 10']):+d}", delta_color="off")
+                
+                recientes = df_forma.tail(50)
+                fig, ax = plt.subplots(figsize=(12, 4))
+                ax.plot(range(len(recientes)), recientes["Pts 5"], linewidth=2, color="#FF9800", label="Pts últimos 5")
+                ax.plot(range(len(recientes)), recientes["Pts 10"], linewidth=2, color="#3F51B5", label="Pts últimos 10")
+                ax.set_xticks(range(0, len(recientes), 5))
+                ax.set_xticklabels(recientes["Fecha"].iloc[::5], rotation=45, ha="right")
+                ax.set_ylabel("Puntos", fontsize=12, fontweight='bold')
+                ax.set_title(f"Forma en los últimos {len(recientes)} partidos - {equipo}", fontsize=14, fontweight='bold', pad=20)
+                ax.grid(True, alpha=0.3, linestyle='--')
+                ax.legend(fontsize=11, loc='upper left')
+                plt.tight_layout()
+                st.pyplot(fig)
+            
+            # Rating Elo (desde la serie almacenada, sin reproducir el historial)
+            df_rating = obtener_motor_elo(DB).serie_equipo(equipo)
+            if not df_rating.empty:
+                st.markdown("---")
+                st.markdown("### 📈 Rating Elo")
+                st.metric("Rating Actual", int(round(df_rating["rating"].iloc[-1])))
+                
+                fig, ax = plt.subplots(figsize=(12, 4))
+                ax.plot(df_rating["fecha"], df_rating["rating"], linewidth=2, color="#3F51B5")
+                ax.axhline(1500, color="gray", linestyle="--", alpha=0.5)
+                ax.set_xlabel("Fecha", fontsize=12, fontweight='bold')
+                ax.set_ylabel("Rating", fontsize=12, fontweight='bold')
+                ax.set_title(f"Evolución del rating Elo - {equipo}", fontsize=14, fontweight='bold', pad=20)
+                ax.grid(True, alpha=0.3, linestyle='--')
+                plt.tight_layout()
+                st.pyplot(fig)
 
 # Tab 6: Goles por Jugador (CORREGIDO)
-with tab6:
+with tab6, consultas_protegidas():
     st.markdown("## ⚽ Goles por Jugador")
     
-    df = obtener_goles_por_jugador(anio, campeonato, equipo_filtro)
+    df = vista("goles_por_jugador", anio, campeonato, equipo_filtro)
     
     if df.empty:
         st.warning("⚠️ No se encontraron datos.")
@@ -1328,7 +942,7 @@ with tab6:
         )
 
 # Tab 7: Goleadores por Equipo
-with tab7:
+with tab7, consultas_protegidas():
     st.markdown("## 🏆 Goleadores por Equipo")
     
     col1, col2 = st.columns([1, 3])
@@ -1364,7 +978,7 @@ with tab7:
                 )
 
 # TAB 8: EVOLUCIÓN DE GOLES
-with tab8:
+with tab8, consultas_protegidas():
     st.markdown("## 🥅 Evolución de Goles por Equipo")
     
     col1, col2 = st.columns([1, 3])
@@ -1375,7 +989,7 @@ with tab8:
     
     with col2:
         if equipo_goles:
-            df_goles = obtener_evolucion_goles_equipo(equipo_goles)
+            df_goles = vista("evolucion_goles", equipo_goles)
             
             if df_goles.empty:
                 st.info("No hay datos para este equipo.")
@@ -1444,7 +1058,7 @@ with tab8:
                 )
 
 # Tab 9: Tarjetas por Jugador
-with tab9:
+with tab9, consultas_protegidas():
     st.markdown("## 📊 Tarjetas por Jugador")
     df = obtener_tarjetas_por_jugador(anio, campeonato, equipo_filtro, solo_expulsados)
     if df.empty:
@@ -1464,7 +1078,7 @@ with tab9:
         st.dataframe(df_display, use_container_width=True, height=400, hide_index=True)
 
 # Tab 10: Tarjetas por Rival (AHORA POR EQUIPO)
-with tab10:
+with tab10, consultas_protegidas():
     st.markdown("## 🆚 Tarjetas por Rival (por Equipo)")
     
     col1, col2 = st.columns([1, 3])
@@ -1511,7 +1125,7 @@ with tab10:
                 )
 
 # Tab 11: Evolución por Equipo
-with tab11:
+with tab11, consultas_protegidas():
     st.markdown("## 📈 Evolución Anual de Tarjetas por Equipo")
     
     col1, col2 = st.columns([1, 3])
@@ -1552,33 +1166,37 @@ with tab11:
 
 
 # Tab 12: Top Tarjetas (ELIMINADO "Más Tarjetas Totales")
-with tab12:
+with tab12, consultas_protegidas():
     st.markdown("## 🔝 Jugadores con más Tarjetas")
     
+    datos = en_paralelo(
+        amonestados=(obtener_jugadores_mas_amonestados, 10),
+        expulsados=(obtener_jugadores_mas_expulsados, 10),
+    )
+    df_amon, df_exp = datos["amonestados"], datos["expulsados"]
+    
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("### ⚠️ Más Amonestados")
-        df_amon = obtener_jugadores_mas_amonestados(10)
-        if not df_amon.empty:
+        if df_amon is not None and not df_amon.empty:
             df_amon = df_amon.rename(columns={"jugador": "Jugador", "equipo": "Equipo", "amonestaciones": "Amonestaciones"})
             st.dataframe(df_amon, use_container_width=True, hide_index=True)
     
     with col2:
         st.markdown("### 🔴 Más Expulsados")
-        df_exp = obtener_jugadores_mas_expulsados(10)
-        if not df_exp.empty:
+        if df_exp is not None and not df_exp.empty:
             df_exp = df_exp.rename(columns={"jugador": "Jugador", "equipo": "Equipo", "expulsiones": "Expulsiones"})
             st.dataframe(df_exp, use_container_width=True, hide_index=True)
 
 # Tab 13: Árbitro vs Equipo
-with tab13:
+with tab13, consultas_protegidas():
     st.markdown("## ⚖️ Árbitro vs Equipo")
     
     col1, col2 = st.columns([1, 2])
     
     with col1:
-        arbitro = st.selectbox("Árbitro", obtener_valores_unicos("arbitro"), key="tab4_arbitro")
+        arbitro = buscador("Árbitro", "arbitro", key="tab4_arbitro")
         equipo = st.selectbox("Equipo", obtener_equipos(), key="tab4_equipo")
         anio_filtro = st.text_input("Año (opcional)", key="tab4_anio")
         camp_filtro = st.selectbox("Campeonato (opcional)", [""] + obtener_valores_unicos("campeonato"), key="tab4_campeonato")
@@ -1599,9 +1217,415 @@ with tab13:
             - Mostró **{stats['amonestados']}** tarjetas amarillas y **{stats['expulsados']}** rojas
             """)
 
+# Tab 14: Rachas y Récords
+with tab14, consultas_protegidas():
+    st.markdown("## 🏅 Rachas y Récords por Equipo")
+    
+    df_records = obtener_motor_records(DB).tabla()
+    
+    if df_records.empty:
+        st.warning("⚠️ No hay datos disponibles.")
+    else:
+        invicto = df_records.loc[df_records["Invicto Máx"].idxmax()]
+        sin_ganar = df_records.loc[df_records["Sin Ganar Máx"].idxmax()]
+        goleada = df_records.loc[df_records["_goleada_dif"].idxmax()]
+        mas_goles = df_records.loc[df_records["_mas_goles_total"].idxmax()]
+        
+        col_a, col_b, col_c, col_d = st.columns(4)
+        with col_a:
+            st.metric("🛡️ Mayor Invicto", f"{invicto['Invicto Máx']} PJ", invicto["Equipo"], delta_color="off")
+        with col_b:
+            st.metric("🥶 Mayor Racha sin Ganar", f"{sin_ganar['Sin Ganar Máx']} PJ", sin_ganar["Equipo"], delta_color="off")
+        with col_c:
+            st.metric("💥 Mayor Goleada", goleada["Mayor Goleada"].split(" (")[0].split(" vs ")[0], goleada["Equipo"], delta_color="off")
+        with col_d:
+            st.metric("⚽ Partido con más Goles", f"{mas_goles['_mas_goles_total']} goles", mas_goles["Equipo"], delta_color="off")
+        
+        st.markdown("---")
+        
+        columnas = [c for c in df_records.columns if not c.startswith("_")]
+        st.dataframe(
+            df_records[columnas],
+            column_config={
+                "PJ": st.column_config.NumberColumn("PJ", format="%d"),
+                "Invicto Máx": st.column_config.NumberColumn("🛡️ Invicto Máx", format="%d"),
+                "Sin Ganar Máx": st.column_config.NumberColumn("🥶 Sin Ganar Máx", format="%d"),
+                "Invicto Actual": st.column_config.NumberColumn("Invicto Actual", format="%d"),
+                "Sin Ganar Actual": st.column_config.NumberColumn("Sin Ganar Actual", format="%d"),
+            },
+            use_container_width=True,
+            height=600,
+            hide_index=True
+        )
+    
+    # Tabla de forma: la ventana vigente de cada equipo
+    st.markdown("### 🔥 Tabla de Forma")
+    anios_forma = sorted({f[6:10] for f in obtener_valores_unicos("fecha")}, reverse=True)
+    desde_forma = st.selectbox("Equipos con partidos desde", anios_forma, key="tab14_desde_forma")
+    df_forma_liga = obtener_motor_forma(DB).tabla(desde_forma)
+    if df_forma_liga.empty:
+        st.info("No hay equipos con partidos desde ese año.")
+    else:
+        df_forma_liga.index = df_forma_liga.index + 1
+        st.dataframe(df_forma_liga, use_container_width=True, hide_index=False)
+
+# Tab 15: Proyección de campeonato (Monte Carlo)
+with tab15, consultas_protegidas():
+    st.markdown("## 🎲 Proyección de Campeonato")
+    
+    col1, col2 = st.columns([1, 3])
+    
+    with col1:
+        st.markdown("### 🎯 Seleccione Campeonato")
+        anios_disponibles = sorted({f[6:10] for f in obtener_valores_unicos("fecha")}, reverse=True)
+        anio_proy = st.selectbox("Año", anios_disponibles, key="tab15_anio")
+        camp_proy = st.selectbox("Campeonato", obtener_valores_unicos("campeonato"), key="tab15_campeonato")
+        simulaciones = st.selectbox("Simulaciones", [10000, 50000, 100000, 200000], index=2, key="tab15_simulaciones")
+        semilla = st.number_input("Semilla", min_value=0, value=0, step=1, key="tab15_semilla")
+        clasifican = st.number_input("Clasifican por zona", min_value=1, value=4, step=1, key="tab15_clasifican")
+        descienden = st.number_input("Descienden por zona", min_value=0, value=1, step=1, key="tab15_descienden")
+        simular = st.button("▶️ Simular", key="tab15_simular")
+    
+    with col2:
+        if simular and anio_proy and camp_proy:
+            barra = st.progress(0.0, text="Simulando...")
+            df_proy, df_fixture = proyectar_campeonato(
+                anio_proy, camp_proy, simulaciones, int(semilla), int(clasifican), int(descienden), DB,
+                progreso=lambda hechos, total: barra.progress(hechos / total, text=f"Simulando... {hechos}/{total} lotes")
+            )
+            barra.empty()
+            
+            if df_proy.empty:
+                st.warning("⚠️ No hay partidos de fase regular para este campeonato.")
+            else:
+                col_a, col_b = st.columns(2)
+                with col_a:
+                    st.metric("📅 Partidos Restantes", len(df_fixture))
+                with col_b:
+                    st.metric("🎲 Simulaciones", f"{simulaciones:,}".replace(",", "."))
+                
+                if df_fixture.empty:
+                    st.info("📝 La fase regular está completa: las probabilidades reflejan la tabla final.")
+                
+                st.dataframe(
+                    df_proy,
+                    column_config={
+                        "PJ": st.column_config.NumberColumn("PJ", format="%d"),
+                        "Puntos": st.column_config.NumberColumn("PTS", format="%d"),
+                        "DG": st.column_config.NumberColumn("DG", format="%d"),
+                        "Pts Esperados": st.column_config.NumberColumn("PTS Esperados", format="%.1f"),
+                        "% Primero": st.column_config.ProgressColumn("🏆 % Primero", format="%.1f%%", min_value=0, max_value=100),
+                        "% Clasifica": st.column_config.ProgressColumn("✅ % Clasifica", format="%.1f%%", min_value=0, max_value=100),
+                        "% Descenso": st.column_config.ProgressColumn("🔻 % Descenso", format="%.1f%%", min_value=0, max_value=100),
+                    },
+                    use_container_width=True,
+                    height=600,
+                    hide_index=True
+                )
+                
+                if not df_fixture.empty:
+                    st.markdown("### 📋 Fixture Restante (inferido)")
+                    st.dataframe(
+                        df_fixture.rename(columns={"equipo_local": "Local", "equipo_visitante": "Visitante"}),
+                        use_container_width=True,
+                        hide_index=True
+                    )
+
+# Tab 16: Perfil de Jugador
+with tab16, consultas_protegidas():
+    st.markdown("## 👤 Perfil de Jugador")
+    
+    jugador = buscador("Jugador", "jugador", key="tab16_jugador")
+    
+    if jugador:
+        df_carrera = obtener_almacen_carreras(DB).perfil(jugador)
+        
+        if df_carrera.empty:
+            st.info("ℹ️ El jugador no tiene goles ni tarjetas registrados.")
+        else:
+            col1, col2, col3, col4, col5 = st.columns(5)
+            col1.metric("⚽ Goles", int(df_carrera["goles"].sum()))
+            col2.metric("🟨 Amonestaciones", int(df_carrera["amonestaciones"].sum()))
+            col3.metric("🟥 Expulsiones", int(df_carrera["expulsiones"].sum()))
+            col4.metric("📅 Temporadas", df_carrera["temporada"].nunique())
+            col5.metric("🏟️ Clubes", df_carrera["equipo"].nunique())
+            
+            st.markdown("---")
+            st.markdown("### 📋 Temporada por Temporada")
+            st.dataframe(
+                df_carrera.rename(columns={
+                    "temporada": "Temporada",
+                    "equipo": "Club",
+                    "partidos": "Partidos con Gol/Tarjeta",
+                    "goles": "Goles",
+                    "amonestaciones": "Amonestaciones",
+                    "expulsiones": "Expulsiones",
+                }),
+                column_config={"Temporada": st.column_config.NumberColumn("Temporada", format="%d")},
+                use_container_width=True,
+                hide_index=True
+            )
+            
+            por_temporada = df_carrera.groupby(["temporada", "equipo"])["goles"].sum().unstack(fill_value=0)
+            if por_temporada.values.sum() > 0:
+                st.markdown("### 📈 Goles por Temporada")
+                fig, ax = plt.subplots(figsize=(12, 4))
+                por_temporada.plot(kind="bar", stacked=True, ax=ax)
+                ax.set_xlabel("Temporada")
+                ax.set_ylabel("Goles")
+                ax.legend(title="Club", fontsize=8)
+                ax.grid(True, axis="y", alpha=0.3)
+                plt.tight_layout()
+                st.pyplot(fig)
+
+# Tab 17: Entre Ligas
+with tab17, consultas_protegidas():
+    st.markdown("## 🌎 Entre Ligas")
+    
+    if len(LIGAS) < 2:
+        st.info('ℹ️ Hay una sola liga registrada. Para comparar ligas, agregalas en `ligas.json` '
+                '(`{"Nombre de la liga": "ruta/a/la_base.db"}`).')
+    else:
+        elegidas = st.multiselect("Ligas", list(LIGAS), default=list(LIGAS), key="tab17_ligas")
+        ligas_elegidas = tuple((nombre, LIGAS[nombre]) for nombre in elegidas)
+        versiones = tuple(version_db(db) for _, db in ligas_elegidas)
+        
+        if not ligas_elegidas:
+            st.warning("⚠️ Elegí al menos una liga.")
+        else:
+            st.markdown("### ⚽ Goleadores" + (f" {anio}" if anio else " Históricos"))
+            ranking, errores = goleadores_entre_ligas(ligas_elegidas, versiones, anio)
+            for liga_error, error in errores.items():
+                st.warning(f"⚠️ {liga_error}: {error}")
+            if ranking.empty:
+                st.info("No hay goles registrados.")
+            else:
+                st.dataframe(
+                    ranking.rename(columns={"jugador": "Jugador", "goles": "Goles"}),
+                    use_container_width=True,
+                    hide_index=True
+                )
+            
+            st.markdown("---")
+            st.markdown("### ⚔️ Versus Entre Ligas")
+            equipos_ligas = equipos_entre_ligas(ligas_elegidas, versiones)
+            col1, col2 = st.columns(2)
+            with col1:
+                equipo1 = st.selectbox("Equipo 1", equipos_ligas, key="tab17_equipo1")
+            with col2:
+                equipo2 = st.selectbox("Equipo 2", equipos_ligas, index=min(1, len(equipos_ligas) - 1), key="tab17_equipo2")
+            
+            if equipo1 and equipo2 and equipo1 != equipo2:
+                resumen, historial, errores = versus_entre_ligas(ligas_elegidas, versiones, equipo1, equipo2)
+                for liga_error, error in errores.items():
+                    st.warning(f"⚠️ {liga_error}: {error}")
+                if not resumen.get("total_partidos"):
+                    st.info("ℹ️ Estos equipos no se enfrentaron en las ligas elegidas.")
+                else:
+                    col_a, col_b, col_c, col_d = st.columns(4)
+                    col_a.metric("Partidos", resumen["total_partidos"])
+                    col_b.metric(f"✅ {equipo1}", resumen["victorias_eq1"])
+                    col_c.metric("🤝 Empates", resumen["empates"])
+                    col_d.metric(f"✅ {equipo2}", resumen["victorias_eq2"])
+                    st.dataframe(historial, use_container_width=True, hide_index=True)
+
+# Tab 18: Zonas
+with tab18, consultas_protegidas():
+    st.markdown("## 🗺️ Zonas")
+    
+    datos_zonas = vista_zonas(DB, obtener_tabla_en_vivo(DB).version, version_db(DB))
+    
+    if datos_zonas["resumen"].empty:
+        st.warning("⚠️ No hay datos disponibles.")
+    else:
+        st.markdown("### 📊 Resumen por Zona")
+        st.dataframe(datos_zonas["resumen"], use_container_width=True, hide_index=True)
+        
+        st.markdown("---")
+        zona_elegida = st.selectbox("Zona", list(datos_zonas["posiciones"]), key="tab18_zona")
+        col1, col2 = st.columns([3, 2])
+        with col1:
+            st.markdown(f"### 📋 Posiciones - {zona_elegida}")
+            st.dataframe(datos_zonas["posiciones"][zona_elegida], use_container_width=True, hide_index=True)
+        with col2:
+            st.markdown(f"### ⚽ Goleadores - {zona_elegida}")
+            st.dataframe(datos_zonas["goleadores"][zona_elegida], use_container_width=True, hide_index=True)
+        
+        st.markdown("---")
+        df_cruces = datos_zonas["cruces"]
+        if not df_cruces.empty:
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("### 🏠 Dentro de cada Zona")
+                st.dataframe(
+                    df_cruces[df_cruces["Tipo"] == "Dentro de la zona"]
+                    [["Zona A", "PJ", "Empates", "% Empates", "Goles/PJ"]].rename(columns={"Zona A": "Zona"}),
+                    use_container_width=True,
+                    hide_index=True
+                )
+            with col2:
+                st.markdown("### ⚔️ Entre Zonas")
+                st.dataframe(
+                    df_cruces[df_cruces["Tipo"] == "Entre zonas"].drop(columns="Tipo"),
+                    use_container_width=True,
+                    hide_index=True
+                )
+
+# Tab 19: Exportar
+def parametro_exportacion(nombre, parametro, key):
+    """Widget para un argumento de una vista; los opcionales vacíos quedan en None."""
+    opcional = parametro.default is not inspect.Parameter.empty
+    opciones = {
+        "equipo": obtener_equipos, "equipo1": obtener_equipos, "equipo2": obtener_equipos,
+        "campeonato": lambda: obtener_valores_unicos("campeonato"),
+        # columna y tabla van tal cual al SQL: solo valores fijos
+        "columna": lambda: ["campeonato", "instancia", "lugar", "arbitro", "fecha"],
+        "tabla": lambda: ["partidos"],
+    }
+    if nombre == "equipos":
+        valor = st.multiselect("Equipos", obtener_equipos(), key=key)
+    elif nombre in ("arbitro", "jugador"):
+        valor = buscador({"arbitro": "Árbitro", "jugador": "Jugador"}[nombre], nombre, key=key)
+    elif nombre in opciones:
+        valores = ([""] if parametro.default is None else []) + opciones[nombre]()
+        indice = valores.index(parametro.default) if parametro.default in valores else 0
+        valor = st.selectbox(nombre.capitalize(), valores, index=indice, key=key)
+    elif isinstance(parametro.default, bool):
+        valor = st.checkbox(nombre.replace("_", " ").capitalize(), value=parametro.default, key=key)
+    elif isinstance(parametro.default, int) or nombre.endswith("_id"):
+        valor = int(st.number_input(nombre.capitalize(), value=parametro.default if opcional else 1, step=1, key=key))
+    else:
+        valor = st.text_input(nombre.capitalize(), value=parametro.default if isinstance(parametro.default, str) else "", key=key).strip()
+    return None if opcional and valor == "" else valor
+
+with tab19, consultas_protegidas():
+    st.markdown("## ⬇️ Exportar Datos")
+    st.caption("El archivo se genera al descargarlo, por bloques, y queda guardado: "
+               "la misma descarga con los mismos filtros y datos sale al instante.")
+    
+    formatos = descargas.formatos_disponibles()
+    formato = st.radio("Formato", formatos, format_func=lambda f: descargas.FORMATOS[f][0],
+                       horizontal=True, key="tab19_formato")
+    _, mime, extension = descargas.FORMATOS[formato]
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("### 📄 Una Vista")
+        vistas_export = descargas.vistas_exportables()
+        nombre_vista = st.selectbox("Vista", list(vistas_export), key="tab19_vista",
+                                    format_func=lambda n: n.split("_", 1)[1].replace("_", " ").capitalize()
+                                    + (" (como se muestra)" if n.startswith("armar_") else ""))
+        argumentos = {
+            nombre: parametro_exportacion(nombre, parametro, key=f"tab19_{nombre_vista}_{nombre}")
+            for nombre, parametro in inspect.signature(vistas_export[nombre_vista]).parameters.items()
+        }
+        argumentos = {k: v for k, v in argumentos.items() if v is not None}
+        # Se pasa el archivo abierto, no sus bytes; Streamlit igual lo lee entero al servir la descarga
+        st.download_button(
+            "⬇️ Descargar vista",
+            data=lambda: open(descargas.exportar_vista(nombre_vista, argumentos, formato, DB), "rb"),
+            file_name=f"{nombre_vista.split('_', 1)[1]}{extension}",
+            mime=mime,
+            on_click="ignore",
+            key="tab19_descargar_vista",
+        )
+    
+    with col2:
+        st.markdown("### 🗄️ Base Completa")
+        st.caption("Partidos, goles y tarjetas (con fecha, torneo y club) y zonas. "
+                   + ("Una hoja por tabla." if formato == "xlsx" else "Un archivo por tabla, en un .zip."))
+        st.download_button(
+            "⬇️ Descargar base completa",
+            data=lambda: open(descargas.exportar_base(formato, DB), "rb"),
+            file_name=f"{os.path.splitext(os.path.basename(DB))[0]}{extension if formato == 'xlsx' else '.zip'}",
+            mime=mime if formato == "xlsx" else "application/zip",
+            on_click="ignore",
+            key="tab19_descargar_base",
+        )
+
+# Tab 20: Comparar equipos
+MAX_EQUIPOS_COMPARACION = 6
+
+with tab20, consultas_protegidas():
+    st.markdown("## 📉 Comparar Equipos")
+    
+    col1, col2 = st.columns([1, 3])
+    
+    with col1:
+        st.markdown("### 🎯 Seleccione Equipos")
+        equipos_comp = st.multiselect(
+            f"Equipos (hasta {MAX_EQUIPOS_COMPARACION})", obtener_equipos(),
+            max_selections=MAX_EQUIPOS_COMPARACION, key="tab20_equipos"
+        )
+    
+    with col2:
+        if len(equipos_comp) < 2:
+            st.info("Elegí al menos dos equipos para comparar.")
+        else:
+            # Una sola consulta agrupada por (año, equipo) para todos los equipos elegidos
+            df_comp = vista("evolucion_equipos", tuple(sorted(equipos_comp)))
+            if df_comp.empty:
+                st.info("No hay datos para estos equipos.")
+            else:
+                df_comp = df_comp.astype({"equipo": str})
+                df_comp["tarjetas"] = df_comp["amonestaciones"] + df_comp["expulsiones"]
+                series = {
+                    "puntos": "Puntos",
+                    "goles_favor": "Goles a Favor",
+                    "goles_contra": "Goles en Contra",
+                    "tarjetas": "Tarjetas",
+                }
+                anios_comp = sorted(df_comp["anio"].unique())
+                
+                fig, ejes = plt.subplots(len(series), 1, figsize=(12, 3.2 * len(series)), sharex=True)
+                for ax, (columna, titulo) in zip(ejes, series.items()):
+                    tabla = df_comp.pivot(index="anio", columns="equipo", values=columna).reindex(anios_comp)
+                    for equipo_comp in equipos_comp:
+                        if equipo_comp in tabla:
+                            ax.plot(tabla.index, tabla[equipo_comp], marker="o", linewidth=2, label=equipo_comp)
+                    ax.set_ylabel(titulo, fontsize=12, fontweight='bold')
+                    ax.grid(True, alpha=0.3, linestyle='--')
+                ejes[0].set_title("Evolución por año", fontsize=14, fontweight='bold', pad=20)
+                ejes[0].legend(fontsize=10, loc='upper left')
+                ejes[-1].set_xlabel("Año", fontsize=12, fontweight='bold')
+                ejes[-1].tick_params(axis="x", labelrotation=90)
+                plt.tight_layout()
+                st.pyplot(fig)
+                
+                st.markdown("### 📋 Totales")
+                totales_comp = df_comp.groupby("equipo")[
+                    ["partidos", "puntos", "goles_favor", "goles_contra", "amonestaciones", "expulsiones"]
+                ].sum().reindex(equipos_comp).reset_index()
+                st.dataframe(
+                    totales_comp.rename(columns={
+                        "equipo": "Equipo",
+                        "partidos": "PJ",
+                        "puntos": "⭐ Puntos",
+                        "goles_favor": "⚽ Goles a Favor",
+                        "goles_contra": "🥅 Goles en Contra",
+                        "amonestaciones": "🟨 Amonestaciones",
+                        "expulsiones": "🟥 Expulsiones",
+                    }),
+                    use_container_width=True,
+                    hide_index=True
+                )
+
 # =====================================
 # FOOTER
 # =====================================
 st.markdown("---")
 
 st.caption("🏆 Sistema de Estadísticas ⚽ | Liga Deportiva del Sur")
+
+# =====================================
+# PERFIL DE LA CORRIDA
+# =====================================
+if muestreo is not None:
+    perfil = muestreo.detener({f"tab{i}": nombre for i, nombre in enumerate(PESTANIAS, start=1)})
+    ruta_perfil = perfil.guardar()
+    if perfil_pedido:
+        with st.expander("⏱️ Perfil de esta corrida"):
+            st.caption(f"Guardado en `{ruta_perfil}.*` (el .speedscope.json se abre en speedscope.app; "
+                       "el .folded, con flamegraph.pl o inferno).")
+            st.code(perfil.resumen())
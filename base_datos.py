@@ -0,0 +1,133 @@
+import hashlib
+import os
+import sqlite3
+import numpy as np
+import pandas as pd
+
+# =====================================
+# CONFIGURACIÓN DE LA BASE DE DATOS
+# =====================================
+DB = os.environ.get("LDDS_DB", "football_nueva.db")
+DIR_CACHE = os.environ.get("LDDS_CACHE_DIR", ".cache")
+
+
+def version_db(db=DB):
+    """Devuelve un token barato que cambia cada vez que se modifica el archivo de la base."""
+    try:
+        st_db = os.stat(db)
+    except OSError:
+        return None
+    return (st_db.st_mtime_ns, st_db.st_size)
+
+
+def archivo_por_base(prefijo, db, extension):
+    """Ruta en la caché de un archivo propio de la base `db`: '<prefijo>_<nombre>_<hash>.<ext>'.
+    El hash es de la ruta absoluta, así dos ligas con archivos del mismo nombre no comparten nada."""
+    ruta = os.path.abspath(db)
+    nombre = os.path.splitext(os.path.basename(ruta))[0]
+    clave = hashlib.sha1(ruta.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(DIR_CACHE, f"{prefijo}_{nombre}_{clave}{extension}")
+
+
+def calcular_puntos(goles_local, goles_visitante, equipo_local, equipo_visitante, equipo_buscar, anio):
+    puntos_victoria = 3 if int(anio) >= 1995 else 2
+    if goles_local > goles_visitante:
+        return (puntos_victoria, 1, 0, 0) if equipo_local == equipo_buscar else (0, 0, 0, 1)
+    elif goles_local < goles_visitante:
+        return (puntos_victoria, 1, 0, 0) if equipo_visitante == equipo_buscar else (0, 0, 0, 1)
+    else:
+        return (1, 0, 1, 0)
+
+
+def puntos(goles_favor, goles_contra, anio):
+    """Versión vectorizada de la regla de `calcular_puntos`: puntos de cada fila (2 por victoria
+    hasta 1994, 3 desde 1995). `anio` puede venir como número o texto ('1995'), escalar o columna."""
+    gf, gc = np.asarray(goles_favor), np.asarray(goles_contra)
+    victoria = np.where(np.asarray(pd.to_numeric(anio, errors="coerce")) >= 1995, 3, 2)
+    return np.where(gf > gc, victoria, np.where(gf == gc, 1, 0))
+
+
+def grupo_instancia(instancia):
+    """Grupo de fase regular a partir de la instancia ('Zona A - Fecha 3' → 'Zona A').
+    Devuelve None para instancias de eliminación directa."""
+    instancia = (instancia or "").strip()
+    if instancia.lower().startswith("zona"):
+        return " ".join(instancia.split(" - ")[0].split()[:2]).title()
+    if instancia.lower().startswith(("fecha", "interzonal")):
+        return "General"
+    return None
+
+
+def leer_partidos(db=DB, desde_id=0):
+    """Lee los partidos con id mayor a `desde_id` en orden cronológico.
+    Agrega la columna `orden` (yyyymmdd como entero) para ordenar sin parsear fechas."""
+    conn = sqlite3.connect(db)
+    df = pd.read_sql_query("""
+        SELECT
+            p.id,
+            p.fecha,
+            p.campeonato,
+            p.equipo_local,
+            p.equipo_visitante,
+            p.goles_local,
+            p.goles_visitante
+        FROM partidos p
+        WHERE p.id > ?
+          AND p.equipo_local IS NOT NULL AND p.equipo_local <> ''
+          AND p.equipo_visitante IS NOT NULL AND p.equipo_visitante <> ''
+    """, conn, params=(desde_id,))
+    conn.close()
+
+    fecha = df["fecha"].fillna("")
+    df["orden"] = pd.to_numeric(
+        fecha.str[6:10] + fecha.str[3:5] + fecha.str[0:2], errors="coerce"
+    ).fillna(0).astype("int64")
+    df["goles_local"] = pd.to_numeric(df["goles_local"], errors="coerce").fillna(0).astype("int64")
+    df["goles_visitante"] = pd.to_numeric(df["goles_visitante"], errors="coerce").fillna(0).astype("int64")
+    return df.sort_values(["orden", "id"], kind="stable").reset_index(drop=True)
+
+
+def huella_partidos(db=DB, hasta_id=None):
+    """Resumen (cantidad y suma del hash de cada fila) de los partidos con id <= `hasta_id`.
+    Cubre todas las columnas que leen los motores, así que detecta ediciones (nombres, fechas,
+    campeonato, resultados, incluso goles intercambiados entre dos partidos) o bajas."""
+    conn = sqlite3.connect(db)
+    df = pd.read_sql_query("""
+        SELECT id, fecha, campeonato, equipo_local, equipo_visitante, goles_local, goles_visitante
+        FROM partidos
+        WHERE id <= ?
+    """, conn, params=(hasta_id if hasta_id is not None else -1,))
+    conn.close()
+    if df.empty:
+        return (0, 0)
+    # La suma de hashes no depende del orden en que SQLite devuelva las filas
+    suma = int(pd.util.hash_pandas_object(df, index=False).sum())
+    return (len(df), suma)
+
+
+def partidos_por_equipo(df):
+    """Convierte partidos (una fila por partido) en formato largo: una fila por equipo y partido."""
+    local = pd.DataFrame({
+        "id": df["id"].values,
+        "orden": df["orden"].values,
+        "fecha": df["fecha"].values,
+        "campeonato": df["campeonato"].values,
+        "equipo": df["equipo_local"].values,
+        "rival": df["equipo_visitante"].values,
+        "lugar": "Local",
+        "gf": df["goles_local"].values,
+        "gc": df["goles_visitante"].values,
+    })
+    visitante = pd.DataFrame({
+        "id": df["id"].values,
+        "orden": df["orden"].values,
+        "fecha": df["fecha"].values,
+        "campeonato": df["campeonato"].values,
+        "equipo": df["equipo_visitante"].values,
+        "rival": df["equipo_local"].values,
+        "lugar": "Visitante",
+        "gf": df["goles_visitante"].values,
+        "gc": df["goles_local"].values,
+    })
+    largo = pd.concat([local, visitante], ignore_index=True)
+    return largo.sort_values(["equipo", "orden", "id"], kind="stable").reset_index(drop=True)
@@ -0,0 +1,123 @@
+import sqlite3
+import unicodedata
+from bisect import bisect_left
+from functools import lru_cache
+
+from base_datos import DB
+
+# =====================================
+# BÚSQUEDA GLOBAL (ÍNDICE DE PREFIJOS)
+# =====================================
+TIPOS = {
+    "equipo": "🏟️",
+    "jugador": "👤",
+    "arbitro": "⚖️",
+    "campeonato": "🏆",
+}
+
+
+def normalizar(texto):
+    """Minúsculas y sin acentos: 'Nicolás' → 'nicolas'."""
+    texto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+def _palabras(texto):
+    return [p for p in "".join(c if c.isalnum() else " " for c in normalizar(texto)).split() if p]
+
+
+def leer_entidades(db=DB):
+    """(tipo, nombre, popularidad) de equipos, jugadores, árbitros y campeonatos."""
+    conn = sqlite3.connect(db)
+    consultas = {
+        "equipo": """
+            SELECT equipo, COUNT(*) FROM (
+                SELECT equipo_local AS equipo FROM partidos
+                UNION ALL
+                SELECT equipo_visitante FROM partidos
+            ) GROUP BY equipo
+        """,
+        "jugador": """
+            SELECT jugador, SUM(peso) FROM (
+                SELECT jugador, 3 AS peso FROM goles
+                UNION ALL
+                SELECT jugador, 1 FROM tarjetas
+            ) GROUP BY jugador
+        """,
+        "arbitro": "SELECT arbitro, COUNT(*) FROM partidos GROUP BY arbitro",
+        "campeonato": "SELECT campeonato, COUNT(*) FROM partidos GROUP BY campeonato",
+    }
+    entidades = []
+    for tipo, query in consultas.items():
+        for nombre, popularidad in conn.execute(query):
+            if nombre and nombre.strip():
+                entidades.append((tipo, nombre.strip(), int(popularidad or 0)))
+    conn.close()
+    return entidades
+
+
+class IndiceBusqueda:
+    """Índice en memoria de todos los nombres para sugerencias mientras se escribe.
+
+    Cada nombre se parte en palabras normalizadas (sin acentos); las palabras distintas se
+    guardan ordenadas, así que las que empiezan con un prefijo forman un rango contiguo que
+    se ubica con búsqueda binaria. Los candidatos de cada prefijo, ordenados por popularidad,
+    se memorizan: las consultas repetidas o que se van extendiendo letra a letra no recorren nada."""
+
+    def __init__(self, entidades):
+        self._entidades = sorted(entidades, key=lambda e: -e[2])  # id = posición, por popularidad
+        self._nombres = [normalizar(nombre) for _, nombre, _ in self._entidades]
+        por_palabra = {}
+        for i, (_, nombre, _) in enumerate(self._entidades):
+            for palabra in set(_palabras(nombre)):
+                por_palabra.setdefault(palabra, []).append(i)
+        self._palabras = sorted(por_palabra)
+        self._ids = [por_palabra[p] for p in self._palabras]
+        self._candidatos = lru_cache(maxsize=4096)(self._candidatos_sin_cache)
+        self._conjunto = lru_cache(maxsize=1024)(lambda prefijo: frozenset(self._candidatos(prefijo)))
+        # Los prefijos de una y dos letras son los más caros y los primeros que se escriben
+        for prefijo in sorted({p[:n] for p in self._palabras for n in (1, 2)}):
+            self._candidatos(prefijo)
+
+    @classmethod
+    def desde_db(cls, db=DB):
+        return cls(leer_entidades(db))
+
+    def __len__(self):
+        return len(self._entidades)
+
+    def _rango(self, prefijo):
+        return bisect_left(self._palabras, prefijo), bisect_left(self._palabras, prefijo + "\uffff")
+
+    def _candidatos_sin_cache(self, prefijo):
+        """Ids con alguna palabra que empieza con `prefijo`, de más a menos popular."""
+        desde, hasta = self._rango(prefijo)
+        if hasta - desde == 1:
+            return tuple(self._ids[desde])
+        return tuple(sorted({i for ids in self._ids[desde:hasta] for i in ids}))
+
+    def buscar(self, texto, limite=10, tipos=None):
+        """Mejores `limite` sugerencias [(tipo, nombre)] para `texto`: cada palabra escrita debe ser
+        prefijo de alguna palabra del nombre. Primero los nombres que empiezan con lo escrito,
+        luego por popularidad (partidos, goles, etc.)."""
+        consulta = _palabras(texto)
+        if not consulta:
+            return []
+        # Se recorre el prefijo más selectivo y se filtra por los demás
+        rangos = {p: self._rango(p) for p in consulta}
+        guia = min(consulta, key=lambda p: rangos[p][1] - rangos[p][0])
+        otros = [p for p in consulta if p != guia]
+        inicio = normalizar(texto).strip()
+
+        encontrados = []
+        for i in self._candidatos(guia):
+            tipo = self._entidades[i][0]
+            if tipos and tipo not in tipos:
+                continue
+            if otros and not all(i in self._conjunto(p) for p in otros):
+                continue
+            encontrados.append(i)
+            if len(encontrados) >= 5 * limite:
+                break
+        encontrados.sort(key=lambda i: (not self._nombres[i].startswith(inicio), i))
+        return [self._entidades[i][:2] for i in encontrados[:limite]]
@@ -0,0 +1,409 @@
+import argparse
+import hashlib
+import multiprocessing
+import os
+import pickle
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from base_datos import DB, DIR_CACHE, archivo_por_base
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo de archivos, un cálculo se da por abandonado si su proceso no existe
+    fcntl = None
+
+# =====================================
+# CACHÉ DE RESULTADOS EN DISCO
+# =====================================
+MAX_MB = float(os.environ.get("LDDS_CACHE_DISCO_MB", "256"))
+REFRESCO_USO = 60  # segundos: la marca de uso de una entrada se escribe como mucho una vez por minuto
+PLAZO_CALCULO = float(os.environ.get("LDDS_CACHE_PLAZO", "120"))  # segundos: un cálculo más largo se da por abandonado
+ESPERA_MINIMA, ESPERA_MAXIMA = 0.02, 0.25  # segundos entre lecturas mientras otro proceso calcula
+VIDA_SIN_GUARDAR = 3600  # segundos que se recuerda que una clave no entra en la caché
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS resultados (
+    clave TEXT PRIMARY KEY,
+    funcion TEXT NOT NULL,
+    valor BLOB NOT NULL,
+    tamanio INTEGER NOT NULL,
+    usado REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_resultados_usado ON resultados (usado);
+CREATE TABLE IF NOT EXISTS calculos (
+    clave TEXT PRIMARY KEY,
+    pid INTEGER NOT NULL,
+    nodo TEXT NOT NULL,
+    inicio REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sin_guardar (
+    clave TEXT PRIMARY KEY,
+    marcado REAL NOT NULL
+);
+"""
+
+
+def ruta_cache(db):
+    return archivo_por_base("resultados", db, ".db")
+
+
+def huella_codigo(directorio=os.path.dirname(os.path.abspath(__file__))):
+    """Hash de los .py de la app: un deploy con otro código no reutiliza resultados viejos."""
+    h = hashlib.sha1()
+    for nombre in sorted(os.listdir(directorio)):
+        if nombre.endswith(".py"):
+            with open(os.path.join(directorio, nombre), "rb") as f:
+                h.update(nombre.encode())
+                h.update(f.read())
+    return h.hexdigest()
+
+
+def _vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _normalizar(valor):
+    """Listas → tuplas y escalares de numpy → Python, para que argumentos iguales den la misma clave."""
+    if isinstance(valor, (list, tuple)):
+        return tuple(_normalizar(v) for v in valor)
+    if isinstance(valor, dict):
+        return tuple(sorted((k, _normalizar(v)) for k, v in valor.items()))
+    if hasattr(valor, "item") and not isinstance(valor, (str, bytes)):
+        return valor.item()
+    return valor
+
+
+class CacheDisco:
+    """Resultados serializados (pickle protocolo 5) en una base SQLite dentro de la caché, debajo
+    de `st.cache_data`: un proceso nuevo (deploy, reinicio o réplica) encuentra los resultados ya
+    calculados. La clave es (función, argumentos normalizados, versión de los datos, código de la
+    app). Se poda por LRU al superar `max_bytes`. En modo WAL varios procesos la leen y escriben a
+    la vez; cualquier error de la caché se trata como un fallo de caché, nunca rompe la vista.
+
+    Con varios procesos de `streamlit run` detrás de un proxy, todos comparten esta base: lo que
+    calcula uno lo leen los demás, y las lecturas por mmap usan las mismas páginas del sistema en
+    todos los procesos. `calcular` evita cálculos repetidos: si diez procesos piden a la vez la misma
+    clave ausente, uno la calcula (registrado en `calculos`) y los demás esperan su resultado.
+    Si el resultado no se puede guardar (demasiado grande o no serializable), la clave queda en
+    `sin_guardar` y los que esperaban la calculan enseguida, cada uno por su cuenta, sin hacer cola."""
+
+    def __init__(self, db=DB, ruta=None, max_bytes=None):
+        self.ruta = ruta or ruta_cache(db)
+        self.max_bytes = int(max_bytes if max_bytes is not None else MAX_MB * 2 ** 20)
+        self._codigo = huella_codigo()
+        self._local = threading.local()
+        self._nodo = socket.gethostname()
+        self._candados = {}
+        self._candados_lock = threading.Lock()
+        self._dir_calculos = self.ruta + ".calculos"
+        self._archivos = {}
+        self.aciertos = 0
+        self.fallos = 0
+        self.esperas = 0  # resultados que calculó otro proceso mientras este esperaba
+        os.makedirs(os.path.dirname(self.ruta) or ".", exist_ok=True)
+        os.makedirs(self._dir_calculos, exist_ok=True)
+        conn = self._conectar()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(ESQUEMA)
+
+    def _conectar(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={2 * self.max_bytes}")
+            self._local.conn = conn
+        return conn
+
+    def clave(self, funcion, args, version):
+        datos = pickle.dumps((self._codigo, funcion, _normalizar(args), _normalizar(version)), protocol=5)
+        return hashlib.sha1(datos).hexdigest()
+
+    # ---------- lectura y escritura ----------
+    def _leer(self, clave):
+        try:
+            conn = self._conectar()
+            fila = conn.execute("SELECT valor, usado FROM resultados WHERE clave = ?", (clave,)).fetchone()
+            if fila is None:
+                return False, None
+            valor = pickle.loads(fila[0])
+            ahora = time.time()
+            if ahora - fila[1] > REFRESCO_USO:
+                conn.execute("UPDATE resultados SET usado = ? WHERE clave = ?", (ahora, clave))
+        except (sqlite3.Error, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return False, None
+        return True, valor
+
+    def _escribir(self, clave, funcion, valor):
+        """Guarda el valor y libera el cálculo registrado de la clave, en la misma transacción.
+        Si el valor no se puede guardar, anota la clave en `sin_guardar` para que nadie la espere."""
+        try:
+            datos = pickle.dumps(valor, protocol=5)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            datos = None
+        if datos is not None and len(datos) > self.max_bytes // 4:
+            datos = None  # una sola entrada no puede desplazar a casi toda la caché
+        try:
+            conn = self._conectar()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if datos is not None:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO resultados (clave, funcion, valor, tamanio, usado) VALUES (?, ?, ?, ?, ?)",
+                        (clave, funcion, datos, len(datos), time.time()),
+                    )
+                    self._podar(conn)
+                else:
+                    ahora = time.time()
+                    conn.execute("DELETE FROM sin_guardar WHERE marcado < ?", (ahora - VIDA_SIN_GUARDAR,))
+                    conn.execute("INSERT OR REPLACE INTO sin_guardar (clave, marcado) VALUES (?, ?)", (clave, ahora))
+                conn.execute("DELETE FROM calculos WHERE clave = ? AND pid = ? AND nodo = ?",
+                             (clave, os.getpid(), self._nodo))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            pass
+
+    def obtener(self, funcion, args, version):
+        """(True, valor) si está en disco; (False, None) si no."""
+        encontrado, valor = self._leer(self.clave(funcion, args, version))
+        if encontrado:
+            self.aciertos += 1
+        else:
+            self.fallos += 1
+        return encontrado, valor
+
+    def guardar(self, funcion, args, version, valor):
+        self._escribir(self.clave(funcion, args, version), funcion, valor)
+
+    def _podar(self, conn):
+        """Borra las entradas usadas hace más tiempo hasta quedar en el 90 % del máximo."""
+        total = conn.execute("SELECT TOTAL(tamanio) FROM resultados").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        sobrante = total - 0.9 * self.max_bytes
+        borrar = []
+        for clave, tamanio in conn.execute("SELECT clave, tamanio FROM resultados ORDER BY usado"):
+            borrar.append((clave,))
+            sobrante -= tamanio
+            if sobrante <= 0:
+                break
+        conn.executemany("DELETE FROM resultados WHERE clave = ?", borrar)
+
+    # ---------- un solo cálculo por clave ----------
+    @contextmanager
+    def _exclusivo(self, clave):
+        """Un solo hilo por clave dentro del proceso; el candado se descarta cuando nadie lo usa."""
+        with self._candados_lock:
+            candado, usos = self._candados.get(clave, (None, 0))
+            candado = candado or threading.Lock()
+            self._candados[clave] = (candado, usos + 1)
+        try:
+            with candado:
+                yield
+        finally:
+            with self._candados_lock:
+                candado, usos = self._candados[clave]
+                if usos == 1:
+                    del self._candados[clave]
+                else:
+                    self._candados[clave] = (candado, usos - 1)
+
+    def _abandonado(self, pid, nodo, inicio):
+        return time.time() - inicio > PLAZO_CALCULO or (nodo == self._nodo and not _vivo(pid))
+
+    def _bloquear(self, clave):
+        """Toma el archivo de bloqueo de la clave; el sistema lo suelta en cuanto el proceso termina
+        (aunque muera sin avisar), así que poder tomarlo indica que nadie está calculando."""
+        if fcntl is None:
+            return True
+        fd = os.open(os.path.join(self._dir_calculos, clave), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._archivos[clave] = fd
+        return True
+
+    def _desbloquear(self, clave):
+        fd = self._archivos.pop(clave, None)
+        if fd is not None:
+            try:
+                os.unlink(os.path.join(self._dir_calculos, clave))
+            except OSError:
+                pass
+            os.close(fd)
+
+    def _reservar(self, clave):
+        """Intenta registrar el cálculo de `clave` a nombre de este proceso. Devuelve "hecho" si el
+        resultado ya está, "sin_guardar" si no entra en la caché (se calcula sin registrar ni
+        esperar), "ajeno" si otro proceso vivo lo está calculando y "propio" si le toca a este
+        (también si la caché falla: en ese caso se calcula sin registrar)."""
+        try:
+            conn = self._conectar()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if conn.execute("SELECT 1 FROM resultados WHERE clave = ?", (clave,)).fetchone():
+                    estado = "hecho"
+                elif conn.execute("SELECT 1 FROM sin_guardar WHERE clave = ?", (clave,)).fetchone():
+                    estado = "sin_guardar"
+                else:
+                    fila = conn.execute("SELECT pid, nodo, inicio FROM calculos WHERE clave = ?", (clave,)).fetchone()
+                    libre = fila is None or fcntl is not None or self._abandonado(*fila)
+                    # El bloqueo se toma antes de publicar el registro: quien lo vea, lo ve tomado
+                    if libre and self._bloquear(clave):
+                        conn.execute("INSERT OR REPLACE INTO calculos (clave, pid, nodo, inicio) VALUES (?, ?, ?, ?)",
+                                     (clave, os.getpid(), self._nodo, time.time()))
+                        estado = "propio"
+                    else:
+                        estado = "ajeno"
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                self._desbloquear(clave)
+                raise
+        except (sqlite3.Error, OSError):
+            return "propio"
+        return estado
+
+    def _liberar(self, clave):
+        try:
+            self._conectar().execute("DELETE FROM calculos WHERE clave = ? AND pid = ? AND nodo = ?",
+                                     (clave, os.getpid(), self._nodo))
+        except sqlite3.Error:
+            pass
+        self._desbloquear(clave)
+
+    def calcular(self, funcion, args, version, calculo):
+        """Resultado de `calculo()` para (funcion, args, version), desde el disco si ya estaba.
+        Si otro hilo u otro proceso lo está calculando, espera su resultado en lugar de repetirlo;
+        si ese cálculo falla, se cuelga o su proceso muere, lo retoma uno de los que esperaban."""
+        clave = self.clave(funcion, args, version)
+        encontrado, valor = self._leer(clave)
+        if encontrado:
+            self.aciertos += 1
+            return valor
+
+        with self._exclusivo(clave):
+            limite = time.monotonic() + PLAZO_CALCULO
+            espera = ESPERA_MINIMA
+            estado = esperando = None
+            while True:
+                encontrado, valor = self._leer(clave)
+                if encontrado:
+                    if esperando:
+                        self.esperas += 1
+                    else:
+                        self.aciertos += 1
+                    return valor
+                if estado == "hecho":
+                    break  # está guardado pero no se pudo leer: se calcula de nuevo
+                estado = self._reservar(clave)
+                if estado in ("propio", "sin_guardar") or time.monotonic() > limite:
+                    break
+                if estado == "ajeno":
+                    esperando = True
+                    time.sleep(espera)
+                    espera = min(espera * 2, ESPERA_MAXIMA)
+
+            if estado != "sin_guardar":
+                self.fallos += 1
+                try:
+                    valor = calculo()
+                except BaseException:
+                    self._liberar(clave)
+                    raise
+                self._escribir(clave, funcion, valor)
+                self._desbloquear(clave)
+                return valor
+
+        # No entra en la caché: se calcula fuera del candado, a la par de los otros hilos
+        self.fallos += 1
+        return calculo()
+
+    # ---------- mantenimiento ----------
+    def estadisticas(self):
+        """(entradas, bytes) guardados."""
+        try:
+            return tuple(self._conectar().execute("SELECT COUNT(*), TOTAL(tamanio) FROM resultados").fetchone())
+        except sqlite3.Error:
+            return 0, 0
+
+    def vaciar(self):
+        try:
+            conn = self._conectar()
+            conn.execute("DELETE FROM resultados")
+            conn.execute("DELETE FROM calculos")
+            conn.execute("DELETE FROM sin_guardar")
+        except sqlite3.Error:
+            pass
+
+
+# =====================================
+# PRUEBA LOCAL: VARIOS PROCESOS PIDIENDO LA MISMA CLAVE
+# =====================================
+def _trabajador(ruta, barrera, segundos, cola):
+    cache = CacheDisco(ruta=ruta)
+    calculos = []
+
+    def calculo():
+        calculos.append(os.getpid())
+        time.sleep(segundos)
+        return list(range(1000))
+
+    barrera.wait()
+    inicio = time.perf_counter()
+    valor = cache.calcular("prueba", ("misma clave",), 1, calculo)
+    cola.put((len(calculos), cache.esperas, time.perf_counter() - inicio, len(valor)))
+
+
+def probar(procesos=10, segundos=1.0, ruta=None):
+    """Lanza `procesos` procesos que piden a la vez la misma clave ausente. Devuelve
+    (cálculos hechos, procesos que esperaron el resultado ajeno, demora máxima)."""
+    ruta = ruta or os.path.join(DIR_CACHE, "prueba_cache.db")
+    for sufijo in ("", "-wal", "-shm"):
+        if os.path.exists(ruta + sufijo):
+            os.remove(ruta + sufijo)
+    CacheDisco(ruta=ruta)
+    contexto = multiprocessing.get_context("spawn")
+    barrera, cola = contexto.Barrier(procesos), contexto.Queue()
+    hijos = [contexto.Process(target=_trabajador, args=(ruta, barrera, segundos, cola)) for _ in range(procesos)]
+    for hijo in hijos:
+        hijo.start()
+    resultados = [cola.get() for _ in hijos]
+    for hijo in hijos:
+        hijo.join()
+    return (sum(r[0] for r in resultados), sum(r[1] for r in resultados), max(r[2] for r in resultados))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Caché de resultados compartida entre procesos.")
+    parser.add_argument("accion", choices=["estado", "vaciar", "probar"])
+    parser.add_argument("--db", default=DB, help=f"Base de datos (por defecto: {DB})")
+    parser.add_argument("--procesos", type=int, default=10, help="Procesos para 'probar' (por defecto: 10)")
+    parser.add_argument("--segundos", type=float, default=1.0, help="Duración del cálculo simulado en 'probar'")
+    args = parser.parse_args()
+
+    if args.accion == "probar":
+        calculos, esperas, demora = probar(args.procesos, args.segundos)
+        print(f"{args.procesos} procesos, misma clave: {calculos} cálculo(s), {esperas} esperaron el resultado, "
+              f"demora máxima {demora:.2f} s")
+    elif args.accion == "vaciar":
+        CacheDisco(args.db).vaciar()
+        print("✅ Caché vaciada")
+    else:
+        entradas, tamanio = CacheDisco(args.db).estadisticas()
+        print(f"{entradas} resultados, {tamanio / 2 ** 20:.1f} MB en {ruta_cache(args.db)}")
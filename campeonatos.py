@@ -0,0 +1,143 @@
+import sqlite3
+
+import pandas as pd
+
+from base_datos import DB, grupo_instancia, puntos
+
+# =====================================
+# POSICIONES POR CAMPEONATO CON DESEMPATES
+# =====================================
+# Orden: puntos; entre los empatados, mini-liga de sus enfrentamientos (puntos, diferencia y
+# goles a favor, y de nuevo entre los que sigan empatados); luego diferencia de gol y goles a
+# favor generales y, si todo coincide, orden alfabético.
+COLUMNAS = ["PJ", "PG", "PE", "PP", "GF", "GC", "DG", "Puntos"]
+
+
+def leer_hechos(db=DB):
+    """Partidos de fase regular de todos los campeonatos, una fila por equipo y partido,
+    con los puntos que sumó (2 por victoria hasta 1994, 3 desde 1995)."""
+    conn = sqlite3.connect(db)
+    df = pd.read_sql_query("""
+        SELECT
+            p.id,
+            p.fecha,
+            p.campeonato,
+            p.instancia,
+            p.equipo_local,
+            p.equipo_visitante,
+            p.goles_local,
+            p.goles_visitante
+        FROM partidos p
+        WHERE p.equipo_local IS NOT NULL AND p.equipo_local <> ''
+          AND p.equipo_visitante IS NOT NULL AND p.equipo_visitante <> ''
+          AND p.campeonato IS NOT NULL AND p.campeonato <> ''
+    """, conn)
+    conn.close()
+
+    df["grupo"] = df["instancia"].map(grupo_instancia)
+    df = df[df["grupo"].notna()]
+    anio = df["fecha"].fillna("").str[6:10]
+    gl = pd.to_numeric(df["goles_local"], errors="coerce").fillna(0).astype("int64").to_numpy()
+    gv = pd.to_numeric(df["goles_visitante"], errors="coerce").fillna(0).astype("int64").to_numpy()
+    comun = {"id": df["id"].to_numpy(), "anio": anio.to_numpy(), "campeonato": df["campeonato"].to_numpy(),
+             "grupo": df["grupo"].to_numpy()}
+    hechos = pd.concat([
+        pd.DataFrame({**comun, "equipo": df["equipo_local"].to_numpy(), "rival": df["equipo_visitante"].to_numpy(),
+                      "gf": gl, "gc": gv}),
+        pd.DataFrame({**comun, "equipo": df["equipo_visitante"].to_numpy(), "rival": df["equipo_local"].to_numpy(),
+                      "gf": gv, "gc": gl}),
+    ], ignore_index=True)
+    hechos["puntos"] = puntos(hechos["gf"], hechos["gc"], hechos["anio"])
+    return hechos
+
+
+def acumular(hechos):
+    """Totales de todos los equipos de todos los campeonatos en una sola agrupación,
+    indexados por (anio, campeonato, equipo), con la zona de cada equipo en su campeonato."""
+    totales = hechos.assign(
+        PG=hechos["gf"] > hechos["gc"], PE=hechos["gf"] == hechos["gc"], PP=hechos["gf"] < hechos["gc"],
+    ).groupby(["anio", "campeonato", "equipo"]).agg(
+        PJ=("id", "size"), PG=("PG", "sum"), PE=("PE", "sum"), PP=("PP", "sum"),
+        GF=("gf", "sum"), GC=("gc", "sum"), Puntos=("puntos", "sum"),
+    )
+    totales["DG"] = totales["GF"] - totales["GC"]
+    # Zona: la de sus partidos de zona (los interzonales no la definen)
+    de_zona = hechos[hechos["grupo"] != "General"]
+    zona = de_zona.groupby(["anio", "campeonato", "equipo"])["grupo"].agg(lambda s: s.mode().iloc[0])
+    totales["Zona"] = zona.reindex(totales.index).fillna("General")
+    return totales[["Zona"] + COLUMNAS]
+
+
+def campeonatos_disponibles(totales):
+    """[(anio, campeonato)] del más reciente al más antiguo."""
+    return sorted({(a, c) for a, c, _ in totales.index}, key=lambda t: (t[0], t[1]), reverse=True)
+
+
+def _mini_liga(equipos, partidos):
+    """(puntos, diferencia, goles a favor) de cada equipo contando solo los partidos entre `equipos`."""
+    entre = partidos[partidos["equipo"].isin(equipos) & partidos["rival"].isin(equipos)]
+    suma = entre.groupby("equipo")[["puntos", "gf", "gc"]].sum().reindex(equipos, fill_value=0)
+    return {e: (p, gf - gc, gf) for e, p, gf, gc in suma.itertuples()}
+
+
+def _corridas(equipos, claves):
+    """`equipos` ordenados por su clave (de mayor a menor), agrupados en corridas de claves iguales."""
+    ordenados = sorted(equipos, key=lambda e: claves[e], reverse=True)
+    corridas = []
+    for e in ordenados:
+        if corridas and claves[corridas[-1][0]] == claves[e]:
+            corridas[-1].append(e)
+        else:
+            corridas.append([e])
+    return corridas
+
+
+def _desempatar(equipos, tabla, partidos):
+    """[(equipo, criterio)] de un grupo empatado en puntos. La mini-liga se arma solo con los
+    partidos entre los empatados y se vuelve a aplicar a cada subgrupo que siga empatado."""
+    orden = []
+    corridas = _corridas(equipos, _mini_liga(equipos, partidos))
+    for corrida in corridas:
+        if len(corrida) == 1:
+            orden.append((corrida[0], "Enfrentamientos"))
+        elif len(corridas) > 1:
+            orden += _desempatar(corrida, tabla, partidos)
+        else:
+            # La mini-liga no separa a nadie: diferencia de gol y goles a favor generales
+            generales = {e: (tabla.at[e, "DG"], tabla.at[e, "GF"]) for e in corrida}
+            for resto in _corridas(corrida, generales):
+                for e in sorted(resto):
+                    if len(resto) > 1:
+                        criterio = "Orden alfabético"
+                    elif sum(generales[o][0] == generales[e][0] for o in corrida) == 1:
+                        criterio = "Diferencia de gol"
+                    else:
+                        criterio = "Goles a favor"
+                    orden.append((e, criterio))
+    return orden
+
+
+def _ordenar_zona(tabla, partidos):
+    orden = []
+    for corrida in _corridas(list(tabla.index), tabla["Puntos"].to_dict()):
+        if len(corrida) == 1:
+            orden.append((corrida[0], ""))
+        else:
+            orden += _desempatar(corrida, tabla, partidos)
+    return orden
+
+
+def posiciones(hechos, totales, anio, campeonato):
+    """Tabla de un campeonato (una por zona si las tiene) con la posición de cada equipo y,
+    para los empatados en puntos, el criterio que definió su lugar."""
+    try:
+        tabla = totales.loc[(str(anio), campeonato)]
+    except KeyError:
+        return pd.DataFrame(columns=["Zona", "Pos", "Equipo"] + COLUMNAS + ["Desempate"])
+    partidos = hechos[(hechos["anio"] == str(anio)) & (hechos["campeonato"] == campeonato)]
+    filas = []
+    for zona, de_zona in tabla.groupby("Zona", sort=True):
+        for pos, (equipo, criterio) in enumerate(_ordenar_zona(de_zona, partidos), start=1):
+            filas.append((zona, pos, equipo, *de_zona.loc[equipo, COLUMNAS], criterio))
+    df = pd.DataFrame(filas, columns=["Zona", "Pos", "Equipo"] + COLUMNAS + ["Desempate"])
+    return df.astype({c: "int64" for c in ["Pos"] + COLUMNAS})
@@ -0,0 +1,258 @@
+"""Prueba de carga local: N usuarios concurrentes navegando la app con `AppTest`.
+
+Uso:
+    python carga.py --usuarios 8 --acciones 20 [--sintetica 20000] [--salida carga.json] [--comparar previa.json]
+
+Cada usuario es una sesión independiente de Streamlit dentro del mismo proceso (comparten
+cachés como en `streamlit run`) que elige equipos en Campañas/Versus/Rendimiento y cambia
+el año del sidebar. Las pestañas se dibujan completas en cada rerun, así que "cambiar de
+pestaña" equivale a un rerun. Se reportan percentiles de latencia por rerun, throughput,
+CPU y RSS, y se guardan en JSON para comparar corridas.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+DIR_APP = os.path.dirname(os.path.abspath(__file__))
+
+
+# =====================================
+# BASE SINTÉTICA
+# =====================================
+def generar_db_sintetica(ruta, partidos, semilla=0, db_modelo=os.path.join(DIR_APP, "football_nueva.db")):
+    """Crea una base con el mismo esquema que la real y `partidos` partidos aleatorios (con goles y tarjetas)."""
+    rng = random.Random(semilla)
+    modelo = sqlite3.connect(db_modelo)
+    esquema = [sql for (sql,) in modelo.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name <> 'sqlite_sequence'"
+    )]
+    modelo.close()
+
+    if os.path.exists(ruta):
+        os.remove(ruta)
+    conn = sqlite3.connect(ruta)
+    for sql in esquema:
+        conn.execute(sql)
+
+    equipos = [f"Club Sintético {i:02d}" for i in range(1, 25)]
+    arbitros = [f"Árbitro {i:02d}, Nombre" for i in range(1, 41)]
+    jugadores = {e: [f"Jugador{j:02d}, {e.split()[-1]}" for j in range(1, 31)] for e in equipos}
+    conn.executemany("INSERT INTO equipos_zonas (equipo, zona) VALUES (?, ?)",
+                     [(e, "Zona A" if i % 2 == 0 else "Zona B") for i, e in enumerate(equipos)])
+
+    filas_partidos, filas_goles, filas_tarjetas = [], [], []
+    for partido_id in range(1, partidos + 1):
+        local, visitante = rng.sample(equipos, 2)
+        anio = rng.randint(1990, 2025)
+        fecha = f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{anio}"
+        gl, gv = rng.choice([0, 0, 1, 1, 1, 2, 2, 3, 4]), rng.choice([0, 0, 1, 1, 2, 2, 3])
+        arbitro = rng.choice(arbitros)
+        filas_partidos.append((partido_id, fecha, local, gl, visitante, gv,
+                               rng.choice(["1° Torneo", "2° Torneo"]),
+                               f"Zona A - Fecha {rng.randint(1, 15)}", local.split()[-1], arbitro))
+        for lado, equipo, goles in (("Local", local, gl), ("Visitante", visitante, gv)):
+            filas_goles += [(partido_id, lado, rng.choice(jugadores[equipo])) for _ in range(goles)]
+            for _ in range(rng.randint(0, 3)):
+                filas_tarjetas.append((partido_id, arbitro, lado, rng.choice(jugadores[equipo]),
+                                       "Expulsado" if rng.random() < 0.1 else "Amonestado"))
+
+    conn.executemany("""
+        INSERT INTO partidos (id, fecha, equipo_local, goles_local, equipo_visitante, goles_visitante,
+                              campeonato, instancia, lugar, arbitro)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, filas_partidos)
+    conn.executemany("INSERT INTO goles (partido_id, equipo, jugador) VALUES (?, ?, ?)", filas_goles)
+    conn.executemany("INSERT INTO tarjetas (partido_id, arbitro, equipo, jugador, tipo) VALUES (?, ?, ?, ?, ?)",
+                     filas_tarjetas)
+    conn.commit()
+    conn.close()
+    return ruta
+
+
+# =====================================
+# SESIONES SIMULADAS
+# =====================================
+def _rss_mb():
+    """RSS actual del proceso en MB (Linux); si no está disponible, el máximo histórico."""
+    try:
+        with open("/proc/self/status") as f:
+            for linea in f:
+                if linea.startswith("VmRSS:"):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _acciones(at, rng, equipos, anios):
+    """Acciones posibles de un usuario sobre la sesión `at` (cada una termina en un rerun)."""
+    return {
+        "campanias_equipo": lambda: at.selectbox(key="tab10_equipo").select(rng.choice(equipos)),
+        "versus_equipos": lambda: (at.selectbox(key="tab11_equipo1").select(rng.choice(equipos)),
+                                   at.selectbox(key="tab11_equipo2").select(rng.choice(equipos))),
+        "rendimiento_equipo": lambda: at.selectbox(key="tab7_equipo").select(rng.choice(equipos)),
+        "evol_puntos_equipo": lambda: at.selectbox(key="tab13_equipo").select(rng.choice(equipos)),
+        "anio_sidebar": lambda: at.text_input(key="sidebar_anio").input(rng.choice(anios)),
+        "cambio_pestania": lambda: None,
+    }
+
+
+def _usuario(numero, acciones, semilla, pausa, mediciones, errores, lock):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(semilla + numero)
+    at = AppTest.from_file(os.path.join(DIR_APP, "app.py"), default_timeout=300)
+
+    inicio = time.perf_counter()
+    at.run()
+    with lock:
+        mediciones.append(("inicio", time.perf_counter() - inicio))
+
+    equipos = list(at.selectbox(key="tab10_equipo").options) or [""]
+    anios = [str(a) for a in range(1990, 2026)] + [""]
+    posibles = _acciones(at, rng, equipos, anios)
+    for _ in range(acciones):
+        nombre = rng.choice(list(posibles))
+        posibles[nombre]()
+        inicio = time.perf_counter()
+        at.run()
+        duracion = time.perf_counter() - inicio
+        with lock:
+            mediciones.append((nombre, duracion))
+            if at.exception:
+                errores.append(f"{nombre}: {at.exception[0].value}")
+        if pausa:
+            time.sleep(rng.uniform(0, 2 * pausa))
+
+
+def _percentiles(valores):
+    valores = sorted(valores)
+    if not valores:
+        return {}
+
+    def p(q):
+        return round(1000 * valores[min(len(valores) - 1, int(q * len(valores)))], 1)
+
+    return {
+        "n": len(valores),
+        "p50_ms": p(0.50),
+        "p90_ms": p(0.90),
+        "p95_ms": p(0.95),
+        "p99_ms": p(0.99),
+        "max_ms": round(1000 * valores[-1], 1),
+        "media_ms": round(1000 * sum(valores) / len(valores), 1),
+    }
+
+
+def ejecutar_carga(usuarios, acciones, semilla=0, pausa=0.0):
+    """Lanza `usuarios` sesiones concurrentes con `acciones` reruns cada una y devuelve las métricas."""
+    os.chdir(DIR_APP)  # la app busca logo.png y la base con rutas relativas
+    mediciones, errores, lock = [], [], threading.Lock()
+    cpu_inicio = time.process_time()
+    rss_inicio = _rss_mb()
+    rss_max = [rss_inicio]
+    corriendo = True
+
+    def muestrear_rss():
+        while corriendo:
+            rss_max[0] = max(rss_max[0], _rss_mb())
+            time.sleep(0.2)
+
+    muestreador = threading.Thread(target=muestrear_rss, daemon=True)
+    muestreador.start()
+    inicio = time.perf_counter()
+    hilos = [
+        threading.Thread(target=_usuario, args=(i, acciones, semilla, pausa, mediciones, errores, lock))
+        for i in range(usuarios)
+    ]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    total = time.perf_counter() - inicio
+    corriendo = False
+    muestreador.join()
+
+    reruns = [d for nombre, d in mediciones if nombre != "inicio"]
+    por_accion = {}
+    for nombre, d in mediciones:
+        por_accion.setdefault(nombre, []).append(d)
+    return {
+        "latencia": _percentiles(reruns),
+        "latencia_inicio": _percentiles(por_accion.pop("inicio", [])),
+        "por_accion": {nombre: _percentiles(v) for nombre, v in sorted(por_accion.items())},
+        "throughput_reruns_s": round(len(mediciones) / total, 2) if total else 0,
+        "duracion_s": round(total, 2),
+        "cpu_s": round(time.process_time() - cpu_inicio, 2),
+        "rss_inicio_mb": round(rss_inicio, 1),
+        "rss_max_mb": round(rss_max[0], 1),
+        "errores": errores,
+    }
+
+
+def _comparar(actual, previa):
+    print("\nComparación con corrida previa:")
+    for clave in ("p50_ms", "p90_ms", "p99_ms"):
+        antes, ahora = previa["resultados"]["latencia"].get(clave), actual["resultados"]["latencia"].get(clave)
+        if antes and ahora:
+            print(f"  {clave}: {antes} → {ahora} ({100 * (ahora - antes) / antes:+.1f}%)")
+    antes, ahora = previa["resultados"]["throughput_reruns_s"], actual["resultados"]["throughput_reruns_s"]
+    print(f"  throughput: {antes} → {ahora} reruns/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga con usuarios concurrentes sobre app.py.")
+    parser.add_argument("--usuarios", type=int, default=4, help="Sesiones concurrentes (por defecto: 4)")
+    parser.add_argument("--acciones", type=int, default=10, help="Reruns por sesión (por defecto: 10)")
+    parser.add_argument("--pausa", type=float, default=0.0, help="Tiempo medio de lectura entre acciones, en segundos")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--sintetica", type=int, default=0, help="Usar una base sintética con N partidos")
+    parser.add_argument("--db", default=None, help="Base a usar (por defecto: la de la app)")
+    parser.add_argument("--salida", default=None, help="Archivo JSON de resultados")
+    parser.add_argument("--comparar", default=None, help="JSON de una corrida previa para comparar")
+    args = parser.parse_args()
+
+    salida = os.path.abspath(args.salida or f"carga_{datetime.now():%Y%m%d_%H%M%S}.json")
+    comparar = os.path.abspath(args.comparar) if args.comparar else None
+    db = args.db
+    if args.sintetica:
+        db = generar_db_sintetica(os.path.join(tempfile.mkdtemp(), "sintetica.db"), args.sintetica, args.semilla)
+    if db:
+        os.environ["LDDS_DB"] = os.path.abspath(db)  # antes de que la app importe base_datos
+
+    resultados = ejecutar_carga(args.usuarios, args.acciones, args.semilla, args.pausa)
+    informe = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "configuracion": {
+            "usuarios": args.usuarios,
+            "acciones": args.acciones,
+            "pausa": args.pausa,
+            "semilla": args.semilla,
+            "db": os.environ.get("LDDS_DB", "football_nueva.db"),
+            "partidos_sinteticos": args.sintetica,
+            "python": sys.version.split()[0],
+            "cpus": os.cpu_count(),
+        },
+        "resultados": resultados,
+    }
+
+    lat = resultados["latencia"]
+    print(f"Reruns: {lat.get('n', 0)} | p50 {lat.get('p50_ms')} ms | p90 {lat.get('p90_ms')} ms | "
+          f"p99 {lat.get('p99_ms')} ms | {resultados['throughput_reruns_s']} reruns/s | "
+          f"CPU {resultados['cpu_s']} s | RSS máx {resultados['rss_max_mb']} MB | errores {len(resultados['errores'])}")
+
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+    print(f"Resultados guardados en {salida}")
+
+    if comparar:
+        with open(comparar, encoding="utf-8") as f:
+            _comparar(informe, json.load(f))
@@ -0,0 +1,196 @@
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from base_datos import DB, archivo_por_base
+from vigilante import leer_huellas
+
+# =====================================
+# CARRERAS DE JUGADORES (TABLA DE HECHOS)
+# =====================================
+TAMANIO_TANDA = 500
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS carreras (
+    jugador TEXT NOT NULL,
+    temporada INTEGER NOT NULL,
+    equipo TEXT NOT NULL,
+    partidos INTEGER NOT NULL,
+    goles INTEGER NOT NULL,
+    amonestaciones INTEGER NOT NULL,
+    expulsiones INTEGER NOT NULL,
+    PRIMARY KEY (jugador, temporada, equipo)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS aportes (
+    partido_id INTEGER NOT NULL,
+    jugador TEXT NOT NULL,
+    equipo TEXT NOT NULL,
+    temporada INTEGER NOT NULL,
+    goles INTEGER NOT NULL,
+    amonestaciones INTEGER NOT NULL,
+    expulsiones INTEGER NOT NULL,
+    PRIMARY KEY (partido_id, jugador, equipo)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS huellas (
+    partido_id INTEGER PRIMARY KEY,
+    huella INTEGER NOT NULL
+);
+"""
+
+COLUMNAS = ["jugador", "temporada", "equipo", "goles", "amonestaciones", "expulsiones"]
+
+
+def ruta_almacen(db):
+    return archivo_por_base("carreras", db, ".db")
+
+
+def leer_aportes(conn, ids=None):
+    """Goles y tarjetas de cada jugador por partido, con su temporada (año) y club."""
+    filtro, params = "", ()
+    if ids is not None:
+        ids = list(ids)
+        filtro, params = f"AND p.id IN ({','.join('?' * len(ids))})", ids
+    goles = pd.read_sql_query(f"""
+        SELECT
+            p.id AS partido_id,
+            g.jugador,
+            CASE WHEN g.equipo = 'Local' THEN p.equipo_local ELSE p.equipo_visitante END AS equipo,
+            CAST(SUBSTR(p.fecha, 7, 4) AS INTEGER) AS temporada,
+            COUNT(*) AS goles
+        FROM goles g
+        JOIN partidos p ON p.id = g.partido_id
+        WHERE g.jugador IS NOT NULL AND TRIM(g.jugador) <> '' {filtro}
+        GROUP BY 1, 2, 3, 4
+    """, conn, params=params)
+    tarjetas = pd.read_sql_query(f"""
+        SELECT
+            p.id AS partido_id,
+            t.jugador,
+            CASE WHEN t.equipo = 'Local' THEN p.equipo_local ELSE p.equipo_visitante END AS equipo,
+            CAST(SUBSTR(p.fecha, 7, 4) AS INTEGER) AS temporada,
+            SUM(CASE WHEN t.tipo = 'Amonestado' THEN 1 ELSE 0 END) AS amonestaciones,
+            SUM(CASE WHEN t.tipo = 'Expulsado' THEN 1 ELSE 0 END) AS expulsiones
+        FROM tarjetas t
+        JOIN partidos p ON p.id = t.partido_id
+        WHERE t.jugador IS NOT NULL AND TRIM(t.jugador) <> '' {filtro}
+        GROUP BY 1, 2, 3, 4
+    """, conn, params=params)
+    claves = ["partido_id", "jugador", "equipo", "temporada"]
+    aportes = goles.merge(tarjetas, on=claves, how="outer")
+    for col in ("goles", "amonestaciones", "expulsiones"):
+        aportes[col] = aportes[col].fillna(0).astype("int64")
+    return aportes[["partido_id"] + COLUMNAS]
+
+
+class AlmacenCarreras:
+    """Tabla de hechos jugador × temporada × club (partidos, goles y tarjetas) en una base SQLite
+    propia dentro de la caché, con clave primaria por jugador: el perfil se lee con un solo
+    recorrido del índice. Se mantiene por partido: cada partido guarda su aporte, de modo que
+    al corregirse o borrarse se resta lo anterior y se suma lo nuevo."""
+
+    def __init__(self, db=DB, ruta=None):
+        self.db = db
+        self.ruta = ruta or ruta_almacen(db)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.ruta) or ".", exist_ok=True)
+        conn = self._conectar()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(ESQUEMA)
+        conn.close()
+
+    def _conectar(self):
+        return sqlite3.connect(self.ruta, timeout=30)
+
+    # ---------- mantenimiento ----------
+    def _mover(self, conn, filas, signo):
+        """Suma (o resta) filas de aporte en `carreras`, borrando las que quedan sin partidos."""
+        conn.executemany("""
+            INSERT INTO carreras (jugador, temporada, equipo, partidos, goles, amonestaciones, expulsiones)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (jugador, temporada, equipo) DO UPDATE SET
+                partidos = partidos + excluded.partidos,
+                goles = goles + excluded.goles,
+                amonestaciones = amonestaciones + excluded.amonestaciones,
+                expulsiones = expulsiones + excluded.expulsiones
+        """, [(j, int(t), e, signo, signo * g, signo * a, signo * x) for j, t, e, g, a, x in filas])
+        if signo < 0:
+            conn.executemany("""
+                DELETE FROM carreras WHERE jugador = ? AND temporada = ? AND equipo = ? AND partidos <= 0
+            """, [(j, int(t), e) for j, t, e, *_ in filas])
+
+    def aplicar(self, ids):
+        """Rehace el aporte de los partidos `ids` (altas, correcciones o bajas)."""
+        ids = sorted(set(int(i) for i in ids))
+        if not ids:
+            return
+        fuente = sqlite3.connect(self.db)
+        with self._lock:
+            conn = self._conectar()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                for inicio in range(0, len(ids), TAMANIO_TANDA):
+                    tanda = ids[inicio:inicio + TAMANIO_TANDA]
+                    marcas = ",".join("?" * len(tanda))
+                    viejos = conn.execute(f"""
+                        SELECT jugador, temporada, equipo, goles, amonestaciones, expulsiones
+                        FROM aportes WHERE partido_id IN ({marcas})
+                    """, tanda).fetchall()
+                    self._mover(conn, viejos, -1)
+                    conn.execute(f"DELETE FROM aportes WHERE partido_id IN ({marcas})", tanda)
+                    conn.execute(f"DELETE FROM huellas WHERE partido_id IN ({marcas})", tanda)
+
+                    nuevos = leer_aportes(fuente, tanda)
+                    conn.executemany("""
+                        INSERT INTO aportes (partido_id, jugador, temporada, equipo, goles, amonestaciones, expulsiones)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """, nuevos[["partido_id"] + COLUMNAS].itertuples(index=False))
+                    self._mover(conn, nuevos[COLUMNAS].itertuples(index=False), 1)
+                    huellas = leer_huellas(fuente, tanda)
+                    conn.executemany(
+                        "INSERT INTO huellas (partido_id, huella) VALUES (?, ?)",
+                        zip(huellas.index.tolist(), huellas["huella"].to_numpy().view(np.int64).tolist()),
+                    )
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
+                fuente.close()
+
+    def actualizar(self):
+        """Compara la huella de cada partido con la guardada y rehace solo los que cambiaron.
+        La primera vez (almacén vacío) arma la tabla completa. Devuelve los ids procesados."""
+        fuente = sqlite3.connect(self.db)
+        actuales = leer_huellas(fuente)
+        fuente.close()
+        conn = self._conectar()
+        guardadas = dict(conn.execute("SELECT partido_id, huella FROM huellas").fetchall())
+        conn.close()
+        actuales = dict(zip(actuales.index.tolist(), actuales["huella"].to_numpy().view(np.int64).tolist()))
+        cambiados = {i for i, h in actuales.items() if guardadas.get(i) != h} | (guardadas.keys() - actuales.keys())
+        self.aplicar(cambiados)
+        return sorted(cambiados)
+
+    # ---------- lecturas ----------
+    def perfil(self, jugador):
+        """Carrera de un jugador: una fila por temporada y club (lectura por clave primaria)."""
+        conn = self._conectar()
+        df = pd.read_sql_query("""
+            SELECT temporada, equipo, partidos, goles, amonestaciones, expulsiones
+            FROM carreras
+            WHERE jugador = ?
+            ORDER BY temporada, equipo
+        """, conn, params=(jugador,))
+        conn.close()
+        return df
+
+    def jugadores(self):
+        """Jugadores con al menos un gol o una tarjeta, en orden alfabético."""
+        conn = self._conectar()
+        jugadores = [r[0] for r in conn.execute("SELECT DISTINCT jugador FROM carreras ORDER BY jugador")]
+        conn.close()
+        return jugadores
@@ -0,0 +1,1301 @@
+import contextvars
+import os
+import sqlite3
+import threading
+import time
+import urllib.request
+import weakref
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+import motores
+from base_datos import DB
+
+# =====================================
+# FUNCIONES AUXILIARES
+# =====================================
+def parse_fecha(fecha_str):
+    """Convierte fecha de 'dd/mm/yyyy' a datetime para ordenar correctamente."""
+    try:
+        return pd.to_datetime(fecha_str, format='%d/%m/%Y')
+    except:
+        return pd.NaT
+        
+def formatear_goleador(nombre, goles):
+    """Formatea nombre: inicial del primer nombre + apellido, con (n) si hizo más de 1 gol.
+    Maneja formato: 'Apellido, Nombre' → 'C. Apellido'"""
+    if not nombre or pd.isna(nombre):
+        return "-"
+    
+    nombre = nombre.strip()
+    
+    # Si el nombre tiene formato "Apellido, Nombre"
+    if ',' in nombre:
+        partes = nombre.split(',', 1)
+        apellido = partes[0].strip()
+        nombre_parte = partes[1].strip()
+        
+        # Obtener inicial del primer nombre
+        nombres = nombre_parte.split()
+        if nombres:
+            inicial = nombres[0][0].upper()
+            resultado = f"{inicial}. {apellido}"
+        else:
+            resultado = apellido
+    else:
+        # Formato normal "Nombre Apellido"
+        partes = nombre.split()
+        if len(partes) >= 2:
+            inicial_nombre = partes[0][0].upper()
+            apellido = " ".join(partes[1:])
+            resultado = f"{inicial_nombre}. {apellido}"
+        else:
+            resultado = nombre
+    
+    # Agregar cantidad de goles si es más de 1
+    if goles > 1:
+        resultado += f" ({goles})"
+    
+    return resultado
+
+# =====================================
+# FORMA DE LOS RESULTADOS
+# =====================================
+# Columnas de texto que se repiten mucho entre filas (equipos, torneos, etc.)
+COLUMNAS_CATEGORICAS = {
+    "equipo", "equipo_local", "equipo_visitante", "equipo_jugador", "rival", "ganador",
+    "fecha", "campeonato", "lugar", "resultado", "jugador",
+}
+
+def compactar(df):
+    """Reduce el tamaño del resultado: texto repetido → category, enteros → int16/int32.
+    Los enteros no bajan de int16 para que sumas como amon + exp no desborden."""
+    for col in df.columns:
+        serie = df[col]
+        if col in COLUMNAS_CATEGORICAS and (pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie)):
+            if len(serie) and serie.nunique() <= len(serie) // 2:
+                df[col] = serie.astype("category")
+        elif pd.api.types.is_integer_dtype(serie) and len(serie):
+            maximo = serie.abs().max()
+            if maximo < 2 ** 15:
+                df[col] = serie.astype("int16")
+            elif maximo < 2 ** 31:
+                df[col] = serie.astype("int32")
+    return df
+
+# =====================================
+# PRESUPUESTO Y CANCELACIÓN DE CONSULTAS
+# =====================================
+PASOS_POR_CONTROL = 10000        # cada cuántas instrucciones de SQLite se revisa el presupuesto
+PRESUPUESTO_PASOS = 50_000_000   # instrucciones de SQLite por consulta
+PRESUPUESTO_SEGUNDOS = 10.0      # tiempo por consulta
+
+class ConsultaCancelada(Exception):
+    """La consulta se interrumpió: superó su presupuesto o la reemplazó una ejecución más nueva."""
+
+class Ejecucion:
+    """Consultas lanzadas por una misma corrida (p. ej. un rerun de una sesión de la app).
+    `cancelar()` interrumpe las que estén en curso; `superada` es un callable opcional que
+    se revisa durante cada consulta y, si devuelve True, la cancela."""
+
+    def __init__(self, superada=None):
+        self.motivo = None
+        self.inicio = None  # time.monotonic() al empezar a correr en el pool (ejecutar_concurrente)
+        self._superada = superada
+        self._lock = threading.Lock()
+        self._conexiones = weakref.WeakSet()
+
+    def registrar(self, conn):
+        with self._lock:
+            self._conexiones.add(conn)
+        if self.motivo is not None:
+            conn.interrupt()
+
+    def liberar(self, conn):
+        with self._lock:
+            self._conexiones.discard(conn)
+
+    def cancelar(self, motivo="reemplazada por una ejecución más nueva"):
+        with self._lock:
+            if self.motivo is None:
+                self.motivo = motivo
+            conexiones = list(self._conexiones)
+        for conn in conexiones:
+            conn.interrupt()
+
+    def cancelada(self):
+        if self.motivo is None and self._superada is not None and self._superada():
+            self.cancelar()
+        return self.motivo is not None
+
+_ejecucion = contextvars.ContextVar("ejecucion", default=None)
+
+def iniciar_ejecucion(anterior=None, superada=None):
+    """Asocia las consultas siguientes del contexto actual a una ejecución nueva y cancela
+    `anterior` (la corrida previa de la misma sesión), por si dejó consultas vivas en otros hilos."""
+    if anterior is not None:
+        anterior.cancelar()
+    ejecucion = Ejecucion(superada)
+    _ejecucion.set(ejecucion)
+    return ejecucion
+
+class _Cursor(sqlite3.Cursor):
+    """Cursor que traduce la interrupción de SQLite a `ConsultaCancelada` con su motivo."""
+
+    def _vigilado(self, metodo, *args):
+        try:
+            return metodo(self, *args)
+        except sqlite3.OperationalError as e:
+            if self.connection.motivo is not None:
+                raise ConsultaCancelada(self.connection.motivo) from e
+            raise
+
+    def execute(self, *args):
+        self.connection.reiniciar_presupuesto()
+        return self._vigilado(sqlite3.Cursor.execute, *args)
+
+    def fetchone(self):
+        return self._vigilado(sqlite3.Cursor.fetchone)
+
+    def fetchmany(self, *args):
+        return self._vigilado(sqlite3.Cursor.fetchmany, *args)
+
+    def fetchall(self):
+        return self._vigilado(sqlite3.Cursor.fetchall)
+
+class _Conexion(sqlite3.Connection):
+    """Conexión con presupuesto de pasos y tiempo por consulta (vía `set_progress_handler`),
+    cancelable desde otro hilo a través de su `Ejecucion`."""
+
+    def vigilar(self, ejecucion):
+        self.motivo = None
+        self._ejecucion = ejecucion
+        self.reiniciar_presupuesto()
+        if ejecucion is not None:
+            ejecucion.registrar(self)
+        self.set_progress_handler(self._controlar, PASOS_POR_CONTROL)
+
+    def reiniciar_presupuesto(self):
+        self._pasos = 0
+        self._inicio = time.monotonic()
+
+    def _controlar(self):
+        # Devolver un valor distinto de cero hace que SQLite interrumpa la consulta
+        self._pasos += PASOS_POR_CONTROL
+        if self._ejecucion is not None and self._ejecucion.cancelada():
+            self.motivo = self._ejecucion.motivo
+        elif self._pasos > PRESUPUESTO_PASOS:
+            self.motivo = f"superó el presupuesto de {PRESUPUESTO_PASOS:,} pasos"
+        elif time.monotonic() - self._inicio > PRESUPUESTO_SEGUNDOS:
+            self.motivo = f"superó el límite de {PRESUPUESTO_SEGUNDOS:g} s"
+        return self.motivo is not None
+
+    def interrupt(self):
+        if self.motivo is None and self._ejecucion is not None:
+            self.motivo = self._ejecucion.motivo
+        super().interrupt()
+
+    def cursor(self, factory=_Cursor):
+        return super().cursor(factory)
+
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def close(self):
+        if self._ejecucion is not None:
+            self._ejecucion.liberar(self)
+        super().close()
+
+# =====================================
+# LIGA ACTIVA (UNA BASE POR LIGA)
+# =====================================
+_base = contextvars.ContextVar("base", default=None)
+
+def base_actual():
+    """Base de la liga con la que trabajan las consultas del contexto actual (por defecto, DB)."""
+    return _base.get() or DB
+
+def usar_base(db):
+    """Las consultas siguientes del contexto actual (una corrida de la app) leen `db`."""
+    _base.set(db)
+
+@contextmanager
+def en_base(db):
+    """Como `usar_base`, solo dentro del bloque."""
+    token = _base.set(db)
+    try:
+        yield
+    finally:
+        _base.reset(token)
+
+def conectar():
+    """Conexión de solo lectura a la base (cada consulta abre la suya), con presupuesto por
+    consulta y asociada a la ejecución en curso para poder cancelarla."""
+    conn = sqlite3.connect(
+        "file:" + urllib.request.pathname2url(os.path.abspath(base_actual())) + "?mode=ro",
+        uri=True,
+        factory=_Conexion,
+    )
+    conn.vigilar(_ejecucion.get())
+    return conn
+
+class _ConsultaDuckDB:
+    """Adaptador para que una consulta de DuckDB se cancele como las de SQLite (vía `Ejecucion`)."""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.motivo = None
+
+    def interrupt(self, motivo=None):
+        self.motivo = self.motivo or motivo
+        self.cursor.interrupt()
+
+def _leer_duckdb(motor, query, params):
+    cursor = motor.cursor()
+    consulta = _ConsultaDuckDB(cursor)
+    ejecucion = _ejecucion.get()
+    if ejecucion is not None:
+        ejecucion.registrar(consulta)
+    limite = threading.Timer(PRESUPUESTO_SEGUNDOS, consulta.interrupt,
+                             args=(f"superó el límite de {PRESUPUESTO_SEGUNDOS:g} s",))
+    limite.daemon = True
+    limite.start()
+    try:
+        return motores.normalizar_tipos(cursor.execute(query, list(params)).df())
+    except motores.Interrupcion as e:
+        motivo = consulta.motivo or (ejecucion.motivo if ejecucion is not None else None)
+        if motivo:
+            raise ConsultaCancelada(motivo) from e
+        raise
+    finally:
+        limite.cancel()
+        if ejecucion is not None:
+            ejecucion.liberar(consulta)
+        cursor.close()
+
+# Router: las agregaciones de toda la liga (`analitica=True`) van al motor analítico
+# si está configurado (LDDS_MOTOR_ANALITICO=duckdb); las búsquedas puntuales, siempre a SQLite.
+MOTOR_ANALITICO = motores.MOTOR_ANALITICO
+
+def leer_df(query, params=(), analitica=False):
+    """Ejecuta una consulta y devuelve el DataFrame compactado."""
+    if analitica and MOTOR_ANALITICO == "duckdb":
+        motor = motores.obtener_motor(base_actual())
+        if motor is not None:
+            return compactar(_leer_duckdb(motor, query, params))
+    conn = conectar()
+    try:
+        df = pd.read_sql_query(query, conn, params=params)
+    except pd.errors.DatabaseError as e:
+        # pandas envuelve los errores del cursor; la cancelación se propaga tal cual
+        if isinstance(e.__cause__, ConsultaCancelada):
+            raise e.__cause__ from None
+        raise
+    finally:
+        conn.close()
+    return compactar(df)
+
+# =====================================
+# FUNCIONES DE BASE DE DATOS
+# =====================================
+def obtener_valores_unicos(columna, tabla="partidos"):
+    try:
+        conn = conectar()
+        cur = conn.cursor()
+        cur.execute(f"""
+            SELECT DISTINCT {columna}
+            FROM {tabla}
+            WHERE {columna} IS NOT NULL AND TRIM({columna}) <> ''
+            ORDER BY {columna}
+        """)
+        valores = [r[0] for r in cur.fetchall()]
+        conn.close()
+        return valores
+    except ConsultaCancelada:
+        raise
+    except:
+        return []
+
+def obtener_equipos():
+    try:
+        conn = conectar()
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT DISTINCT equipo FROM (
+                SELECT equipo_local AS equipo FROM partidos
+                UNION
+                SELECT equipo_visitante FROM partidos
+            ) WHERE equipo IS NOT NULL AND equipo <> ''
+            ORDER BY equipo
+        """)
+        equipos = [r[0] for r in cur.fetchall()]
+        conn.close()
+        return equipos if equipos else []
+    except ConsultaCancelada:
+        raise
+    except:
+        return []
+
+def obtener_jugadores():
+    try:
+        conn = conectar()
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT DISTINCT jugador FROM tarjetas
+            WHERE jugador IS NOT NULL AND TRIM(jugador) <> ''
+            ORDER BY jugador
+        """)
+        jugadores = [r[0] for r in cur.fetchall()]
+        conn.close()
+        return jugadores if jugadores else []
+    except ConsultaCancelada:
+        raise
+    except:
+        return []
+
+def obtener_tarjetas_por_jugador(anio=None, campeonato=None, equipo=None, solo_expulsados=False):
+    query = """
+        SELECT
+            t.jugador,
+            CASE
+                WHEN t.equipo = 'Local' THEN p.equipo_local
+                WHEN t.equipo = 'Visitante' THEN p.equipo_visitante
+            END AS equipo_jugador,
+            SUM(CASE WHEN t.tipo = 'Amonestado' THEN 1 ELSE 0 END) AS amon,
+            SUM(CASE WHEN t.tipo = 'Expulsado' THEN 1 ELSE 0 END) AS exp
+        FROM partidos p
+        INNER JOIN tarjetas t ON t.partido_id = p.id
+        WHERE p.arbitro IS NOT NULL AND p.arbitro <> ''
+          AND t.jugador IS NOT NULL AND TRIM(t.jugador) <> ''
+    """
+    params = []
+    if anio:
+        query += " AND SUBSTR(p.fecha, 7, 4) = ?"
+        params.append(anio)
+    if campeonato:
+        query += " AND p.campeonato = ?"
+        params.append(campeonato)
+    if equipo:
+        query += " AND (p.equipo_local = ? OR p.equipo_visitante = ?)"
+        params.extend([equipo, equipo])
+    if solo_expulsados:
+        query += " AND t.tipo = 'Expulsado'"
+    query += """
+        GROUP BY t.jugador, equipo_jugador
+        HAVING (amon + exp) > 0
+        ORDER BY (amon + exp) DESC, t.jugador, equipo_jugador
+    """
+    return leer_df(query, params, analitica=True)
+
+# NUEVA FUNCIÓN: Tarjetas por equipo (no por jugador)
+def obtener_tarjetas_por_equipo(anio=None, campeonato=None, equipo=None, solo_expulsados=False):
+    """Obtiene tarjetas agrupadas por equipo (no por jugador)."""
+    query = """
+        SELECT
+            CASE
+                WHEN t.equipo = 'Local' THEN p.equipo_local
+                WHEN t.equipo = 'Visitante' THEN p.equipo_visitante
+            END AS equipo,
+            SUM(CASE WHEN t.tipo = 'Amonestado' THEN 1 ELSE 0 END) AS amon,
+            SUM(CASE WHEN t.tipo = 'Expulsado' THEN 1 ELSE 0 END) AS exp
+        FROM partidos p
+        INNER JOIN tarjetas t ON t.partido_id = p.id
+        WHERE p.arbitro IS NOT NULL AND p.arbitro <> ''
+    """
+    params = []
+    if anio:
+        query += " AND SUBSTR(p.fecha, 7, 4) = ?"
+        params.append(anio)
+    if campeonato:
+        query += " AND p.campeonato = ?"
+        params.append(campeonato)
+    if equipo:
+        query += " AND (p.equipo_local = ? OR p.equipo_visitante = ?)"
+        params.extend([equipo, equipo])
+    if solo_expulsados:
+        query += " AND t.tipo = 'Expulsado'"
+    
+    query += """
+        GROUP BY 1
+        HAVING (amon + exp) > 0
+        ORDER BY (amon + exp) DESC, equipo
+    """
+    
+    return leer_df(query, params, analitica=True)
+
+def obtener_tarjetas_por_rival_equipo(equipo):
+    """Obtiene tarjetas recibidas por un equipo contra cada rival."""
+    query = """
+        SELECT
+            CASE
+                WHEN (p.equipo_local = ? AND t.equipo = 'Local') THEN p.equipo_visitante
+                WHEN (p.equipo_visitante = ? AND t.equipo = 'Visitante') THEN p.equipo_local
+            END AS rival,
+            SUM(CASE WHEN t.tipo = 'Amonestado' THEN 1 ELSE 0 END) AS amon,
+            SUM(CASE WHEN t.tipo = 'Expulsado' THEN 1 ELSE 0 END) AS exp
+        FROM partidos p
+        INNER JOIN tarjetas t ON t.partido_id = p.id
+        WHERE p.arbitro IS NOT NULL AND p.arbitro <> ''
+        AND (
+            (p.equipo_local = ? AND t.equipo = 'Local')
+            OR
+            (p.equipo_visitante = ? AND t.equipo = 'Visitante')
+        )
+        GROUP BY rival
+        ORDER BY (amon + exp) DESC
+    """
+    
+    return leer_df(query, (equipo, equipo, equipo, equipo))
+
+def obtener_evolucion_equipo(equipo):
+    query = """
+        SELECT
+            SUBSTR(p.fecha, 7, 4) AS anio,
+            SUM(CASE WHEN t.tipo = 'Amonestado' THEN 1 ELSE 0 END) AS amon,
+            SUM(CASE WHEN t.tipo = 'Expulsado' THEN 1 ELSE 0 END) AS exp
+        FROM partidos p
+        JOIN tarjetas t ON t.partido_id = p.id
+        WHERE (p.equipo_local = ? AND t.equipo = 'Local')
+           OR (p.equipo_visitante = ? AND t.equipo = 'Visitante')
+        GROUP BY anio
+        ORDER BY anio
+    """
+    return leer_df(query, (equipo, equipo))
+
+def obtener_estadisticas_arbitro_equipo(arbitro, equipo, anio=None, campeonato=None):
+    query = """
+        SELECT
+            COUNT(DISTINCT p.id) AS partidos,
+            SUM(CASE WHEN t.tipo = 'Amonestado' THEN 1 ELSE 0 END) AS amonestados,
+            SUM(CASE WHEN t.tipo = 'Expulsado' THEN 1 ELSE 0 END) AS expulsados
+        FROM partidos p
+        LEFT JOIN tarjetas t ON t.partido_id = p.id
+        WHERE p.arbitro = ?
+        AND (p.equipo_local = ? OR p.equipo_visitante = ?)
+    """
+    params = [arbitro, equipo, equipo]
+    if anio:
+        query += " AND SUBSTR(p.fecha,7,4) = ?"
+        params.append(anio)
+    if campeonato:
+        query += " AND p.campeonato = ?"
+        params.append(campeonato)
+    conn = conectar()
+    cur = conn.cursor()
+    cur.execute(query, params)
+    resultado = cur.fetchone()
+    conn.close()
+    return {
+        "partidos": resultado[0] or 0,
+        "amonestados": resultado[1] or 0,
+        "expulsados": resultado[2] or 0
+    }
+
+def obtener_resumen_equipo(equipo):
+    query = """
+        SELECT
+            SUM(CASE WHEN t.tipo = 'Amonestado' THEN 1 ELSE 0 END) AS amon,
+            SUM(CASE WHEN t.tipo = 'Expulsado' THEN 1 ELSE 0 END) AS exp
+        FROM partidos p
+        JOIN tarjetas t ON t.partido_id = p.id
+        WHERE p.arbitro IS NOT NULL
+          AND p.arbitro <> ''
+          AND (p.equipo_local = ? OR p.equipo_visitante = ?)
+    """
+    conn = conectar()
+    cur = conn.cursor()
+    cur.execute(query, (equipo, equipo))
+    amon, exp = cur.fetchone()
+    conn.close()
+    return {
+        "amonestaciones": amon or 0,
+        "expulsiones": exp or 0,
+        "total": (amon or 0) + (exp or 0)
+    }
+
+def obtener_goles_por_jugador(anio=None, campeonato=None, equipo=None):
+    """Obtiene goles por jugador, sin importar para qué equipo jugó."""
+    query = """
+        SELECT
+            g.jugador,
+            COUNT(*) AS goles
+        FROM partidos p
+        INNER JOIN goles g ON g.partido_id = p.id
+        WHERE g.jugador IS NOT NULL AND TRIM(g.jugador) <> ''
+    """
+    params = []
+    if anio:
+        query += " AND SUBSTR(p.fecha, 7, 4) = ?"
+        params.append(anio)
+    if campeonato:
+        query += " AND p.campeonato = ?"
+        params.append(campeonato)
+    if equipo:
+        query += " AND (p.equipo_local = ? OR p.equipo_visitante = ?)"
+        params.extend([equipo, equipo])
+    
+    query += """
+        GROUP BY g.jugador
+        HAVING goles > 0
+        ORDER BY goles DESC, g.jugador
+    """
+    
+    return leer_df(query, params, analitica=True)
+
+def obtener_goleadores_por_equipo(equipo):
+    query = """
+        SELECT
+            g.jugador,
+            COUNT(*) AS goles
+        FROM partidos p
+        INNER JOIN goles g ON g.partido_id = p.id
+        WHERE g.jugador IS NOT NULL AND TRIM(g.jugador) <> ''
+        AND (
+            (p.equipo_local = ? AND g.equipo = 'Local')
+            OR 
+            (p.equipo_visitante = ? AND g.equipo = 'Visitante')
+        )
+        GROUP BY g.jugador
+        ORDER BY goles DESC
+    """
+    return leer_df(query, (equipo, equipo))
+
+def obtener_top_goleadores(limite=20):
+    query = """
+        SELECT
+            g.jugador,
+            CASE
+                WHEN g.equipo = 'Local' THEN p.equipo_local
+                WHEN g.equipo = 'Visitante' THEN p.equipo_visitante
+            END AS equipo,
+            COUNT(*) AS goles
+        FROM partidos p
+        INNER JOIN goles g ON g.partido_id = p.id
+        WHERE g.jugador IS NOT NULL AND TRIM(g.jugador) <> ''
+        GROUP BY 1, 2
+        ORDER BY goles DESC, g.jugador, equipo
+        LIMIT ?
+    """
+    return leer_df(query, (limite,), analitica=True)
+
+def obtener_rendimiento_equipo(equipo, anio=None, campeonato=None):
+    query = """
+        SELECT
+            p.fecha,
+            p.campeonato,
+            p.equipo_local,
+            p.equipo_visitante,
+            p.goles_local,
+            p.goles_visitante,
+            CASE
+                WHEN p.equipo_local = ? AND p.goles_local > p.goles_visitante THEN 'Ganado'
+                WHEN p.equipo_visitante = ? AND p.goles_visitante > p.goles_local THEN 'Ganado'
+                WHEN p.goles_local = p.goles_visitante THEN 'Empatado'
+                ELSE 'Perdido'
+            END AS resultado
+        FROM partidos p
+        WHERE (p.equipo_local = ? OR p.equipo_visitante = ?)
+    """
+    params = [equipo, equipo, equipo, equipo]
+    if anio:
+        query += " AND SUBSTR(p.fecha, 7, 4) = ?"
+        params.append(anio)
+    if campeonato:
+        query += " AND p.campeonato = ?"
+        params.append(campeonato)
+    
+    # ORDEN CORREGIDO: año, mes, día
+    query += " ORDER BY SUBSTR(p.fecha, 7, 4) DESC, SUBSTR(p.fecha, 4, 2) DESC, SUBSTR(p.fecha, 1, 2) DESC"
+    
+    return leer_df(query, params)
+
+def obtener_estadisticas_rendimiento(equipo, anio=None, campeonato=None):
+    query = """
+        SELECT
+            COUNT(*) AS partidos_jugados,
+            SUM(CASE
+                WHEN (p.equipo_local = ? AND p.goles_local > p.goles_visitante) OR
+                     (p.equipo_visitante = ? AND p.goles_visitante > p.goles_local)
+                THEN 1 ELSE 0 END) AS ganados,
+            SUM(CASE WHEN p.goles_local = p.goles_visitante THEN 1 ELSE 0 END) AS empatados,
+            SUM(CASE
+                WHEN (p.equipo_local = ? AND p.goles_local < p.goles_visitante) OR
+                     (p.equipo_visitante = ? AND p.goles_visitante < p.goles_local)
+                THEN 1 ELSE 0 END) AS perdidos,
+            SUM(CASE
+                WHEN p.equipo_local = ? THEN p.goles_local
+                WHEN p.equipo_visitante = ? THEN p.goles_visitante
+                ELSE 0 END) AS goles_favor,
+            SUM(CASE
+                WHEN p.equipo_local = ? THEN p.goles_visitante
+                WHEN p.equipo_visitante = ? THEN p.goles_local
+                ELSE 0 END) AS goles_contra
+        FROM partidos p
+        WHERE (p.equipo_local = ? OR p.equipo_visitante = ?)
+    """
+    params = [equipo, equipo, equipo, equipo, equipo, equipo, equipo, equipo, equipo, equipo]
+    if anio:
+        query += " AND SUBSTR(p.fecha, 7, 4) = ?"
+        params.append(anio)
+    if campeonato:
+        query += " AND p.campeonato = ?"
+        params.append(campeonato)
+    conn = conectar()
+    cur = conn.cursor()
+    cur.execute(query, params)
+    resultado = cur.fetchone()
+    conn.close()
+    if resultado:
+        pj, g, e, p, gf, gc = resultado
+        return {
+            "partidos_jugados": pj or 0,
+            "ganados": g or 0,
+            "empatados": e or 0,
+            "perdidos": p or 0,
+            "goles_favor": gf or 0,
+            "goles_contra": gc or 0,
+            "diferencia": (gf or 0) - (gc or 0)
+        }
+    return {
+        "partidos_jugados": 0, "ganados": 0, "empatados": 0, "perdidos": 0,
+        "goles_favor": 0, "goles_contra": 0, "diferencia": 0
+    }
+
+def obtener_jugadores_mas_amonestados(limite=20):
+    query = """
+        SELECT
+            t.jugador,
+            CASE
+                WHEN t.equipo = 'Local' THEN p.equipo_local
+                WHEN t.equipo = 'Visitante' THEN p.equipo_visitante
+            END AS equipo,
+            COUNT(*) AS amonestaciones
+        FROM partidos p
+        INNER JOIN tarjetas t ON t.partido_id = p.id
+        WHERE t.tipo = 'Amonestado'
+        AND t.jugador IS NOT NULL AND TRIM(t.jugador) <> ''
+        GROUP BY 1, 2
+        ORDER BY amonestaciones DESC, t.jugador, equipo
+        LIMIT ?
+    """
+    return leer_df(query, (limite,), analitica=True)
+
+def obtener_jugadores_mas_expulsados(limite=20):
+    query = """
+        SELECT
+            t.jugador,
+            CASE
+                WHEN t.equipo = 'Local' THEN p.equipo_local
+                WHEN t.equipo = 'Visitante' THEN p.equipo_visitante
+            END AS equipo,
+            COUNT(*) AS expulsiones
+        FROM partidos p
+        INNER JOIN tarjetas t ON t.partido_id = p.id
+        WHERE t.tipo = 'Expulsado'
+        AND t.jugador IS NOT NULL AND TRIM(t.jugador) <> ''
+        GROUP BY 1, 2
+        ORDER BY expulsiones DESC, t.jugador, equipo
+        LIMIT ?
+    """
+    return leer_df(query, (limite,), analitica=True)
+
+def obtener_tabla_historica_acumulada():
+    """Obtiene tabla de posiciones acumulada de TODOS los partidos históricos.
+    Respeta regla histórica: 2 puntos (hasta 1994), 3 puntos (desde 1995)."""
+    conn = conectar()
+    cur = conn.cursor()
+    
+    # Obtener TODOS los partidos (sin filtrar por árbitro)
+    cur.execute("""
+        SELECT
+            p.fecha,
+            p.equipo_local,
+            p.goles_local,
+            p.equipo_visitante,
+            p.goles_visitante
+        FROM partidos p
+        WHERE p.equipo_local IS NOT NULL AND p.equipo_local <> ''
+          AND p.equipo_visitante IS NOT NULL AND p.equipo_visitante <> ''
+        ORDER BY p.fecha
+    """)
+    
+    partidos = cur.fetchall()
+    conn.close()
+    
+    # Diccionario para acumular estadísticas por equipo
+    tabla = {}
+    
+    for partido in partidos:
+        fecha, local, gl, visitante, gv = partido
+        
+        # Convertir goles a enteros (manejar NULL)
+        try:
+            gl = int(gl) if gl is not None else 0
+        except:
+            gl = 0
+        try:
+            gv = int(gv) if gv is not None else 0
+        except:
+            gv = 0
+        
+        # Obtener año para determinar sistema de puntos
+        try:
+            anio = int(fecha.split('/')[2]) if fecha else 0
+        except:
+            anio = 0
+        
+        # Inicializar equipos si no existen
+        if local not in tabla:
+            tabla[local] = {"PJ": 0, "PG": 0, "PE": 0, "PP": 0, "GF": 0, "GC": 0, "Puntos": 0}
+        if visitante not in tabla:
+            tabla[visitante] = {"PJ": 0, "PG": 0, "PE": 0, "PP": 0, "GF": 0, "GC": 0, "Puntos": 0}
+        
+        # Acumular partidos jugados y goles
+        tabla[local]["PJ"] += 1
+        tabla[visitante]["PJ"] += 1
+        tabla[local]["GF"] += gl
+        tabla[local]["GC"] += gv
+        tabla[visitante]["GF"] += gv
+        tabla[visitante]["GC"] += gl
+        
+        # Determinar puntos según el año (REGLA HISTÓRICA CORRECTA)
+        puntos_victoria = 3 if anio >= 1995 else 2
+        
+        # Asignar resultados y puntos
+        if gl > gv:
+            tabla[local]["PG"] += 1
+            tabla[visitante]["PP"] += 1
+            tabla[local]["Puntos"] += puntos_victoria
+        elif gl < gv:
+            tabla[visitante]["PG"] += 1
+            tabla[local]["PP"] += 1
+            tabla[visitante]["Puntos"] += puntos_victoria
+        else:
+            tabla[local]["PE"] += 1
+            tabla[visitante]["PE"] += 1
+            tabla[local]["Puntos"] += 1
+            tabla[visitante]["Puntos"] += 1
+    
+    # Convertir a lista ordenada
+    posiciones = []
+    for equipo, datos in tabla.items():
+        dg = datos["GF"] - datos["GC"]
+        posiciones.append((
+            equipo,
+            datos["PJ"],
+            datos["PG"],
+            datos["PE"],
+            datos["PP"],
+            datos["GF"],
+            datos["GC"],
+            dg,
+            datos["Puntos"]
+        ))
+    
+    # Ordenar por: Puntos, DG, GF (descendente)
+    posiciones.sort(key=lambda x: (x[8], x[7], x[5]), reverse=True)
+    
+    return posiciones, len(partidos)
+
+
+# =====================================
+# NUEVAS FUNCIONES: CAMPAÑAS Y VERSUS
+# =====================================
+
+def obtener_campania_equipo(equipo, anio=None, campeonato=None):
+    """Obtiene todos los partidos de un equipo con sus goleadores."""
+    query = """
+        SELECT
+            p.id,
+            p.fecha,
+            p.campeonato,
+            p.equipo_local,
+            p.equipo_visitante,
+            p.goles_local,
+            p.goles_visitante,
+            CASE
+                WHEN p.equipo_local = ? THEN 'Local'
+                ELSE 'Visitante'
+            END AS lugar,
+            CASE
+                WHEN p.equipo_local = ? AND p.goles_local > p.goles_visitante THEN 'Ganado'
+                WHEN p.equipo_visitante = ? AND p.goles_visitante > p.goles_local THEN 'Ganado'
+                WHEN p.goles_local = p.goles_visitante THEN 'Empatado'
+                ELSE 'Perdido'
+            END AS resultado,
+            CASE
+                WHEN p.equipo_local = ? THEN p.goles_local
+                ELSE p.goles_visitante
+            END AS goles_favor,
+            CASE
+                WHEN p.equipo_local = ? THEN p.goles_visitante
+                ELSE p.goles_local
+            END AS goles_contra
+        FROM partidos p
+        WHERE (p.equipo_local = ? OR p.equipo_visitante = ?)
+    """
+    params = [equipo, equipo, equipo, equipo, equipo, equipo, equipo]
+    if anio:
+        query += " AND SUBSTR(p.fecha, 7, 4) = ?"
+        params.append(anio)
+    if campeonato:
+        query += " AND p.campeonato = ?"
+        params.append(campeonato)
+    
+    # ORDEN CORREGIDO: año, mes, día
+    query += " ORDER BY SUBSTR(p.fecha, 7, 4) DESC, SUBSTR(p.fecha, 4, 2) DESC, SUBSTR(p.fecha, 1, 2) DESC"
+    
+    return leer_df(query, params)
+
+def obtener_goleadores_partido(partido_id, equipo):
+    """Obtiene los goleadores de un equipo en un partido específico."""
+    query = """
+        SELECT
+            g.jugador,
+            COUNT(*) AS goles
+        FROM goles g
+        JOIN partidos p ON p.id = g.partido_id
+        WHERE g.partido_id = ?
+        AND (
+            (p.equipo_local = ? AND g.equipo = 'Local')
+            OR 
+            (p.equipo_visitante = ? AND g.equipo = 'Visitante')
+        )
+        GROUP BY g.jugador
+        ORDER BY goles DESC
+    """
+    
+    return leer_df(query, (partido_id, equipo, equipo))
+
+def obtener_historial_versus(equipo1, equipo2, anio=None, campeonato=None):
+    """Obtiene el historial de enfrentamientos entre dos equipos."""
+    query = """
+        SELECT
+            p.fecha,
+            p.campeonato,
+            p.equipo_local,
+            p.equipo_visitante,
+            p.goles_local,
+            p.goles_visitante,
+            CASE
+                WHEN p.goles_local > p.goles_visitante THEN p.equipo_local
+                WHEN p.goles_visitante > p.goles_local THEN p.equipo_visitante
+                ELSE 'Empate'
+            END AS ganador
+        FROM partidos p
+        WHERE (
+            (p.equipo_local = ? AND p.equipo_visitante = ?)
+            OR
+            (p.equipo_local = ? AND p.equipo_visitante = ?)
+        )
+    """
+    params = [equipo1, equipo2, equipo2, equipo1]
+    
+    if anio:
+        query += " AND SUBSTR(p.fecha, 7, 4) = ?"
+        params.append(anio)
+    if campeonato:
+        query += " AND p.campeonato = ?"
+        params.append(campeonato)
+    
+    # ORDEN CORREGIDO: año, mes, día
+    query += " ORDER BY SUBSTR(p.fecha, 7, 4) DESC, SUBSTR(p.fecha, 4, 2) DESC, SUBSTR(p.fecha, 1, 2) DESC"
+    
+    return leer_df(query, params)
+
+def obtener_estadisticas_versus(equipo1, equipo2, anio=None, campeonato=None):
+    """Obtiene estadísticas resumen del enfrentamiento entre dos equipos."""
+    query = """
+        SELECT
+            COUNT(*) AS total_partidos,
+            SUM(CASE WHEN p.equipo_local = ? AND p.goles_local > p.goles_visitante THEN 1
+                     WHEN p.equipo_visitante = ? AND p.goles_visitante > p.goles_local THEN 1
+                     ELSE 0 END) AS victorias_eq1,
+            SUM(CASE WHEN p.equipo_local = ? AND p.goles_local > p.goles_visitante THEN 1
+                     WHEN p.equipo_visitante = ? AND p.goles_visitante > p.goles_local THEN 1
+                     ELSE 0 END) AS victorias_eq2,
+            SUM(CASE WHEN p.goles_local = p.goles_visitante THEN 1 ELSE 0 END) AS empates,
+            SUM(CASE WHEN p.equipo_local = ? THEN p.goles_local ELSE p.goles_visitante END) AS goles_eq1,
+            SUM(CASE WHEN p.equipo_local = ? THEN p.goles_visitante ELSE p.goles_local END) AS goles_eq2
+        FROM partidos p
+        WHERE (
+            (p.equipo_local = ? AND p.equipo_visitante = ?)
+            OR
+            (p.equipo_local = ? AND p.equipo_visitante = ?)
+        )
+    """
+    params = [equipo1, equipo1, equipo2, equipo2, equipo1, equipo1, equipo1, equipo2, equipo2, equipo1]
+    
+    if anio:
+        query += " AND SUBSTR(p.fecha, 7, 4) = ?"
+        params.append(anio)
+    if campeonato:
+        query += " AND p.campeonato = ?"
+        params.append(campeonato)
+    
+    conn = conectar()
+    cur = conn.cursor()
+    cur.execute(query, params)
+    resultado = cur.fetchone()
+    conn.close()
+    
+    if resultado:
+        total, v1, v2, emp, g1, g2 = resultado
+        return {
+            "total_partidos": total or 0,
+            "victorias_eq1": v1 or 0,
+            "victorias_eq2": v2 or 0,
+            "empates": emp or 0,
+            "goles_eq1": g1 or 0,
+            "goles_eq2": g2 or 0
+        }
+    return {
+        "total_partidos": 0, "victorias_eq1": 0, "victorias_eq2": 0,
+        "empates": 0, "goles_eq1": 0, "goles_eq2": 0
+    }
+
+# =====================================
+# NUEVAS FUNCIONES: EVOLUCIÓN DE GOLES Y PUNTOS
+# =====================================
+
+def obtener_evolucion_goles_equipo(equipo):
+    """Obtiene evolución anual de goles por equipo."""
+    query = """
+        SELECT
+            SUBSTR(p.fecha, 7, 4) AS anio,
+            SUM(CASE
+                WHEN p.equipo_local = ? THEN p.goles_local
+                WHEN p.equipo_visitante = ? THEN p.goles_visitante
+                ELSE 0 END) AS goles_favor,
+            SUM(CASE
+                WHEN p.equipo_local = ? THEN p.goles_visitante
+                WHEN p.equipo_visitante = ? THEN p.goles_local
+                ELSE 0 END) AS goles_contra
+        FROM partidos p
+        WHERE (p.equipo_local = ? OR p.equipo_visitante = ?)
+        GROUP BY anio
+        ORDER BY anio
+    """
+    
+    return leer_df(query, (equipo, equipo, equipo, equipo, equipo, equipo), analitica=True)
+
+def obtener_evolucion_puntos_equipo(equipo):
+    """Obtiene evolución anual de puntos por equipo (respetando regla 2/3 puntos)."""
+    conn = conectar()
+    cur = conn.cursor()
+    
+    # Obtener todos los partidos del equipo con sus años
+    cur.execute("""
+        SELECT
+            SUBSTR(p.fecha, 7, 4) AS anio,
+            p.equipo_local,
+            p.goles_local,
+            p.equipo_visitante,
+            p.goles_visitante
+        FROM partidos p
+        WHERE p.arbitro IS NOT NULL AND p.arbitro <> ''
+        AND (p.equipo_local = ? OR p.equipo_visitante = ?)
+        ORDER BY p.fecha
+    """, (equipo, equipo))
+    
+    partidos = cur.fetchall()
+    conn.close()
+    
+    # Acumular puntos por año
+    puntos_por_anio = {}
+    
+    for partido in partidos:
+        anio, local, gl, visitante, gv = partido
+        
+        # Convertir goles a enteros
+        try:
+            gl = int(gl) if gl is not None else 0
+        except:
+            gl = 0
+        try:
+            gv = int(gv) if gv is not None else 0
+        except:
+            gv = 0
+        
+        # Determinar puntos según el año
+        puntos_victoria = 3 if int(anio) >= 1995 else 2
+        
+        # Calcular puntos obtenidos por el equipo
+        if local == equipo:
+            if gl > gv:
+                puntos = puntos_victoria
+            elif gl == gv:
+                puntos = 1
+            else:
+                puntos = 0
+        else:  # visitante == equipo
+            if gv > gl:
+                puntos = puntos_victoria
+            elif gv == gl:
+                puntos = 1
+            else:
+                puntos = 0
+        
+        # Acumular
+        if anio not in puntos_por_anio:
+            puntos_por_anio[anio] = 0
+        puntos_por_anio[anio] += puntos
+    
+    # Convertir a DataFrame
+    df = pd.DataFrame([
+        {"anio": anio, "puntos": puntos}
+        for anio, puntos in sorted(puntos_por_anio.items())
+    ])
+    
+    return df
+
+def obtener_evolucion_equipos(equipos):
+    """Evolución anual de varios equipos juntos (goles, puntos con la regla 2/3 y tarjetas),
+    en una sola consulta agrupada por año y equipo: una fila por (anio, equipo)."""
+    equipos = list(equipos)
+    if not equipos:
+        return pd.DataFrame(columns=["anio", "equipo", "partidos", "goles_favor", "goles_contra",
+                                     "puntos", "amonestaciones", "expulsiones"])
+    marcas = ", ".join("?" * len(equipos))
+    query = f"""
+        WITH lados AS (
+            SELECT SUBSTR(p.fecha, 7, 4) AS anio, p.equipo_local AS equipo,
+                   p.goles_local AS gf, p.goles_visitante AS gc
+            FROM partidos p
+            WHERE p.equipo_local IN ({marcas})
+            UNION ALL
+            SELECT SUBSTR(p.fecha, 7, 4) AS anio, p.equipo_visitante AS equipo,
+                   p.goles_visitante AS gf, p.goles_local AS gc
+            FROM partidos p
+            WHERE p.equipo_visitante IN ({marcas})
+        ),
+        partidos_anio AS (
+            SELECT
+                anio,
+                equipo,
+                COUNT(*) AS partidos,
+                SUM(gf) AS goles_favor,
+                SUM(gc) AS goles_contra,
+                SUM(CASE
+                    WHEN gf > gc AND CAST(anio AS INTEGER) >= 1995 THEN 3
+                    WHEN gf > gc THEN 2
+                    WHEN gf = gc THEN 1
+                    ELSE 0 END) AS puntos
+            FROM lados
+            GROUP BY anio, equipo
+        ),
+        tarjetas_anio AS (
+            SELECT
+                SUBSTR(p.fecha, 7, 4) AS anio,
+                CASE WHEN t.equipo = 'Local' THEN p.equipo_local ELSE p.equipo_visitante END AS equipo,
+                SUM(CASE WHEN t.tipo = 'Amonestado' THEN 1 ELSE 0 END) AS amonestaciones,
+                SUM(CASE WHEN t.tipo = 'Expulsado' THEN 1 ELSE 0 END) AS expulsiones
+            FROM tarjetas t
+            JOIN partidos p ON p.id = t.partido_id
+            WHERE (t.equipo = 'Local' AND p.equipo_local IN ({marcas}))
+               OR (t.equipo = 'Visitante' AND p.equipo_visitante IN ({marcas}))
+            GROUP BY 1, 2
+        )
+        SELECT
+            pa.anio,
+            pa.equipo,
+            pa.partidos,
+            pa.goles_favor,
+            pa.goles_contra,
+            pa.puntos,
+            COALESCE(ta.amonestaciones, 0) AS amonestaciones,
+            COALESCE(ta.expulsiones, 0) AS expulsiones
+        FROM partidos_anio pa
+        LEFT JOIN tarjetas_anio ta ON ta.anio = pa.anio AND ta.equipo = pa.equipo
+        ORDER BY pa.anio, pa.equipo
+    """
+    return leer_df(query, equipos * 4, analitica=True)
+
+# =====================================
+# TABLAS PARA MOSTRAR: CAMPAÑAS Y VERSUS
+# =====================================
+
+def obtener_goleadores_campania(equipo, anio=None, campeonato=None):
+    """Goleadores de un equipo en cada partido de su campaña, en una sola consulta."""
+    query = """
+        SELECT
+            g.partido_id,
+            g.jugador,
+            COUNT(*) AS goles
+        FROM goles g
+        JOIN partidos p ON p.id = g.partido_id
+        WHERE (
+            (p.equipo_local = ? AND g.equipo = 'Local')
+            OR 
+            (p.equipo_visitante = ? AND g.equipo = 'Visitante')
+        )
+    """
+    params = [equipo, equipo]
+    if anio:
+        query += " AND SUBSTR(p.fecha, 7, 4) = ?"
+        params.append(anio)
+    if campeonato:
+        query += " AND p.campeonato = ?"
+        params.append(campeonato)
+    query += """
+        GROUP BY g.partido_id, g.jugador
+        ORDER BY g.partido_id, goles DESC
+    """
+    return leer_df(query, params)
+
+def armar_campania(equipo, anio=None, campeonato=None, mostrar_goleadores=True):
+    """Partidos de la campaña de un equipo listos para mostrar (rival, resultado y goleadores).
+    Las columnas se arman vectorizadas y los goleadores salen de una única consulta agrupada."""
+    df_partidos = obtener_campania_equipo(equipo, anio, campeonato)
+    if df_partidos.empty:
+        return pd.DataFrame()
+    
+    es_local = (df_partidos['equipo_local'] == equipo).to_numpy()
+    gf = df_partidos['goles_favor'].astype(str)
+    gc = df_partidos['goles_contra'].astype(str)
+    
+    df_display = pd.DataFrame({
+        "Fecha": df_partidos['fecha'],
+        "Lugar": df_partidos['lugar'],
+        "Torneo": df_partidos['campeonato'],
+        "Rival": np.where(es_local, df_partidos['equipo_visitante'].astype(object), df_partidos['equipo_local'].astype(object)),
+        "Resultado": np.where(es_local, gf + "-" + gc, gc + "-" + gf),
+        "GF": df_partidos['goles_favor'],
+        "GC": df_partidos['goles_contra'],
+        "⚽": df_partidos['resultado'],
+        "Goleadores": "-",
+    })
+    
+    if mostrar_goleadores:
+        df_goles = obtener_goleadores_campania(equipo, anio, campeonato)
+        if not df_goles.empty:
+            jugadores = df_goles['jugador'].astype(object)
+            nombres = {j: formatear_goleador(j, 1) for j in jugadores.unique()}
+            texto = jugadores.map(nombres) + np.where(df_goles['goles'] > 1, " (" + df_goles['goles'].astype(str) + ")", "")
+            por_partido = texto.groupby(df_goles['partido_id'].to_numpy(), sort=False).agg(", ".join)
+            df_display["Goleadores"] = df_partidos['id'].map(por_partido).fillna("-").to_numpy()
+    
+    df_display["Rival"] = df_display["Rival"].astype("category")
+    return df_display
+
+def armar_historial_versus(equipo1, equipo2, anio=None, campeonato=None):
+    """Historial de enfrentamientos entre dos equipos listo para mostrar."""
+    df_historial = obtener_historial_versus(equipo1, equipo2, anio, campeonato)
+    if df_historial.empty:
+        return pd.DataFrame()
+    
+    ganador = df_historial['ganador'].astype(object)
+    return pd.DataFrame({
+        "Fecha": df_historial['fecha'],
+        "Torneo": df_historial['campeonato'],
+        "Local": df_historial['equipo_local'],
+        "Visitante": df_historial['equipo_visitante'],
+        "Resultado": df_historial['goles_local'].astype(str) + "-" + df_historial['goles_visitante'].astype(str),
+        "🏆 Ganador": ganador.where(ganador != 'Empate', "🤝 Empate"),
+    })
+
+# =====================================
+# EJECUCIÓN CONCURRENTE DE CONSULTAS INDEPENDIENTES
+# =====================================
+_pool_consultas = ThreadPoolExecutor(max_workers=8, thread_name_prefix="consultas")
+
+def _en_ejecucion(ejecucion, base, funcion, *args):
+    ejecucion.inicio = time.monotonic()
+    token = _ejecucion.set(ejecucion)
+    try:
+        with en_base(base):
+            return funcion(*args)
+    finally:
+        _ejecucion.reset(token)
+
+def ejecutar_concurrente(llamadas, timeout=15):
+    """Ejecuta en paralelo las consultas independientes de una vista.
+    `llamadas` es un dict nombre → (función, *args). Devuelve (resultados, errores), ambos por nombre:
+    una llamada que falla o tarda más de `timeout` segundos queda en `errores` sin afectar a las demás.
+    El plazo es de cada llamada y corre desde que empieza (no mientras espera un hilo libre), así
+    que una lenta no le descuenta tiempo a las otras. Cada llamada corre en su propia ejecución
+    (hija de la actual), así que al vencer el plazo se interrumpe su consulta en vez de dejar
+    ocupado el hilo del pool. Las llamadas leen la misma liga que quien las lanza."""
+    padre = _ejecucion.get()
+    base = _base.get()
+    ejecuciones = {nombre: Ejecucion(padre.cancelada if padre else None) for nombre in llamadas}
+    futuros = {
+        nombre: _pool_consultas.submit(_en_ejecucion, ejecuciones[nombre], base, funcion, *args)
+        for nombre, (funcion, *args) in llamadas.items()
+    }
+    resultados, errores = {}, {}
+    pendientes = dict(futuros)
+    while pendientes:
+        ahora = time.monotonic()
+        plazos = []
+        for nombre, futuro in list(pendientes.items()):
+            inicio = ejecuciones[nombre].inicio
+            if futuro.done():
+                del pendientes[nombre]
+                try:
+                    resultados[nombre] = futuro.result()
+                except Exception as e:
+                    errores[nombre] = e
+            elif inicio is not None and ahora - inicio >= timeout:
+                del pendientes[nombre]
+                ejecuciones[nombre].cancelar(f"superó el límite de {timeout} s")
+                errores[nombre] = TimeoutError(f"superó el límite de {timeout} s")
+            elif inicio is not None:
+                plazos.append(inicio + timeout)
+            else:
+                plazos.append(ahora + 0.05)  # todavía en cola: se revisa pronto si ya arrancó
+        if pendientes:
+            wait(pendientes.values(), timeout=max(0.0, min(plazos) - ahora), return_when=FIRST_COMPLETED)
+    return resultados, errores
+
+# =====================================
+# CONSULTAS ENTRE LIGAS (EN PARALELO POR BASE)
+# =====================================
+def _en_liga(db, funcion):
+    def llamada(*args):
+        with en_base(db):
+            return funcion(*args)
+    return llamada
+
+def en_ligas(ligas, funcion, *args, timeout=15):
+    """Corre `funcion(*args)` sobre cada liga de `ligas` ({nombre: base}) en paralelo, cada una
+    contra su propio archivo. Devuelve (resultados, errores) por nombre de liga."""
+    return ejecutar_concurrente(
+        {nombre: (_en_liga(db, funcion), *args) for nombre, db in ligas.items()}, timeout
+    )
+
+def combinar(resultados, columna="Liga"):
+    """Une los DataFrames de cada liga agregando la columna `columna` con su nombre."""
+    partes = [df.assign(**{columna: nombre}) for nombre, df in resultados.items() if df is not None and not df.empty]
+    if not partes:
+        return pd.DataFrame()
+    return pd.concat([df.astype({c: object for c in df.select_dtypes("category").columns}) for df in partes],
+                     ignore_index=True)
+
+def obtener_goleadores_ligas(ligas, anio=None, campeonato=None, limite=50):
+    """Ranking de goleadores de varias ligas juntas (un jugador por liga). Devuelve (ranking, errores)."""
+    resultados, errores = en_ligas(ligas, obtener_goles_por_jugador, anio, campeonato)
+    ranking = combinar(resultados)
+    if ranking.empty:
+        return ranking, errores
+    ranking = ranking.sort_values(["goles", "jugador", "Liga"], ascending=[False, True, True], kind="stable")
+    return compactar(ranking.head(limite).reset_index(drop=True)), errores
+
+def obtener_versus_ligas(ligas, equipo1, equipo2):
+    """Enfrentamientos entre dos equipos buscados en todas las `ligas` (p. ej. de ligas vecinas
+    que se cruzaron en un torneo regional). Devuelve (estadísticas sumadas, historial, errores)."""
+    estadisticas, errores = en_ligas(ligas, obtener_estadisticas_versus, equipo1, equipo2)
+    historiales, errores_historial = en_ligas(ligas, armar_historial_versus, equipo1, equipo2)
+    total = {}
+    for resumen in estadisticas.values():
+        for clave, valor in resumen.items():
+            total[clave] = total.get(clave, 0) + valor
+    historial = combinar(historiales)
+    if not historial.empty:
+        orden = pd.to_datetime(historial["Fecha"], format="%d/%m/%Y", errors="coerce")
+        historial = (historial.assign(_orden=orden)
+                     .sort_values("_orden", ascending=False, kind="stable")
+                     .drop(columns="_orden").reset_index(drop=True))
+    return total, historial, {**errores, **errores_historial}
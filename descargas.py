@@ -0,0 +1,347 @@
+"""Descargas de cualquier vista (obtener_*/armar_*) o de la base completa en CSV, Excel o Parquet.
+
+Los resultados se escriben por bloques a un archivo en `.cache/descargas` (nunca se arma el
+archivo entero en memoria) y quedan cacheados por (vista, filtros, versión de la base, formato):
+descargar dos veces lo mismo no vuelve a consultar ni a escribir nada.
+"""
+import csv
+import hashlib
+import inspect
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import zipfile
+from xml.sax.saxutils import escape
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+import consultas
+from base_datos import DB, DIR_CACHE, version_db
+
+# =====================================
+# CONFIGURACIÓN
+# =====================================
+TAMANIO_BLOQUE = 5000
+DIR_DESCARGAS = os.path.join(DIR_CACHE, "descargas")
+MAX_ARCHIVOS = 100
+
+FORMATOS = {
+    "csv": ("CSV", "text/csv", ".csv"),
+    "xlsx": ("Excel", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", ".xlsx"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet", ".parquet"),
+}
+
+# Volcado completo: tablas crudas más goles y tarjetas con el partido y el club ya resueltos
+VOLCADO = {
+    "partidos": "SELECT * FROM partidos ORDER BY id",
+    "goles": """
+        SELECT g.id, g.partido_id, p.fecha, p.campeonato,
+               CASE WHEN g.equipo = 'Local' THEN p.equipo_local ELSE p.equipo_visitante END AS club,
+               g.jugador
+        FROM goles g LEFT JOIN partidos p ON p.id = g.partido_id
+        ORDER BY g.id
+    """,
+    "tarjetas": """
+        SELECT t.id, t.partido_id, p.fecha, p.campeonato, t.arbitro,
+               CASE WHEN t.equipo = 'Local' THEN p.equipo_local ELSE p.equipo_visitante END AS club,
+               t.jugador, t.tipo
+        FROM tarjetas t LEFT JOIN partidos p ON p.id = t.partido_id
+        ORDER BY t.id
+    """,
+    "equipos_zonas": "SELECT * FROM equipos_zonas ORDER BY zona, equipo",
+}
+
+COLUMNAS_TABLA_HISTORICA = ["Equipo", "PJ", "PG", "PE", "PP", "GF", "GC", "DG", "Puntos"]
+
+
+def formatos_disponibles():
+    """Parquet solo si está pyarrow."""
+    return [f for f in FORMATOS if f != "parquet" or pq is not None]
+
+
+def vistas_exportables():
+    """{nombre: función} de las vistas de `consultas` (obtener_* y armar_*) con argumentos simples."""
+    vistas = {}
+    for nombre, funcion in inspect.getmembers(consultas, inspect.isfunction):
+        if funcion.__module__ != consultas.__name__ or not nombre.startswith(("obtener_", "armar_")):
+            continue
+        if "ligas" in inspect.signature(funcion).parameters:
+            continue
+        vistas[nombre] = funcion
+    return vistas
+
+
+def a_dataframe(resultado):
+    """Lleva el resultado de una vista (DataFrame, dict, lista o la tupla de la tabla histórica) a DataFrame."""
+    if isinstance(resultado, pd.DataFrame):
+        return resultado
+    if isinstance(resultado, dict):
+        return pd.DataFrame([resultado])
+    if isinstance(resultado, tuple) and len(resultado) == 2 and isinstance(resultado[0], list):
+        return pd.DataFrame(resultado[0], columns=COLUMNAS_TABLA_HISTORICA)  # (posiciones, partidos)
+    if isinstance(resultado, list):
+        if resultado and isinstance(resultado[0], (tuple, list)):
+            return pd.DataFrame(resultado)
+        return pd.DataFrame({"valor": resultado})
+    return pd.DataFrame({"valor": [resultado]})
+
+
+# =====================================
+# FUENTES: BLOQUES DE FILAS
+# =====================================
+def _bloques_df(df):
+    """(columnas, filas) de a TAMANIO_BLOQUE filas de un DataFrame."""
+    columnas = [str(c) for c in df.columns]
+    if df.empty:
+        yield columnas, []
+    for inicio in range(0, len(df), TAMANIO_BLOQUE):
+        parte = df.iloc[inicio:inicio + TAMANIO_BLOQUE].astype(object)
+        yield columnas, [[None if pd.isna(v) else v for v in fila] for fila in parte.itertuples(index=False)]
+
+
+def _tipo_arrow(tipos):
+    """Tipo de Parquet de una columna según los tipos de sus valores no nulos (de Python o el
+    `typeof` de SQLite). Sin valores, o con texto mezclado, queda como texto."""
+    if tipos and tipos <= {"bool"}:
+        return pa.bool_()
+    if tipos and tipos <= {"int", "integer"}:
+        return pa.int64()
+    if tipos and tipos <= {"int", "integer", "float", "real"}:
+        return pa.float64()
+    return pa.string()
+
+
+def _tipos_df(df):
+    """{columna: tipo de Parquet} de un DataFrame: por dtype, y las columnas object o categóricas
+    mirando la columna entera (no solo el primer bloque)."""
+    tipos = {}
+    for columna in df.columns:
+        serie = df[columna]
+        if pd.api.types.is_bool_dtype(serie):
+            tipos[str(columna)] = pa.bool_()
+        elif pd.api.types.is_integer_dtype(serie):
+            tipos[str(columna)] = pa.int64()
+        elif pd.api.types.is_float_dtype(serie):
+            tipos[str(columna)] = pa.float64()
+        elif pd.api.types.is_datetime64_dtype(serie):
+            tipos[str(columna)] = pa.timestamp("us")
+        else:
+            valores = serie.dropna().map(lambda v: v.item() if hasattr(v, "item") else v)
+            clases = {"bool" if isinstance(v, bool) else "int" if isinstance(v, int)
+                      else "float" if isinstance(v, float) else "str" for v in valores.unique()}
+            tipos[str(columna)] = _tipo_arrow(clases)
+    return tipos
+
+
+def _tipos_cursor(db, query):
+    """{columna: tipo de Parquet} del resultado de `query`, con los `typeof` de toda la columna
+    (SQLite no obliga a respetar el tipo declarado)."""
+    conn = sqlite3.connect(db)
+    try:
+        columnas = [d[0] for d in conn.execute(f"SELECT * FROM ({query}) LIMIT 0").description]
+        distintos = conn.execute("SELECT " + ", ".join(
+            f"GROUP_CONCAT(DISTINCT TYPEOF(\"{c}\"))" for c in columnas
+        ) + f" FROM ({query})").fetchone()
+    finally:
+        conn.close()
+    return {c: _tipo_arrow(set((t or "").split(",")) - {"", "null"}) for c, t in zip(columnas, distintos)}
+
+
+def _bloques_cursor(db, query):
+    """(columnas, filas) leídas con fetchmany: en memoria hay un solo bloque a la vez."""
+    conn = sqlite3.connect(db)
+    try:
+        cur = conn.execute(query)
+        columnas = [d[0] for d in cur.description]
+        filas = cur.fetchmany(TAMANIO_BLOQUE)
+        yield columnas, filas
+        while filas:
+            filas = cur.fetchmany(TAMANIO_BLOQUE)
+            if filas:
+                yield columnas, filas
+    finally:
+        conn.close()
+
+
+# =====================================
+# ESCRITORES
+# =====================================
+def _escribir_csv(ruta, bloques, tipos=None):
+    with open(ruta, "w", newline="", encoding="utf-8-sig") as f:  # con BOM: Excel respeta los acentos
+        escritor = csv.writer(f)
+        for i, (columnas, filas) in enumerate(bloques):
+            if i == 0:
+                escritor.writerow(columnas)
+            escritor.writerows(filas)
+
+
+def _escribir_parquet(ruta, bloques, tipos):
+    """El esquema sale de `tipos()` antes del primer bloque, así que una columna vacía al principio
+    o con tipos mezclados no rompe los bloques siguientes: cada bloque se convierte a ese esquema."""
+    tipos = tipos()
+    escritor = None
+    try:
+        for columnas, filas in bloques:
+            if escritor is None:
+                esquema = pa.schema([(c, tipos.get(c, pa.string())) for c in columnas])
+                escritor = pq.ParquetWriter(ruta, esquema)
+            valores = list(zip(*filas)) if filas else [()] * len(columnas)
+            escritor.write_table(pa.Table.from_arrays(
+                [_columna_arrow(v, campo.type) for v, campo in zip(valores, esquema)], schema=esquema))
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+
+def _columna_arrow(valores, tipo):
+    if tipo == pa.string():
+        valores = [None if v is None else str(v) for v in valores]
+    elif tipo == pa.float64():
+        valores = [None if v is None else float(v) for v in valores]
+    return pa.array(valores, type=tipo)
+
+
+_NO_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _celda(valor):
+    if hasattr(valor, "item") and not isinstance(valor, (str, bytes)):
+        valor = valor.item()  # escalares de numpy
+    if valor is None:
+        return "<c/>"
+    if isinstance(valor, bool):
+        return f'<c t="b"><v>{int(valor)}</v></c>'
+    if isinstance(valor, (int, float)) and valor == valor:
+        return f"<c><v>{valor}</v></c>"
+    texto = escape(_NO_XML.sub("", str(valor)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>'
+
+
+def _escribir_xlsx(ruta, hojas):
+    """Libro de Excel mínimo (una hoja por fuente) escrito fila a fila dentro del zip, sin openpyxl."""
+    nombres = []
+    with zipfile.ZipFile(ruta, "w", zipfile.ZIP_DEFLATED) as libro:
+        for numero, (nombre, bloques, _) in enumerate(hojas, start=1):
+            nombres.append(re.sub(r"[\[\]:*?/\\]", "_", nombre)[:31] or f"Hoja{numero}")
+            with libro.open(f"xl/worksheets/sheet{numero}.xml", "w") as hoja:
+                hoja.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                           b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                           b"<sheetData>")
+                for i, (columnas, filas) in enumerate(bloques):
+                    if i == 0:
+                        hoja.write(("<row>" + "".join(map(_celda, columnas)) + "</row>").encode("utf-8"))
+                    hoja.write("".join("<row>" + "".join(map(_celda, fila)) + "</row>" for fila in filas).encode("utf-8"))
+                hoja.write(b"</sheetData></worksheet>")
+        n = range(1, len(nombres) + 1)
+        libro.writestr("[Content_Types].xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            + "".join(f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+                      'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                      for i in n)
+            + "</Types>")
+        libro.writestr("_rels/.rels",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="xl/workbook.xml"/></Relationships>')
+        libro.writestr("xl/workbook.xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>'
+            + "".join(f'<sheet name="{escape(nombre, {chr(34): "&quot;"})}" sheetId="{i}" r:id="rId{i}"/>'
+                      for i, nombre in zip(n, nombres))
+            + "</sheets></workbook>")
+        libro.writestr("xl/_rels/workbook.xml.rels",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + "".join(f'<Relationship Id="rId{i}" '
+                      'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+                      f'Target="worksheets/sheet{i}.xml"/>' for i in n)
+            + "</Relationships>")
+
+
+def _escribir(ruta, formato, hojas):
+    """Escribe `hojas` [(nombre, bloques, tipos)] en `ruta` (`tipos()` da el esquema de Parquet).
+    CSV y Parquet con varias hojas van en un zip."""
+    if formato == "xlsx":
+        _escribir_xlsx(ruta, hojas)
+        return
+    escribir = _escribir_csv if formato == "csv" else _escribir_parquet
+    if len(hojas) == 1:
+        escribir(ruta, *hojas[0][1:])
+        return
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(ruta)) as carpeta, \
+            zipfile.ZipFile(ruta, "w", zipfile.ZIP_DEFLATED) as paquete:
+        for nombre, bloques, tipos in hojas:
+            archivo = os.path.join(carpeta, nombre + FORMATOS[formato][2])
+            escribir(archivo, bloques, tipos)
+            paquete.write(archivo, os.path.basename(archivo))
+            os.remove(archivo)
+
+
+# =====================================
+# CACHÉ DE ARCHIVOS
+# =====================================
+def _podar():
+    archivos = sorted((os.path.join(DIR_DESCARGAS, a) for a in os.listdir(DIR_DESCARGAS)), key=os.path.getmtime)
+    for archivo in archivos[:-MAX_ARCHIVOS]:
+        try:
+            os.remove(archivo)
+        except OSError:
+            pass
+
+
+def _generar(clave, extension, hojas_de):
+    """Ruta del archivo cacheado para `clave`; si no existe lo escribe (a un temporal y luego
+    `os.replace`, así otro proceso nunca ve un archivo a medias)."""
+    os.makedirs(DIR_DESCARGAS, exist_ok=True)
+    nombre = hashlib.sha1(json.dumps(clave, default=str, ensure_ascii=False).encode()).hexdigest()
+    ruta = os.path.join(DIR_DESCARGAS, nombre + extension)
+    if os.path.exists(ruta):
+        os.utime(ruta)
+        return ruta
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        _escribir(temporal, clave[-1], hojas_de())
+        os.replace(temporal, ruta)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+    _podar()
+    return ruta
+
+
+def exportar_vista(nombre, kwargs, formato, db=DB):
+    """Archivo con el resultado de la vista `nombre`(**kwargs) de la base `db`."""
+    funcion = vistas_exportables()[nombre]
+
+    def hojas():
+        with consultas.en_base(db):
+            df = a_dataframe(funcion(**kwargs))
+        return [(nombre.split("_", 1)[1], _bloques_df(df), lambda: _tipos_df(df))]
+
+    clave = ["vista", os.path.abspath(db), version_db(db), nombre, sorted(kwargs.items()), formato]
+    return _generar(clave, FORMATOS[formato][2], hojas)
+
+
+def exportar_base(formato, db=DB):
+    """Archivo con todas las tablas (xlsx: una hoja por tabla; csv/parquet: un zip)."""
+    extension = FORMATOS[formato][2] if formato == "xlsx" else ".zip"
+    clave = ["base", os.path.abspath(db), version_db(db), formato]
+    return _generar(clave, extension, lambda: [
+        (tabla, _bloques_cursor(db, query), lambda query=query: _tipos_cursor(db, query))
+        for tabla, query in VOLCADO.items()
+    ])
@@ -0,0 +1,208 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+
+from base_datos import DB, DIR_CACHE, archivo_por_base, version_db, leer_partidos, huella_partidos
+
+# =====================================
+# RATING ELO POR EQUIPO
+# =====================================
+RATING_INICIAL = 1500.0
+K = 20.0
+VENTAJA_LOCAL = 60.0
+
+
+def _multiplicador_goles(dif):
+    """Peso por diferencia de gol (criterio del World Football Elo)."""
+    dif = abs(dif)
+    if dif <= 1:
+        return 1.0
+    if dif == 2:
+        return 1.5
+    return (11.0 + dif) / 8.0
+
+
+def _ruta_checkpoint(db):
+    return archivo_por_base("elo", db, ".npz")
+
+
+class MotorElo:
+    """Serie de rating Elo de cada equipo, reproduciendo `partidos` en orden cronológico.
+    El estado (ratings actuales y la serie completa en arrays compactos) se guarda como
+    checkpoint en disco; al agregarse partidos nuevos solo se procesa la cola.
+
+    La serie (equipos, índice y los cuatro arrays) vive en una sola tupla `_serie` que se
+    reemplaza de una vez: las consultas, que no toman el lock, nunca mezclan arrays de
+    largos distintos aunque el vigilante esté procesando partidos en otro hilo."""
+
+    def __init__(self, db=DB):
+        self.db = db
+        self._lock = threading.Lock()
+        self._version = None
+        self._vaciar()
+        self._cargar_checkpoint()
+
+    def _vaciar(self):
+        self._ultimo_id = 0
+        self._ultimo_orden = 0
+        self._huella = None
+        self._actual = np.zeros(0, dtype=np.float64)
+        # equipos, índice por nombre y una fila por equipo y partido:
+        # id, orden (yyyymmdd), equipo, rating luego del partido
+        self._serie = ([], {}, np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32),
+                       np.zeros(0, dtype=np.int16), np.zeros(0, dtype=np.float32))
+
+    # ---------- checkpoint ----------
+    def _cargar_checkpoint(self):
+        ruta = _ruta_checkpoint(self.db)
+        if not os.path.exists(ruta):
+            return
+        try:
+            with np.load(ruta) as datos:
+                if tuple(datos["parametros"]) != (RATING_INICIAL, K, VENTAJA_LOCAL):
+                    return
+                if datos["huella"].dtype != np.uint64:
+                    return  # checkpoint de una versión anterior de la huella
+                equipos = [str(e) for e in datos["equipos"]]
+                self._actual = datos["actual"]
+                self._serie = (equipos, {e: i for i, e in enumerate(equipos)},
+                               datos["ids"], datos["orden"], datos["equipo"], datos["rating"])
+                self._ultimo_id, self._ultimo_orden = (int(v) for v in datos["ultimo"])
+                self._huella = tuple(int(v) for v in datos["huella"])
+        except Exception:
+            self._vaciar()
+
+    def _guardar_checkpoint(self):
+        ruta = _ruta_checkpoint(self.db)
+        try:
+            os.makedirs(DIR_CACHE, exist_ok=True)
+            equipos, _, ids, orden, equipo, rating = self._serie
+            temporal = ruta + f".{os.getpid()}.tmp.npz"
+            np.savez(
+                temporal,
+                parametros=np.array([RATING_INICIAL, K, VENTAJA_LOCAL]),
+                equipos=np.array(equipos, dtype=str),
+                actual=self._actual,
+                ids=ids,
+                orden=orden,
+                equipo=equipo,
+                rating=rating,
+                ultimo=np.array([self._ultimo_id, self._ultimo_orden], dtype=np.int64),
+                huella=np.array(self._huella, dtype=np.uint64),
+            )
+            os.replace(temporal, ruta)
+        except OSError:
+            pass
+
+    # ---------- cálculo ----------
+    def _procesar(self, tramo):
+        """Reproduce un tramo de partidos (ya ordenado cronológicamente) sobre los ratings actuales."""
+        equipos, indice, ids_previos, orden_previo, equipo_previo, rating_previo = self._serie
+        equipos, indice = list(equipos), dict(indice)
+        for equipo in pd.unique(tramo[["equipo_local", "equipo_visitante"]].values.ravel()):
+            if equipo not in indice:
+                indice[equipo] = len(equipos)
+                equipos.append(equipo)
+        actual = np.full(len(equipos), RATING_INICIAL, dtype=np.float64)
+        actual[:len(self._actual)] = self._actual
+
+        n = len(tramo)
+        local = tramo["equipo_local"].map(indice).to_numpy()
+        visitante = tramo["equipo_visitante"].map(indice).to_numpy()
+        gl = tramo["goles_local"].to_numpy()
+        gv = tramo["goles_visitante"].to_numpy()
+        resultado = np.where(gl > gv, 1.0, np.where(gl < gv, 0.0, 0.5))
+        peso = K * np.array([_multiplicador_goles(d) for d in (gl - gv)])
+
+        post_local = np.empty(n, dtype=np.float64)
+        post_visitante = np.empty(n, dtype=np.float64)
+        for i in range(n):
+            l, v = local[i], visitante[i]
+            esperado = 1.0 / (1.0 + 10.0 ** ((actual[v] - actual[l] - VENTAJA_LOCAL) / 400.0))
+            delta = peso[i] * (resultado[i] - esperado)
+            actual[l] += delta
+            actual[v] -= delta
+            post_local[i] = actual[l]
+            post_visitante[i] = actual[v]
+
+        ids = tramo["id"].to_numpy(dtype=np.int32)
+        orden = tramo["orden"].to_numpy(dtype=np.int32)
+        self._serie = (
+            equipos, indice,
+            np.concatenate([ids_previos, ids, ids]),
+            np.concatenate([orden_previo, orden, orden]),
+            np.concatenate([equipo_previo, local.astype(np.int16), visitante.astype(np.int16)]),
+            np.concatenate([rating_previo, post_local.astype(np.float32), post_visitante.astype(np.float32)]),
+        )
+        self._actual = actual
+        self._ultimo_id = int(max(self._ultimo_id, ids.max()))
+        self._ultimo_orden = int(max(self._ultimo_orden, orden.max()))
+
+    def actualizar(self):
+        """Sincroniza con la base procesando solo los partidos nuevos. Devuelve True si hubo cambios."""
+        version = version_db(self.db)
+        if version == self._version:
+            return False
+        with self._lock:
+            if version == self._version:
+                return False
+            if self._ultimo_id and huella_partidos(self.db, self._ultimo_id) != self._huella:
+                self._vaciar()
+
+            tramo = leer_partidos(self.db, self._ultimo_id)
+            if not tramo.empty and int(tramo["orden"].min()) < self._ultimo_orden:
+                # Partidos cargados fuera de orden cronológico: se reproduce todo
+                self._vaciar()
+                tramo = leer_partidos(self.db, 0)
+
+            if not tramo.empty:
+                self._procesar(tramo)
+                self._huella = huella_partidos(self.db, self._ultimo_id)
+                self._guardar_checkpoint()
+            self._version = version
+            return True
+
+    # ---------- consultas ----------
+    def serie_equipo(self, equipo):
+        """Rating de un equipo luego de cada partido, en orden cronológico."""
+        self.actualizar()
+        _, indice, ids, orden, equipos_fila, rating = self._serie
+        i = indice.get(equipo)
+        if i is None:
+            return pd.DataFrame(columns=["fecha", "rating"])
+        mascara = equipos_fila == i
+        orden = orden[mascara]
+        ids = ids[mascara]
+        posicion = np.lexsort((ids, orden))
+        return pd.DataFrame({
+            "fecha": pd.to_datetime(orden[posicion].astype(str), format="%Y%m%d"),
+            "rating": rating[mascara][posicion],
+        })
+
+    def tabla_a_fecha(self, fecha=None):
+        """Ranking de ratings vigente a una fecha ('dd/mm/yyyy'); sin fecha, el ranking actual."""
+        self.actualizar()
+        equipos, _, ids, orden, equipos_fila, rating = self._serie
+        if not equipos:
+            return pd.DataFrame(columns=["Equipo", "Rating", "PJ"])
+        if fecha:
+            dia, mes, anio_fecha = fecha.strip().split("/")
+            limite = int(f"{int(anio_fecha):04d}{int(mes):02d}{int(dia):02d}")
+            mascara = orden <= limite
+        else:
+            mascara = np.ones(len(orden), dtype=bool)
+
+        df = pd.DataFrame({
+            "equipo": equipos_fila[mascara],
+            "orden": orden[mascara],
+            "id": ids[mascara],
+            "rating": rating[mascara],
+        }).sort_values(["orden", "id"], kind="stable")
+        ultimo = df.groupby("equipo").agg(rating=("rating", "last"), pj=("rating", "size"))
+        tabla = pd.DataFrame({
+            "Equipo": [equipos[i] for i in ultimo.index],
+            "Rating": ultimo["rating"].round(0).astype(int).values,
+            "PJ": ultimo["pj"].values,
+        })
+        return tabla.sort_values("Rating", ascending=False).reset_index(drop=True)
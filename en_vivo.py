@@ -0,0 +1,231 @@
+import os
+import sqlite3
+import threading
+import urllib.request
+from collections import Counter
+
+from base_datos import DB
+
+# =====================================
+# MODO EN VIVO: TABLAS ACTUALIZADAS POR DELTA
+# =====================================
+COLUMNAS_TABLA = ("PJ", "PG", "PE", "PP", "GF", "GC", "Puntos")
+
+
+def _entero(valor):
+    try:
+        return int(valor) if valor is not None else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def _anio(fecha):
+    try:
+        return int(fecha.split('/')[2]) if fecha else 0
+    except (IndexError, ValueError):
+        return 0
+
+
+def _mover(contador, valores, signo):
+    """Suma (o resta) `valores` en `contador`, quitando las claves que quedan en cero."""
+    for clave, n in valores.items():
+        contador[clave] += signo * n
+        if contador[clave] == 0:
+            del contador[clave]
+
+
+def _aporte(fila, goles, tarjetas):
+    """Lo que un partido suma a cada acumulado: posiciones, cruces, goleadores y resumen por equipo.
+    Sigue las mismas reglas que `obtener_tabla_historica_acumulada` (partidos con ambos equipos
+    cargados) y `obtener_goles_por_jugador` (goles con jugador, de cualquier partido)."""
+    fecha, local, gl, visitante, gv = fila
+    tabla, cruce = {}, {}
+    if local and visitante:
+        gl, gv = _entero(gl), _entero(gv)
+        puntos_victoria = 3 if _anio(fecha) >= 1995 else 2
+        tabla[local] = Counter(PJ=1, GF=gl, GC=gv)
+        tabla[visitante] = Counter(PJ=1, GF=gv, GC=gl)
+        if gl > gv:
+            tabla[local].update(PG=1, Puntos=puntos_victoria)
+            tabla[visitante].update(PP=1)
+        elif gl < gv:
+            tabla[visitante].update(PG=1, Puntos=puntos_victoria)
+            tabla[local].update(PP=1)
+        else:
+            for equipo in (local, visitante):
+                tabla[equipo].update(PE=1, Puntos=1)
+        # Resultado del cruce entre los dos equipos (clave ordenada: el mismo par de ida y de vuelta)
+        (a, ga), (b, gb) = sorted(((local, gl), (visitante, gv)))
+        cruce[(a, b)] = Counter(PJ=1, GA=ga, GB=gb, VA=int(ga > gb), E=int(ga == gb), VB=int(ga < gb))
+
+    por_lado = {lado: equipo for lado, equipo in (("Local", local), ("Visitante", visitante)) if equipo}
+    goleadores = Counter()
+    goleadores_equipo = {}
+    for lado, jugador in goles:
+        if jugador and jugador.strip():
+            goleadores[jugador] += 1
+            if lado in por_lado:
+                goleadores_equipo.setdefault(por_lado[lado], Counter())[jugador] += 1
+    tarjetas_equipo = {}
+    for lado, tipo in tarjetas:
+        if lado in por_lado:
+            tarjetas_equipo.setdefault(por_lado[lado], Counter())[tipo] += 1
+    return tabla, cruce, goleadores, goleadores_equipo, tarjetas_equipo
+
+
+class TablaEnVivo:
+    """Posiciones, goleadores y resúmenes por equipo que se actualizan partido a partido.
+
+    Se guarda el aporte de cada partido: al cargarse o corregirse un partido (con sus goles y
+    tarjetas) se resta su aporte anterior y se suma el nuevo, sin recorrer el historial.
+    `aplicar` es idempotente, así que recibir dos veces el mismo id no duplica nada.
+
+    Con `suscribir` (p. ej. `VigilanteDB.suscribir`) la tabla se registra para recibir los cambios
+    antes de la carga inicial: un cambio avisado mientras carga espera a que termine y se aplica
+    después, en lugar de perderse."""
+
+    def __init__(self, db=DB, suscribir=None):
+        self.db = db
+        self._lock = threading.Lock()
+        self.version = 0
+        with self._lock:
+            self._vaciar()
+        if suscribir is not None:
+            suscribir(lambda ids, equipos: self.aplicar(ids))
+        self._cargar()
+
+    def _conectar(self):
+        # Sin transacciones implícitas: cada lectura abre la suya con BEGIN para ver una sola instantánea
+        return sqlite3.connect("file:" + urllib.request.pathname2url(os.path.abspath(self.db)) + "?mode=ro",
+                               uri=True, isolation_level=None)
+
+    def _leer(self, conn, filtro="", ids=()):
+        """(partidos, goles, tarjetas) leídos dentro de una misma transacción de lectura: una carga
+        que llega en medio no puede dejar goles o tarjetas de otra versión que los partidos."""
+        por_id = f"WHERE id {filtro}" if filtro else ""
+        por_partido = f"WHERE partido_id {filtro}" if filtro else ""
+        conn.execute("BEGIN")
+        try:
+            partidos = conn.execute(f"""
+                SELECT id, fecha, equipo_local, goles_local, equipo_visitante, goles_visitante
+                FROM partidos {por_id}
+            """, ids).fetchall()
+            goles, tarjetas = {}, {}
+            for partido_id, lado, jugador in conn.execute(
+                    f"SELECT partido_id, equipo, jugador FROM goles {por_partido}", ids):
+                goles.setdefault(partido_id, []).append((lado, jugador))
+            for partido_id, lado, tipo in conn.execute(
+                    f"SELECT partido_id, equipo, tipo FROM tarjetas {por_partido}", ids):
+                tarjetas.setdefault(partido_id, []).append((lado, tipo))
+        finally:
+            conn.execute("COMMIT")
+        return partidos, goles, tarjetas
+
+    def _vaciar(self):
+        self._aportes = {}
+        self._jugados = 0
+        self._memo = None
+        self._tabla = {}
+        self._cruces = {}
+        self._goleadores = Counter()
+        self._goleadores_equipo = {}
+        self._tarjetas_equipo = {}
+
+    def _cargar(self):
+        # Se lee con el lock tomado: un `aplicar` que llegue durante la carga se aplica sobre ella
+        with self._lock:
+            conn = self._conectar()
+            try:
+                partidos, goles, tarjetas = self._leer(conn)
+            finally:
+                conn.close()
+            self._vaciar()
+            for partido_id, *fila in partidos:
+                self._sumar(partido_id, _aporte(fila, goles.get(partido_id, ()), tarjetas.get(partido_id, ())))
+            self.version += 1
+
+    # ---------- deltas ----------
+    def _sumar(self, partido_id, aporte, signo=1):
+        if aporte is None:
+            return
+        tabla, cruce, goleadores, goleadores_equipo, tarjetas_equipo = aporte
+        if tabla:
+            self._jugados += signo
+        for equipo, valores in tabla.items():
+            _mover(self._tabla.setdefault(equipo, Counter()), valores, signo)
+            if not self._tabla[equipo]:
+                del self._tabla[equipo]
+        _mover(self._goleadores, goleadores, signo)
+        for destino, origen in ((self._cruces, cruce),
+                                (self._goleadores_equipo, goleadores_equipo),
+                                (self._tarjetas_equipo, tarjetas_equipo)):
+            for clave, valores in origen.items():
+                _mover(destino.setdefault(clave, Counter()), valores, signo)
+                if not destino[clave]:
+                    del destino[clave]
+        if signo > 0:
+            self._aportes[partido_id] = aporte
+        else:
+            del self._aportes[partido_id]
+
+    def aplicar(self, ids):
+        """Vuelve a leer los partidos `ids` (altas, correcciones o bajas) y aplica solo su diferencia."""
+        ids = list(ids)
+        if not ids:
+            return
+        conn = self._conectar()
+        try:
+            partidos, goles, tarjetas = self._leer(conn, f"IN ({','.join('?' * len(ids))})", ids)
+        finally:
+            conn.close()
+        partidos = {fila[0]: fila[1:] for fila in partidos}
+
+        with self._lock:
+            for partido_id in ids:
+                self._sumar(partido_id, self._aportes.get(partido_id), signo=-1)
+                if partido_id in partidos:
+                    aporte = _aporte(partidos[partido_id], goles.get(partido_id, ()), tarjetas.get(partido_id, ()))
+                    self._sumar(partido_id, aporte)
+            self.version += 1
+
+    # ---------- lecturas ----------
+    def posiciones(self):
+        """Misma forma que `obtener_tabla_historica_acumulada`: (posiciones, partidos procesados).
+        Se arma una vez por versión y se comparte entre todos los que la piden."""
+        with self._lock:
+            if self._memo is None or self._memo[0] != self.version:
+                posiciones = [
+                    (equipo, d["PJ"], d["PG"], d["PE"], d["PP"], d["GF"], d["GC"], d["GF"] - d["GC"], d["Puntos"])
+                    for equipo, d in self._tabla.items()
+                ]
+                posiciones.sort(key=lambda x: (x[8], x[7], x[5]), reverse=True)
+                self._memo = (self.version, (posiciones, self._jugados))
+            return self._memo[1]
+
+    def goleadores(self, limite=None):
+        """[(jugador, goles)] ordenado por goles y nombre, como `obtener_goles_por_jugador`."""
+        with self._lock:
+            ranking = sorted(self._goleadores.items(), key=lambda x: (-x[1], x[0]))
+        return ranking[:limite] if limite else ranking
+
+    def acumulados(self):
+        """Copia de los acumulados por equipo y por cruce, para agregarlos por zona u otra dimensión:
+        {"tabla": {equipo: Counter}, "goleadores": {equipo: Counter}, "tarjetas": {equipo: Counter},
+        "cruces": {(equipo_a, equipo_b): Counter(PJ, GA, GB, VA, E, VB)}}."""
+        with self._lock:
+            return {
+                "tabla": {e: Counter(c) for e, c in self._tabla.items()},
+                "goleadores": {e: Counter(c) for e, c in self._goleadores_equipo.items()},
+                "tarjetas": {e: Counter(c) for e, c in self._tarjetas_equipo.items()},
+                "cruces": {par: Counter(c) for par, c in self._cruces.items()},
+                "version": self.version,
+            }
+
+    def resumen_equipo(self, equipo):
+        """Fila de posiciones, goleadores y tarjetas (por tipo) de un equipo."""
+        with self._lock:
+            return {
+                "tabla": {c: self._tabla.get(equipo, Counter())[c] for c in COLUMNAS_TABLA},
+                "goleadores": self._goleadores_equipo.get(equipo, Counter()).most_common(),
+                "tarjetas": dict(self._tarjetas_equipo.get(equipo, Counter())),
+            }
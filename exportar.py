@@ -0,0 +1,236 @@
+"""Exportación estática del sitio: posiciones, goleadores, campañas y versus en HTML/JSON.
+
+Uso:
+    python exportar.py --salida sitio [--procesos 4] [--forzar]
+
+Solo se vuelven a generar las páginas cuyos datos cambiaron desde la última exportación
+(según las firmas guardadas en `manifest.json` dentro de la carpeta de salida).
+"""
+import argparse
+import html
+import json
+import os
+import re
+import sqlite3
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import consultas
+from base_datos import DB
+
+PLANTILLA = """<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>{titulo} | Liga Deportiva del Sur</title>
+<style>
+body {{ font-family: sans-serif; margin: 2rem; }}
+table {{ border-collapse: collapse; margin-bottom: 2rem; }}
+th, td {{ border-bottom: 1px solid #ddd; padding: 4px 10px; text-align: left; }}
+th {{ background: #f5f5f5; }}
+</style>
+</head>
+<body>
+<p><a href="{raiz}index.html">🏆 Liga Deportiva del Sur</a></p>
+<h1>{titulo}</h1>
+{contenido}
+</body>
+</html>
+"""
+
+
+# =====================================
+# FUNCIONES AUXILIARES
+# =====================================
+def slug(texto):
+    """Nombre de archivo seguro: sin acentos, minúsculas y guiones."""
+    texto = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "-", texto.lower()).strip("-")
+
+
+def _a_json(valor):
+    return valor.item() if hasattr(valor, "item") else str(valor)
+
+
+def _escribir_pagina(ruta, titulo, resumen, tablas, raiz=""):
+    """Escribe `ruta`.html y `ruta`.json con un resumen (dict) y tablas (DataFrames)."""
+    contenido = ""
+    if resumen:
+        contenido += "<ul>" + "".join(
+            f"<li><b>{html.escape(str(k))}:</b> {html.escape(str(v))}</li>" for k, v in resumen.items()
+        ) + "</ul>"
+    for nombre, df in tablas.items():
+        contenido += f"<h2>{html.escape(nombre)}</h2>"
+        contenido += df.to_html(index=False, border=0) if not df.empty else "<p>Sin datos.</p>"
+
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    with open(ruta + ".html", "w", encoding="utf-8") as f:
+        f.write(PLANTILLA.format(titulo=html.escape(titulo), contenido=contenido, raiz=raiz))
+    with open(ruta + ".json", "w", encoding="utf-8") as f:
+        json.dump({
+            "titulo": titulo,
+            "resumen": resumen,
+            "tablas": {nombre: df.to_dict("records") for nombre, df in tablas.items()},
+        }, f, ensure_ascii=False, default=_a_json)
+
+
+# =====================================
+# PÁGINAS
+# =====================================
+def pagina_posiciones(ruta):
+    posiciones, total_partidos = consultas.obtener_tabla_historica_acumulada()
+    df = pd.DataFrame(posiciones, columns=["Equipo", "PJ", "PG", "PE", "PP", "GF", "GC", "DG", "Puntos"])
+    _escribir_pagina(ruta, "Tabla Histórica", {"Partidos Procesados": total_partidos}, {"Posiciones": df})
+
+
+def pagina_goleadores(ruta):
+    df = consultas.obtener_goles_por_jugador().rename(columns={"jugador": "Jugador", "goles": "Goles"})
+    _escribir_pagina(ruta, "Goleadores", {"Jugadores": len(df), "Total Goles": int(df["Goles"].sum())},
+                     {"Goles por Jugador": df})
+
+
+def pagina_campania(ruta, equipo):
+    stats = consultas.obtener_estadisticas_rendimiento(equipo)
+    df = consultas.armar_campania(equipo)
+    if not df.empty:
+        df = df[["Fecha", "Lugar", "Torneo", "Rival", "Resultado", "Goleadores"]]
+    goleadores = consultas.obtener_goleadores_por_equipo(equipo).rename(columns={"jugador": "Jugador", "goles": "Goles"})
+    _escribir_pagina(ruta, f"Campaña: {equipo}", stats, {"Partidos": df, "Goleadores": goleadores}, raiz="../")
+
+
+def pagina_versus(ruta, equipo1, equipo2):
+    stats = consultas.obtener_estadisticas_versus(equipo1, equipo2)
+    df = consultas.armar_historial_versus(equipo1, equipo2)
+    _escribir_pagina(ruta, f"{equipo1} vs {equipo2}", stats, {"Historial de Enfrentamientos": df}, raiz="../")
+
+
+PAGINAS = {
+    "posiciones": pagina_posiciones,
+    "goleadores": pagina_goleadores,
+    "campania": pagina_campania,
+    "versus": pagina_versus,
+}
+
+
+def _inicializar_proceso(db):
+    consultas.DB = db
+
+
+def _renderizar(tarea):
+    """Genera una página en un proceso del pool. `tarea` = (tipo, ruta, argumentos)."""
+    tipo, ruta, argumentos = tarea
+    PAGINAS[tipo](ruta, *argumentos)
+    return ruta
+
+
+# =====================================
+# FIRMAS DE DATOS (DETECCIÓN DE CAMBIOS)
+# =====================================
+def _suma_hash(df, por):
+    """Suma (módulo 2^64) del hash de cada fila, agrupada: no depende del orden de las filas."""
+    hashes = pd.util.hash_pandas_object(df.drop(columns=[por]), index=False)
+    return hashes.groupby(df[por].values).sum()
+
+
+def calcular_firmas(db=DB):
+    """Firma de los datos de cada equipo (sus partidos y goles) y firmas globales."""
+    conn = sqlite3.connect(db)
+    partidos = pd.read_sql_query("""
+        SELECT id, fecha, campeonato, equipo_local, equipo_visitante, goles_local, goles_visitante
+        FROM partidos
+    """, conn)
+    goles = pd.read_sql_query("""
+        SELECT
+            g.partido_id,
+            g.jugador,
+            CASE WHEN g.equipo = 'Local' THEN p.equipo_local ELSE p.equipo_visitante END AS equipo_gol
+        FROM goles g
+        JOIN partidos p ON p.id = g.partido_id
+    """, conn)
+    conn.close()
+
+    por_equipo = pd.concat([
+        partidos.assign(equipo=partidos["equipo_local"]),
+        partidos.assign(equipo=partidos["equipo_visitante"]),
+    ], ignore_index=True)
+    firma_partidos = _suma_hash(por_equipo, "equipo")
+    firma_goles = _suma_hash(goles, "equipo_gol")
+    firmas = {
+        equipo: f"{int(firma_partidos.get(equipo, 0)):016x}{int(firma_goles.get(equipo, 0)):016x}"
+        for equipo in firma_partidos.index
+    }
+    globales = {
+        "partidos": f"{int(pd.util.hash_pandas_object(partidos, index=False).sum()):016x}",
+        "goles": f"{int(pd.util.hash_pandas_object(goles, index=False).sum()):016x}",
+    }
+    cruces = partidos[["equipo_local", "equipo_visitante"]].apply(lambda r: tuple(sorted(r)), axis=1).unique()
+    return firmas, globales, sorted(c for c in cruces if c[0] != c[1])
+
+
+def planificar(salida, db=DB):
+    """Lista de páginas (tipo, ruta, argumentos, firma) del sitio completo."""
+    firmas, globales, cruces = calcular_firmas(db)
+    tareas = [
+        ("posiciones", os.path.join(salida, "posiciones"), (), globales["partidos"]),
+        ("goleadores", os.path.join(salida, "goleadores"), (), globales["partidos"] + globales["goles"]),
+    ]
+    for equipo in sorted(firmas):
+        tareas.append(("campania", os.path.join(salida, "equipos", slug(equipo)), (equipo,), firmas[equipo]))
+    for equipo1, equipo2 in cruces:
+        ruta = os.path.join(salida, "versus", f"{slug(equipo1)}__{slug(equipo2)}")
+        tareas.append(("versus", ruta, (equipo1, equipo2), firmas[equipo1] + firmas[equipo2]))
+    return tareas
+
+
+def _escribir_indice(salida, tareas):
+    secciones = {"campania": "Campañas", "versus": "Versus"}
+    contenido = '<ul><li><a href="posiciones.html">📋 Tabla Histórica</a></li>'
+    contenido += '<li><a href="goleadores.html">⚽ Goleadores</a></li></ul>'
+    for tipo, titulo in secciones.items():
+        contenido += f"<h2>{titulo}</h2><ul>"
+        for t, ruta, argumentos, _ in tareas:
+            if t == tipo:
+                enlace = os.path.relpath(ruta, salida).replace(os.sep, "/") + ".html"
+                contenido += f'<li><a href="{enlace}">{html.escape(" vs ".join(argumentos))}</a></li>'
+        contenido += "</ul>"
+    with open(os.path.join(salida, "index.html"), "w", encoding="utf-8") as f:
+        f.write(PLANTILLA.format(titulo="Estadísticas", contenido=contenido, raiz=""))
+
+
+def exportar(salida, db=DB, procesos=None, forzar=False):
+    """Genera el sitio estático en `salida`. Devuelve (páginas generadas, páginas sin cambios)."""
+    os.makedirs(salida, exist_ok=True)
+    ruta_manifest = os.path.join(salida, "manifest.json")
+    manifest = {}
+    if os.path.exists(ruta_manifest) and not forzar:
+        with open(ruta_manifest, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+    tareas = planificar(salida, db)
+    pendientes = [
+        (tipo, ruta, argumentos) for tipo, ruta, argumentos, firma in tareas
+        if manifest.get(ruta) != firma or not os.path.exists(ruta + ".html")
+    ]
+    if pendientes:
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_proceso, initargs=(db,)) as pool:
+            for _ in pool.map(_renderizar, pendientes, chunksize=8):
+                pass
+
+    _escribir_indice(salida, tareas)
+    with open(ruta_manifest, "w", encoding="utf-8") as f:
+        json.dump({ruta: firma for _, ruta, _, firma in tareas}, f, ensure_ascii=False, indent=1)
+    return len(pendientes), len(tareas) - len(pendientes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta el sitio de estadísticas a HTML/JSON estáticos.")
+    parser.add_argument("--salida", default="sitio", help="Carpeta de salida (por defecto: sitio)")
+    parser.add_argument("--db", default=DB, help=f"Base de datos (por defecto: {DB})")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos en paralelo (por defecto: núcleos)")
+    parser.add_argument("--forzar", action="store_true", help="Regenerar todas las páginas")
+    args = parser.parse_args()
+
+    generadas, sin_cambios = exportar(args.salida, args.db, args.procesos, args.forzar)
+    print(f"✅ {generadas} páginas generadas, {sin_cambios} sin cambios → {args.salida}/index.html")
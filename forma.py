@@ -0,0 +1,147 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from base_datos import DB, version_db, leer_partidos, huella_partidos, partidos_por_equipo, puntos
+
+# =====================================
+# FORMA RECIENTE (ÚLTIMOS N PARTIDOS) POR EQUIPO
+# =====================================
+VENTANAS = (5, 10)
+_ARRASTRE = max(VENTANAS) - 1  # filas previas de cada equipo que necesita una ventana al extender
+
+
+def _serie_vacia():
+    columnas = ["equipo", "id", "orden", "fecha", "campeonato", "rival", "lugar", "gf", "gc", "R", "pts"]
+    for n in VENTANAS:
+        columnas += [f"pts_{n}", f"dg_{n}", f"forma_{n}"]
+    return pd.DataFrame(columns=columnas)
+
+
+def _ventanas(largo):
+    """Puntos, diferencia de gol y resultados (G/E/P, del más viejo al más nuevo) de los últimos
+    N partidos en cada fila, para todos los equipos a la vez. `largo` viene ordenado por equipo
+    y fecha; las ventanas no cruzan de un equipo a otro."""
+    por_equipo = largo.groupby("equipo", sort=False)
+    dg = largo["gf"] - largo["gc"]
+    resultados = {k: por_equipo["R"].shift(k).fillna("") for k in range(max(VENTANAS))}
+    for n in VENTANAS:
+        largo[f"pts_{n}"] = por_equipo["pts"].rolling(n, min_periods=1).sum().droplevel(0).astype("int64")
+        largo[f"dg_{n}"] = dg.groupby(largo["equipo"], sort=False).rolling(n, min_periods=1).sum() \
+            .droplevel(0).astype("int64")
+        forma = resultados[n - 1]
+        for k in range(n - 2, -1, -1):
+            forma = forma + resultados[k]
+        largo[f"forma_{n}"] = forma
+    return largo
+
+
+def _extender(serie, tramo):
+    """Agrega a la serie los partidos de `tramo` (posteriores a los ya procesados). Cada equipo
+    arrastra solo sus últimas filas para completar las ventanas de los partidos nuevos."""
+    largo = partidos_por_equipo(tramo)
+    if largo.empty:
+        return serie
+    largo["R"] = np.select([largo["gf"] > largo["gc"], largo["gf"] == largo["gc"]], ["G", "E"], "P")
+    largo["pts"] = puntos(largo["gf"], largo["gc"], largo["fecha"].fillna("").str[6:10])
+
+    if serie.empty:
+        return _ventanas(largo)
+
+    previas = serie[serie["equipo"].isin(largo["equipo"].unique())].groupby("equipo").tail(_ARRASTRE)
+    base = pd.concat([previas[largo.columns].assign(_nuevo=False), largo.assign(_nuevo=True)], ignore_index=True)
+    base = base.sort_values(["equipo", "orden", "id"], kind="stable").reset_index(drop=True)
+    nuevas = _ventanas(base)
+    nuevas = nuevas[nuevas["_nuevo"]].drop(columns="_nuevo")
+    return pd.concat([serie, nuevas], ignore_index=True) \
+        .sort_values(["equipo", "orden", "id"], kind="stable").reset_index(drop=True)
+
+
+class MotorForma:
+    """Serie de forma de todos los equipos (un registro por equipo y partido con sus ventanas
+    de los últimos 5 y 10), cacheada por versión de la base. Los partidos nuevos solo calculan
+    sus propias ventanas; ante ediciones o partidos cargados fuera de orden recalcula todo."""
+
+    def __init__(self, db=DB):
+        self.db = db
+        self._lock = threading.Lock()
+        self._version = None
+        self._ultimo_id = 0
+        self._huella = None
+        self._serie = _serie_vacia()
+
+    def _reconstruir(self):
+        self._ultimo_id = 0
+        self._serie = _serie_vacia()
+
+    def actualizar(self):
+        """Sincroniza la serie con la base. Devuelve True si hubo cambios."""
+        version = version_db(self.db)
+        if version == self._version:
+            return False
+        with self._lock:
+            if version == self._version:
+                return False
+            if self._ultimo_id and huella_partidos(self.db, self._ultimo_id) != self._huella:
+                self._reconstruir()
+
+            tramo = leer_partidos(self.db, self._ultimo_id)
+            if not tramo.empty and not self._serie.empty:
+                # Un partido nuevo anterior al último de alguno de sus equipos cambia ventanas ya calculadas
+                ultimo = self._serie.groupby("equipo")["orden"].max()
+                minimos = pd.concat([
+                    tramo.groupby("equipo_local")["orden"].min(),
+                    tramo.groupby("equipo_visitante")["orden"].min(),
+                ]).groupby(level=0).min()
+                if (minimos < ultimo.reindex(minimos.index).fillna(0)).any():
+                    self._reconstruir()
+                    tramo = leer_partidos(self.db, 0)
+
+            if not tramo.empty:
+                self._serie = _extender(self._serie, tramo)
+                self._ultimo_id = int(max(self._ultimo_id, tramo["id"].max()))
+            self._huella = huella_partidos(self.db, self._ultimo_id)
+            self._version = version
+            return True
+
+    def tabla(self, desde_anio=None):
+        """Tabla de forma de la liga: la ventana vigente de cada equipo (su último partido).
+        Con `desde_anio` solo entran los equipos que jugaron desde ese año."""
+        self.actualizar()
+        ultimos = self._serie.groupby("equipo", sort=False).tail(1)
+        if desde_anio:
+            ultimos = ultimos[ultimos["orden"] >= int(desde_anio) * 10000]
+        if ultimos.empty:
+            return pd.DataFrame()
+        pj = self._serie["equipo"].value_counts()
+        df = pd.DataFrame({
+            "Equipo": ultimos["equipo"].values,
+            "Último Partido": ultimos["fecha"].values,
+            "PJ": pj.reindex(ultimos["equipo"]).values,
+        })
+        for n in VENTANAS:
+            df[f"Últimos {n}"] = ultimos[f"forma_{n}"].values
+            df[f"Pts {n}"] = ultimos[f"pts_{n}"].values
+            df[f"DG {n}"] = ultimos[f"dg_{n}"].values
+        primera = min(VENTANAS)
+        return df.sort_values([f"Pts {primera}", f"DG {primera}", "Equipo"], ascending=[False, False, True],
+                              kind="stable").reset_index(drop=True)
+
+    def serie_equipo(self, equipo):
+        """Partidos de un equipo en orden cronológico, con su forma después de cada uno."""
+        self.actualizar()
+        serie = self._serie[self._serie["equipo"] == equipo]
+        df = pd.DataFrame({
+            "Fecha": serie["fecha"].values,
+            "Campeonato": serie["campeonato"].values,
+            "Rival": serie["rival"].values,
+            "Lugar": serie["lugar"].values,
+            "Resultado": (serie["gf"].astype(str) + "-" + serie["gc"].astype(str)).values,
+            "R": serie["R"].values,
+        })
+        for n in VENTANAS:
+            df[f"Pts {n}"] = serie[f"pts_{n}"].values
+            df[f"DG {n}"] = serie[f"dg_{n}"].values
+            df[f"Últimos {n}"] = serie[f"forma_{n}"].values
+        return df
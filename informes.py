@@ -0,0 +1,332 @@
+"""Informes de temporada por club: campaña, goleadores, tarjetas, evolución y cruces.
+
+Uso:
+    python informes.py [--anio 2025] [--campeonato "1° Torneo"] [--salida informes] [--procesos 4] [--pdf] [--forzar]
+
+Genera un informe HTML por club (gráficos embebidos, un solo archivo para enviar) y, con
+--pdf, también el PDF. Los clubes se reparten en un pool de procesos que leen todos de la
+misma instantánea de la base; solo se regeneran los clubes cuyos datos cambiaron desde la
+última corrida (firmas en `manifest.json` dentro de la carpeta de la temporada).
+"""
+import argparse
+import base64
+import html
+import io
+import json
+import multiprocessing
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")  # sin pantalla: los procesos del pool solo escriben archivos
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_pdf import PdfPages
+
+import consultas
+from base_datos import DB, leer_partidos, partidos_por_equipo, puntos
+from exportar import PLANTILLA, _suma_hash, calcular_firmas, slug
+
+VERSION = 1  # subirla si cambia el contenido de los informes, para regenerarlos todos
+FILAS_POR_PAGINA = 35
+
+_largo = None  # partidos en formato largo de la instantánea, compartido por los procesos del pool
+
+
+# =====================================
+# INSTANTÁNEA Y FIRMAS
+# =====================================
+def tomar_instantanea(db, destino):
+    """Copia consistente de la base (API de backup de SQLite) para que todos los procesos
+    lean los mismos datos aunque la base se esté cargando mientras tanto."""
+    temporal = f"{destino}.{os.getpid()}.tmp"
+    origen = sqlite3.connect(f"file:{os.path.abspath(db)}?mode=ro", uri=True)
+    copia = sqlite3.connect(temporal)
+    origen.backup(copia)
+    copia.close()
+    origen.close()
+    os.replace(temporal, destino)
+    return destino
+
+
+def calcular_firmas_informe(db):
+    """Firma de los datos de cada club: partidos y goles (las de `exportar`) más sus tarjetas."""
+    firmas, _, _ = calcular_firmas(db)
+    conn = sqlite3.connect(db)
+    tarjetas = pd.read_sql_query("""
+        SELECT
+            t.partido_id,
+            t.jugador,
+            t.tipo,
+            CASE WHEN t.equipo = 'Local' THEN p.equipo_local ELSE p.equipo_visitante END AS equipo_tarjeta
+        FROM tarjetas t
+        JOIN partidos p ON p.id = t.partido_id
+    """, conn)
+    conn.close()
+    firma_tarjetas = _suma_hash(tarjetas, "equipo_tarjeta")
+    return {
+        equipo: f"{VERSION}:{firma}{int(firma_tarjetas.get(equipo, 0)):016x}"
+        for equipo, firma in firmas.items()
+    }
+
+
+def temporada_por_defecto(db):
+    conn = sqlite3.connect(db)
+    anio = conn.execute("SELECT MAX(SUBSTR(fecha, 7, 4)) FROM partidos").fetchone()[0]
+    conn.close()
+    return anio
+
+
+# =====================================
+# GRÁFICOS (BACKEND AGG)
+# =====================================
+def _png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=100)
+    return buffer.getvalue()
+
+
+def grafico_temporada(campania, equipo):
+    """Puntos acumulados y goles por partido a lo largo de la temporada."""
+    pts = campania["pts"].to_numpy()
+    partido = np.arange(1, len(campania) + 1)
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 7), sharex=True)
+    ax1.plot(partido, pts.cumsum(), marker="D", linewidth=3, markersize=6, color="#FF9800", label="Puntos")
+    ax1.set_ylabel("Puntos acumulados", fontsize=12, fontweight='bold')
+    ax1.set_title(f"Evolución en la temporada - {equipo}", fontsize=14, fontweight='bold', pad=20)
+    ax2.bar(partido - 0.2, campania["gf"], width=0.4, color="#4CAF50", label="Goles a Favor")
+    ax2.bar(partido + 0.2, campania["gc"], width=0.4, color="#F44336", label="Goles en Contra")
+    ax2.set_xlabel("Partido", fontsize=12, fontweight='bold')
+    ax2.set_ylabel("Goles", fontsize=12, fontweight='bold')
+    ax2.set_xticks(partido)
+    for ax in (ax1, ax2):
+        ax.grid(True, alpha=0.3, linestyle='--')
+        ax.legend(fontsize=11, loc='upper left')
+    fig.tight_layout()
+    return fig
+
+
+def grafico_historico(historia, equipo, anio):
+    """Puntos por año de toda la historia del club, con la temporada del informe resaltada."""
+    fig, ax = plt.subplots(figsize=(12, 5))
+    ax.plot(historia.index, historia.values, marker="o", linewidth=2, color="#3F51B5")
+    if anio in historia.index:
+        ax.plot([anio], [historia[anio]], marker="o", markersize=14, color="#FF9800")
+    ax.set_xlabel("Año", fontsize=12, fontweight='bold')
+    ax.set_ylabel("Puntos", fontsize=12, fontweight='bold')
+    ax.set_title(f"Puntos por año - {equipo}", fontsize=14, fontweight='bold', pad=20)
+    ax.grid(True, alpha=0.3, linestyle='--')
+    ax.tick_params(axis="x", labelrotation=90)
+    fig.tight_layout()
+    return fig
+
+
+# =====================================
+# CONTENIDO DEL INFORME
+# =====================================
+def _balance(df):
+    """PJ, PG, PE, PP, GF y GC por rival."""
+    return df.assign(
+        PG=df["gf"] > df["gc"], PE=df["gf"] == df["gc"], PP=df["gf"] < df["gc"],
+    ).groupby("rival").agg(
+        PJ=("gf", "size"), PG=("PG", "sum"), PE=("PE", "sum"), PP=("PP", "sum"), GF=("gf", "sum"), GC=("gc", "sum"),
+    )
+
+
+def armar_informe(equipo, anio, campeonato=None):
+    """(resumen, tablas, gráficos) del informe de un club. Las tablas salen de las consultas
+    de siempre; los gráficos, de los partidos precargados."""
+    stats = consultas.obtener_estadisticas_rendimiento(equipo, anio, campeonato)
+    resumen = {
+        "Partidos": stats["partidos_jugados"], "Ganados": stats["ganados"],
+        "Empatados": stats["empatados"], "Perdidos": stats["perdidos"],
+        "Goles a Favor": stats["goles_favor"], "Goles en Contra": stats["goles_contra"],
+        "Diferencia": stats["diferencia"],
+    }
+
+    partidos = consultas.armar_campania(equipo, anio, campeonato)
+    if not partidos.empty:
+        partidos = partidos[["Fecha", "Lugar", "Torneo", "Rival", "Resultado", "Goleadores"]]
+    goleadores = consultas.obtener_goles_por_jugador(anio, campeonato, equipo).rename(
+        columns={"jugador": "Jugador", "goles": "Goles"})
+    tarjetas = consultas.obtener_tarjetas_por_jugador(anio, campeonato, equipo).rename(
+        columns={"jugador": "Jugador", "amon": "🟨 Amonestaciones", "exp": "🟥 Expulsiones"}
+    ).drop(columns="equipo_jugador")
+
+    del_equipo = _largo[_largo["equipo"] == equipo]
+    campania = del_equipo[del_equipo["anio"] == anio]
+    if campeonato:
+        campania = campania[campania["campeonato"] == campeonato]
+    resumen["Puntos"] = int(campania["pts"].sum())
+
+    # Cruces de la temporada, con el historial completo contra cada rival al lado
+    cruces = pd.DataFrame(columns=["Rival", "PJ", "PG", "PE", "PP", "GF", "GC",
+                                   "PJ Historia", "PG Historia", "PE Historia", "PP Historia"])
+    if not campania.empty:
+        temporada = _balance(campania)
+        historial = _balance(del_equipo[del_equipo["rival"].isin(temporada.index)])[["PJ", "PG", "PE", "PP"]]
+        cruces = temporada.join(historial.add_suffix(" Historia")).rename_axis("Rival").reset_index() \
+            .sort_values(["PJ", "Rival"], ascending=[False, True], kind="stable")
+
+    tablas = {"Partidos": partidos, "Goleadores": goleadores, "Tarjetas": tarjetas, "Cruces": cruces}
+    graficos = {}
+    if not campania.empty:
+        graficos["Evolución en la temporada"] = grafico_temporada(campania, equipo)
+    historia = del_equipo.groupby("anio")["pts"].sum()
+    if not historia.empty:
+        graficos["Puntos por año"] = grafico_historico(historia, equipo, anio)
+    return resumen, tablas, graficos
+
+
+# =====================================
+# SALIDA: HTML Y PDF
+# =====================================
+def _escribir_html(ruta, titulo, resumen, tablas, imagenes):
+    contenido = "<ul>" + "".join(
+        f"<li><b>{html.escape(str(k))}:</b> {html.escape(str(v))}</li>" for k, v in resumen.items()
+    ) + "</ul>"
+    for nombre, png in imagenes.items():
+        contenido += (f"<h2>{html.escape(nombre)}</h2>"
+                      f'<img alt="{html.escape(nombre)}" style="max-width:100%" '
+                      f'src="data:image/png;base64,{base64.b64encode(png).decode()}">')
+    for nombre, df in tablas.items():
+        contenido += f"<h2>{html.escape(nombre)}</h2>"
+        contenido += df.to_html(index=False, border=0) if not df.empty else "<p>Sin datos.</p>"
+    with open(ruta + ".html", "w", encoding="utf-8") as f:
+        f.write(PLANTILLA.format(titulo=html.escape(titulo), contenido=contenido, raiz=""))
+
+
+def _pagina_texto(pdf, titulo, lineas):
+    fig = plt.figure(figsize=(8.27, 11.69))
+    fig.text(0.08, 0.94, titulo, fontsize=16, fontweight='bold', va="top")
+    fig.text(0.08, 0.88, "\n".join(lineas), fontsize=11, va="top", linespacing=1.6)
+    pdf.savefig(fig)
+    plt.close(fig)
+
+
+def _paginas_tabla(pdf, nombre, df):
+    """Una tabla del informe en tantas páginas A4 como haga falta."""
+    if df.empty:
+        _pagina_texto(pdf, nombre, ["Sin datos."])
+        return
+    texto = df.astype(str)
+    columnas = [c.lstrip("🟨🟥 ") for c in texto.columns]  # la fuente del PDF no tiene emojis
+    for inicio in range(0, len(texto), FILAS_POR_PAGINA):
+        fig, ax = plt.subplots(figsize=(8.27, 11.69))
+        ax.axis("off")
+        ax.set_title(nombre if inicio == 0 else f"{nombre} (cont.)", fontsize=14, fontweight='bold', loc="left")
+        tabla = ax.table(cellText=texto.iloc[inicio:inicio + FILAS_POR_PAGINA].to_numpy(),
+                         colLabels=columnas, loc="upper center", cellLoc="left")
+        tabla.auto_set_font_size(False)
+        tabla.set_fontsize(7)
+        tabla.auto_set_column_width(range(len(columnas)))
+        pdf.savefig(fig)
+        plt.close(fig)
+
+
+def _escribir_pdf(ruta, titulo, resumen, tablas, graficos):
+    with PdfPages(ruta + ".pdf") as pdf:
+        _pagina_texto(pdf, titulo, [f"{k}: {v}" for k, v in resumen.items()])
+        for fig in graficos.values():
+            pdf.savefig(fig)
+        for nombre, df in tablas.items():
+            _paginas_tabla(pdf, nombre, df)
+
+
+def _inicializar_proceso(instantanea, largo):
+    global _largo
+    consultas.usar_base(instantanea)
+    _largo = largo
+
+
+def _generar(tarea):
+    """Informe de un club en un proceso del pool. `tarea` = (ruta, equipo, anio, campeonato, pdf)."""
+    ruta, equipo, anio, campeonato, pdf = tarea
+    resumen, tablas, graficos = armar_informe(equipo, anio, campeonato)
+    titulo = f"{equipo} - Temporada {anio}" + (f" ({campeonato})" if campeonato else "")
+    try:
+        _escribir_html(ruta, titulo, resumen, tablas, {n: _png(fig) for n, fig in graficos.items()})
+        if pdf:
+            _escribir_pdf(ruta, titulo, resumen, tablas, graficos)
+    finally:
+        for fig in graficos.values():
+            plt.close(fig)
+    return ruta
+
+
+# =====================================
+# CORRIDA
+# =====================================
+def _escribir_indice(carpeta, titulo, tareas):
+    contenido = "<ul>" + "".join(
+        f'<li><a href="{os.path.basename(ruta)}.html">{html.escape(equipo)}</a></li>'
+        for ruta, equipo, *_ in tareas
+    ) + "</ul>"
+    with open(os.path.join(carpeta, "index.html"), "w", encoding="utf-8") as f:
+        f.write(PLANTILLA.format(titulo=html.escape(titulo), contenido=contenido, raiz=""))
+
+
+def generar_informes(salida="informes", anio=None, campeonato=None, db=DB, procesos=None,
+                     pdf=False, forzar=False):
+    """Informes de la temporada de todos los clubes que jugaron en ella, en
+    `salida`/<año>[-<campeonato>]/. Devuelve (carpeta, informes generados, sin cambios)."""
+    anio = str(anio or temporada_por_defecto(db))
+    carpeta = os.path.join(salida, anio + (f"-{slug(campeonato)}" if campeonato else ""))
+    os.makedirs(carpeta, exist_ok=True)
+    ruta_manifest = os.path.join(carpeta, "manifest.json")
+    manifest = {}
+    if os.path.exists(ruta_manifest) and not forzar:
+        with open(ruta_manifest, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+    instantanea = tomar_instantanea(db, os.path.join(carpeta, ".instantanea.db"))
+    try:
+        largo = partidos_por_equipo(leer_partidos(instantanea))
+        largo["anio"] = largo["fecha"].fillna("").str[6:10]
+        largo["pts"] = puntos(largo["gf"], largo["gc"], largo["anio"])
+        en_temporada = largo[largo["anio"] == anio]
+        if campeonato:
+            en_temporada = en_temporada[en_temporada["campeonato"] == campeonato]
+        equipos = sorted(en_temporada["equipo"].unique())
+
+        firmas = calcular_firmas_informe(instantanea)
+        sufijo = "pdf" if pdf else "html"
+        tareas = [(os.path.join(carpeta, slug(e)), e, anio, campeonato, pdf) for e in equipos]
+        pendientes = [
+            t for t in tareas
+            if manifest.get(t[0]) != firmas.get(t[1]) or not os.path.exists(f"{t[0]}.{sufijo}")
+        ]
+        if pendientes:
+            # Con fork los procesos heredan `largo` sin copiarlo; con spawn se envía una vez por proceso
+            contexto = multiprocessing.get_context(
+                "fork" if "fork" in multiprocessing.get_all_start_methods() else None)
+            with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto,
+                                     initializer=_inicializar_proceso, initargs=(instantanea, largo)) as pool:
+                for _ in pool.map(_generar, pendientes):
+                    pass
+    finally:
+        os.remove(instantanea)
+
+    titulo = f"Informes de la Temporada {anio}" + (f" ({campeonato})" if campeonato else "")
+    _escribir_indice(carpeta, titulo, tareas)
+    with open(ruta_manifest, "w", encoding="utf-8") as f:
+        json.dump({ruta: firmas.get(equipo) for ruta, equipo, *_ in tareas}, f, ensure_ascii=False, indent=1)
+    return carpeta, len(pendientes), len(tareas) - len(pendientes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera el informe de temporada de cada club.")
+    parser.add_argument("--anio", default=None, help="Temporada (por defecto: la última de la base)")
+    parser.add_argument("--campeonato", default=None, help="Solo un campeonato de la temporada")
+    parser.add_argument("--salida", default="informes", help="Carpeta de salida (por defecto: informes)")
+    parser.add_argument("--db", default=DB, help=f"Base de datos (por defecto: {DB})")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos en paralelo (por defecto: núcleos)")
+    parser.add_argument("--pdf", action="store_true", help="Generar también el PDF de cada informe")
+    parser.add_argument("--forzar", action="store_true", help="Regenerar todos los informes")
+    args = parser.parse_args()
+
+    carpeta, generados, sin_cambios = generar_informes(
+        args.salida, args.anio, args.campeonato, args.db, args.procesos, args.pdf, args.forzar)
+    print(f"✅ {generados} informes generados, {sin_cambios} sin cambios → {carpeta}/index.html")
@@ -0,0 +1,31 @@
+import json
+import os
+
+from base_datos import DB
+
+# =====================================
+# REGISTRO DE LIGAS (UNA BASE POR LIGA O ARCHIVO DE TEMPORADAS)
+# =====================================
+# ligas.json: {"Liga Regional del Oeste": "ligas/oeste.db", "LDDS 1990-1999": "archivo/ldds_90.db"}
+# Las rutas relativas se toman desde la carpeta del archivo. La liga principal (DB) siempre está.
+ARCHIVO_LIGAS = os.environ.get("LDDS_LIGAS", "ligas.json")
+LIGA_PRINCIPAL = os.environ.get("LDDS_LIGA", "Liga Deportiva del Sur")
+
+
+def cargar_ligas(archivo=ARCHIVO_LIGAS):
+    """({nombre: base} de las ligas disponibles, [nombres registrados cuya base no existe]).
+    La liga principal va primero."""
+    ligas, faltantes = {LIGA_PRINCIPAL: DB}, []
+    try:
+        with open(archivo, encoding="utf-8") as f:
+            registro = json.load(f)
+    except FileNotFoundError:
+        return ligas, faltantes
+    carpeta = os.path.dirname(os.path.abspath(archivo))
+    for nombre, ruta in registro.items():
+        ruta = ruta if os.path.isabs(ruta) else os.path.join(carpeta, ruta)
+        if os.path.exists(ruta):
+            ligas.setdefault(nombre, ruta)
+        else:
+            faltantes.append(nombre)
+    return ligas, faltantes
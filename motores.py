@@ -0,0 +1,200 @@
+"""Motor analítico opcional (DuckDB) para las agregaciones de toda la liga.
+
+Uso:
+    python motores.py verificar            # compara SQLite y DuckDB en cada obtener_*
+    python motores.py parquet --salida parquet
+
+DuckDB lee el mismo `football_nueva.db` (extensión sqlite) o, si `LDDS_PARQUET` apunta a una
+carpeta, los Parquet exportados con `python motores.py parquet`. Si DuckDB no está instalado
+todo sigue funcionando con SQLite.
+"""
+import argparse
+import os
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+from base_datos import DB
+
+# =====================================
+# CONFIGURACIÓN
+# =====================================
+TABLAS = ("partidos", "goles", "tarjetas", "equipos_zonas")
+DIR_PARQUET = os.environ.get("LDDS_PARQUET") or None
+MOTOR_ANALITICO = os.environ.get("LDDS_MOTOR_ANALITICO", "duckdb" if duckdb else "sqlite")
+
+# Excepción de DuckDB al interrumpir una consulta (ninguna si no está instalado)
+Interrupcion = duckdb.InterruptException if duckdb else ()
+
+_TIPO_TEXTO = pd.Series([""]).dtype  # el de los textos de `pd.read_sql_query` (object o str según pandas)
+
+_motores = {}
+_motores_lock = threading.Lock()
+
+
+class MotorDuckDB:
+    """Conexión DuckDB en memoria con las tablas de la liga como vistas (sobre la base SQLite
+    o sobre Parquet). Cada consulta usa su propio cursor, así se puede usar desde varios hilos."""
+
+    def __init__(self, db=DB, dir_parquet=None):
+        self._conn = duckdb.connect()
+        if dir_parquet:
+            for tabla in TABLAS:
+                ruta = os.path.join(dir_parquet, f"{tabla}.parquet").replace("'", "''")
+                self._conn.execute(f"CREATE VIEW {tabla} AS SELECT * FROM read_parquet('{ruta}')")
+        else:
+            self._conn.execute("INSTALL sqlite")
+            self._conn.execute("LOAD sqlite")
+            ruta = os.path.abspath(db).replace("'", "''")
+            self._conn.execute(f"ATTACH '{ruta}' AS liga (TYPE SQLITE, READ_ONLY)")
+            self._conn.execute("USE liga")
+
+    def cursor(self):
+        return self._conn.cursor()
+
+
+def obtener_motor(db=DB, dir_parquet=DIR_PARQUET):
+    """Motor DuckDB compartido por base; None si DuckDB no está disponible o no pudo abrirla."""
+    if duckdb is None:
+        return None
+    clave = (os.path.abspath(db), dir_parquet)
+    try:
+        inodo = os.stat(db).st_ino  # cambia al publicarse otra instantánea (publicacion.py)
+    except OSError:
+        inodo = None
+    with _motores_lock:
+        if clave not in _motores or _motores[clave][0] != inodo:
+            try:
+                _motores[clave] = (inodo, MotorDuckDB(db, dir_parquet))
+            except duckdb.Error as e:
+                print(f"⚠️ DuckDB no disponible ({e}); se usa SQLite.", file=sys.stderr)
+                _motores[clave] = (inodo, None)
+        return _motores[clave][1]
+
+
+def normalizar_tipos(df):
+    """Lleva los tipos de DuckDB a los que devuelve SQLite: las sumas enteras (HUGEINT) llegan
+    como float y se vuelven a int64; los textos, como en `pd.read_sql_query`. Sin filas, SQLite
+    no infiere tipos y devuelve todas las columnas como object: se hace lo mismo."""
+    if df.empty:
+        return df.astype(object)
+    for col in df.columns:
+        serie = df[col]
+        if pd.api.types.is_float_dtype(serie) and serie.notna().all() and np.all(np.mod(serie, 1) == 0):
+            df[col] = serie.astype("int64")
+        elif pd.api.types.is_integer_dtype(serie) and serie.dtype != np.int64:
+            df[col] = serie.astype("int64")
+        elif pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie):
+            df[col] = serie.astype(_TIPO_TEXTO)
+    return df
+
+
+# =====================================
+# EXPORTACIÓN A PARQUET
+# =====================================
+def exportar_parquet(salida, db=DB):
+    """Copia las tablas de la liga a `salida`/<tabla>.parquet."""
+    motor = MotorDuckDB(db)
+    os.makedirs(salida, exist_ok=True)
+    cursor = motor.cursor()
+    for tabla in TABLAS:
+        ruta = os.path.join(salida, f"{tabla}.parquet").replace("'", "''")
+        cursor.execute(f"COPY (SELECT * FROM {tabla}) TO '{ruta}' (FORMAT PARQUET)")
+    cursor.close()
+
+
+# =====================================
+# VERIFICACIÓN DE EQUIVALENCIA
+# =====================================
+def _casos(consultas):
+    """(función, args) para cada obtener_* de `consultas`, con variantes filtradas."""
+    import inspect
+
+    equipos = consultas.obtener_equipos()
+    arbitros = consultas.obtener_valores_unicos("arbitro")
+    anios = sorted({f[6:10] for f in consultas.obtener_valores_unicos("fecha")})
+    campeonatos = consultas.obtener_valores_unicos("campeonato")
+    valores = {
+        "equipo": equipos[0],
+        "equipo1": equipos[0],
+        "equipo2": equipos[1],
+        "equipos": equipos[:3],
+        "arbitro": arbitros[0],
+        "columna": "campeonato",
+        "partido_id": 1,
+        "limite": 20,
+    }
+    filtros = [{}, {"anio": anios[len(anios) // 2]}, {"anio": anios[-1], "campeonato": campeonatos[0]}]
+
+    casos = []
+    for nombre, funcion in inspect.getmembers(consultas, inspect.isfunction):
+        if not nombre.startswith("obtener_") or funcion.__module__ != consultas.__name__:
+            continue
+        parametros = inspect.signature(funcion).parameters
+        if any(v.default is inspect.Parameter.empty and p not in valores for p, v in parametros.items()):
+            continue  # p. ej. las consultas entre ligas, que reciben el registro de bases
+        requeridos = {p: valores[p] for p, v in parametros.items() if v.default is inspect.Parameter.empty}
+        for filtro in filtros:
+            if all(clave in parametros for clave in filtro):
+                casos.append((nombre, funcion, {**requeridos, **filtro}))
+        if "equipo" in parametros and "equipo" not in requeridos:
+            casos.append((nombre, funcion, {"equipo": equipos[0]}))
+        if "solo_expulsados" in parametros:
+            casos.append((nombre, funcion, {"solo_expulsados": True}))
+    return casos
+
+
+def _iguales(a, b):
+    if isinstance(a, pd.DataFrame):
+        try:
+            pd.testing.assert_frame_equal(a, b)
+            return True, ""
+        except AssertionError as e:
+            return False, str(e).splitlines()[0]
+    return a == b, ""
+
+
+def verificar(db=DB):
+    """Corre cada obtener_* con SQLite y con DuckDB y compara los resultados. Devuelve las diferencias."""
+    import consultas
+
+    if obtener_motor(db) is None:
+        raise RuntimeError("DuckDB no está instalado o no pudo abrir la base (pip install duckdb).")
+    consultas.DB = db
+    diferencias = []
+    for nombre, funcion, kwargs in _casos(consultas):
+        resultados = {}
+        for motor in ("sqlite", "duckdb"):
+            consultas.MOTOR_ANALITICO = motor
+            resultados[motor] = funcion(**kwargs)
+        iguales, detalle = _iguales(resultados["sqlite"], resultados["duckdb"])
+        print(f"{'✅' if iguales else '❌'} {nombre}({', '.join(f'{k}={v!r}' for k, v in kwargs.items())}) {detalle}")
+        if not iguales:
+            diferencias.append((nombre, kwargs, detalle))
+    return diferencias
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Motor analítico DuckDB: verificación y exportación a Parquet.")
+    parser.add_argument("accion", choices=["verificar", "parquet"])
+    parser.add_argument("--db", default=DB, help=f"Base de datos (por defecto: {DB})")
+    parser.add_argument("--salida", default="parquet", help="Carpeta para los Parquet (por defecto: parquet)")
+    args = parser.parse_args()
+
+    if duckdb is None:
+        sys.exit("❌ DuckDB no está instalado (pip install duckdb).")
+    if args.accion == "parquet":
+        exportar_parquet(args.salida, args.db)
+        print(f"✅ Tablas exportadas a {args.salida}/")
+    else:
+        diferencias = verificar(args.db)
+        if diferencias:
+            sys.exit(f"❌ {len(diferencias)} consultas con resultados distintos.")
+        print("✅ SQLite y DuckDB devuelven lo mismo en todas las consultas.")
@@ -0,0 +1,191 @@
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from bisect import bisect_right
+from collections import Counter
+
+from base_datos import DIR_CACHE
+
+# =====================================
+# PERFILADO POR MUESTREO DE CORRIDAS COMPLETAS
+# =====================================
+# LDDS_PERFIL=0.1 perfila el 10 % de las corridas; ?perfil=1 en la URL perfila esa corrida.
+FRACCION = float(os.environ.get("LDDS_PERFIL", "0") or 0)
+INTERVALO = float(os.environ.get("LDDS_PERFIL_INTERVALO_MS", "5")) / 1000
+DIR_PERFILES = os.environ.get("LDDS_PERFIL_DIR", os.path.join(DIR_CACHE, "perfiles"))
+DURACION_MAXIMA = 300  # segundos: tope de seguridad para una corrida que nunca termina
+
+_BLOQUE = re.compile(r"^with (tab\d+)\b")
+
+
+def _secciones(archivo):
+    """(líneas de inicio, nombres) de los bloques `with tabN` del script, para ubicar cada muestra."""
+    inicios, nombres = [0], ["(fuera de las pestañas)"]
+    with open(archivo, encoding="utf-8") as f:
+        for numero, linea in enumerate(f, start=1):
+            coincidencia = _BLOQUE.match(linea)
+            if coincidencia:
+                inicios.append(numero)
+                nombres.append(coincidencia.group(1))
+    return inicios, nombres
+
+
+def _nombre(codigo):
+    return f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})"
+
+
+class Muestreo:
+    """Toma la pila del hilo de la corrida cada `intervalo` segundos desde un hilo aparte (sin
+    instrumentar nada: el costo es una lectura de `sys._current_frames` por muestra). La línea
+    en la que está el script a nivel de módulo indica en qué pestaña cae cada muestra.
+
+    El muestreo se corta solo en cuanto el marco de módulo de la corrida sale de la pila, así
+    termine bien o por una excepción (st.stop, st.rerun, un rerun por un widget): funciona como
+    un `finally` sin envolver el script entero. Un perfil así cortado se descarta."""
+
+    def __init__(self, archivo, hilo=None, intervalo=INTERVALO):
+        self.archivo = os.path.abspath(archivo)
+        self.hilo = hilo or threading.get_ident()
+        self.intervalo = intervalo
+        self.pilas = Counter()  # (línea del módulo, pila de afuera hacia adentro) → muestras
+        self._fin = threading.Event()
+        self._marco = self._marco_modulo(sys._current_frames().get(self.hilo))
+        self.interrumpido = False
+        self._inicio = time.perf_counter()
+        self.duracion = 0.0
+        self._muestreador = threading.Thread(target=self._muestrear, name="perfilador", daemon=True)
+        self._muestreador.start()
+
+    def _marco_modulo(self, marco):
+        """Marco de módulo del script en la pila que arranca en `marco` (None si no está)."""
+        while marco is not None:
+            codigo = marco.f_code
+            if codigo.co_name == "<module>" and os.path.abspath(codigo.co_filename) == self.archivo:
+                return marco
+            marco = marco.f_back
+        return None
+
+    def _muestrear(self):
+        limite = time.perf_counter() + DURACION_MAXIMA
+        while not self._fin.wait(self.intervalo):
+            marco = sys._current_frames().get(self.hilo)
+            pila = []
+            while marco is not None and marco is not self._marco:
+                pila.append(_nombre(marco.f_code))
+                marco = marco.f_back
+            if marco is None or time.perf_counter() > limite:
+                # La corrida terminó sin llegar a `detener` (o excedió el tope): se descarta
+                self.interrumpido = True
+                self.pilas.clear()
+                self._marco = None
+                return
+            self.pilas[(marco.f_lineno, tuple(reversed(pila)))] += 1
+
+    def detener(self, etiquetas=None):
+        """Corta el muestreo y devuelve el perfil agrupado por pestaña."""
+        self._fin.set()
+        self._muestreador.join()
+        self._marco = None
+        self.duracion = time.perf_counter() - self._inicio
+        inicios, nombres = _secciones(self.archivo)
+        etiquetas = etiquetas or {}
+        por_seccion = Counter()
+        for (linea, pila), n in self.pilas.items():
+            seccion = nombres[bisect_right(inicios, linea) - 1]
+            por_seccion[(etiquetas.get(seccion, seccion),) + pila] += n
+        return Perfil(por_seccion, self.duracion)
+
+
+class Perfil:
+    """Pilas (sección, marco1, ..., marcoN) → muestras de una corrida."""
+
+    def __init__(self, pilas, duracion):
+        self.pilas = pilas
+        self.duracion = duracion
+        self.muestras = sum(pilas.values())
+        self.ms_por_muestra = 1000 * duracion / self.muestras if self.muestras else 0.0
+
+    def por_seccion(self):
+        """[(sección, ms)] de mayor a menor."""
+        tiempos = Counter()
+        for pila, n in self.pilas.items():
+            tiempos[pila[0]] += n * self.ms_por_muestra
+        return tiempos.most_common()
+
+    def funciones(self, limite=20):
+        """[(función, ms propios, ms totales)] por tiempo propio (la función en el tope de la pila)."""
+        propio, total = Counter(), Counter()
+        for pila, n in self.pilas.items():
+            ms = n * self.ms_por_muestra
+            if len(pila) > 1:
+                propio[pila[-1]] += ms
+            for marco in set(pila[1:]):
+                total[marco] += ms
+        return [(f, ms, total[f]) for f, ms in propio.most_common(limite)]
+
+    # ---------- exportación ----------
+    def plegado(self):
+        """Formato de pilas plegadas (flamegraph.pl, speedscope, inferno): 'a;b;c muestras'."""
+        return "".join(f"{';'.join(pila)} {n}\n" for pila, n in sorted(self.pilas.items()))
+
+    def speedscope(self, nombre="corrida"):
+        """Perfil en formato speedscope: uno por sección, con pesos en milisegundos."""
+        marcos, indice = [], {}
+        perfiles = {}
+        for pila, n in self.pilas.items():
+            ids = []
+            for marco in pila[1:]:
+                if marco not in indice:
+                    indice[marco] = len(marcos)
+                    marcos.append({"name": marco})
+                ids.append(indice[marco])
+            perfil = perfiles.setdefault(pila[0], {"samples": [], "weights": []})
+            perfil["samples"].append(ids)
+            perfil["weights"].append(round(n * self.ms_por_muestra, 3))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": nombre,
+            "exporter": "LDDS perfilador",
+            "shared": {"frames": marcos},
+            "profiles": [
+                {"type": "sampled", "name": seccion, "unit": "milliseconds",
+                 "startValue": 0, "endValue": round(sum(p["weights"]), 3), **p}
+                for seccion, p in perfiles.items()
+            ],
+        }
+
+    def resumen(self):
+        lineas = [f"Corrida de {self.duracion * 1000:.0f} ms ({self.muestras} muestras)", "", "Por pestaña:"]
+        lineas += [f"  {ms:9.1f} ms  {seccion}" for seccion, ms in self.por_seccion()]
+        lineas += ["", "Funciones con más tiempo propio:", f"  {'propio':>9}  {'total':>9}"]
+        lineas += [f"  {propio:9.1f}  {total:9.1f}  {f}" for f, propio, total in self.funciones()]
+        return "\n".join(lineas) + "\n"
+
+    def guardar(self, carpeta=DIR_PERFILES):
+        """Escribe <marca>.folded, <marca>.speedscope.json y <marca>.txt, y suma las pilas a
+        acumulado.folded (todas las corridas perfiladas). Devuelve la ruta base."""
+        os.makedirs(carpeta, exist_ok=True)
+        ahora = time.time()
+        marca = time.strftime("%Y%m%d-%H%M%S", time.localtime(ahora)) + f".{int(ahora * 1000) % 1000:03d}-{os.getpid()}"
+        base = os.path.join(carpeta, marca)
+        plegado = self.plegado()
+        with open(base + ".folded", "w", encoding="utf-8") as f:
+            f.write(plegado)
+        with open(base + ".speedscope.json", "w", encoding="utf-8") as f:
+            json.dump(self.speedscope(marca), f, ensure_ascii=False)
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(self.resumen())
+        with open(os.path.join(carpeta, "acumulado.folded"), "a", encoding="utf-8") as f:
+            f.write(plegado)
+        return base
+
+
+def iniciar(archivo, forzar=False):
+    """Empieza a muestrear la corrida actual si le toca (fracción LDDS_PERFIL) o si se pidió."""
+    if forzar or (FRACCION > 0 and random.random() < FRACCION):
+        return Muestreo(archivo)
+    return None
@@ -0,0 +1,144 @@
+import json
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from base_datos import DIR_CACHE, archivo_por_base
+
+# =====================================
+# PRECALENTADO DE CACHÉ EN SEGUNDO PLANO
+# =====================================
+GUARDAR_CADA = 50
+MAX_PRECALENTADAS = 50   # vistas que se precalientan por cada versión de los datos
+MAX_ACCESOS = 500        # claves de acceso que se conservan (las menos pedidas se descartan)
+TOPE_CUENTA = 1000       # al superarlo, todas las cuentas se dividen por 2 (envejecimiento)
+
+
+def ruta_accesos(db):
+    return archivo_por_base("accesos", db, ".json")
+
+
+def _tuplas(valor):
+    """Listas anidadas (como vuelven de JSON) a tuplas, para que las claves coincidan con las de la caché."""
+    if isinstance(valor, list):
+        return tuple(_tuplas(v) for v in valor)
+    return valor
+
+
+class Precalentador:
+    """Precalcula las vistas más pedidas cada vez que cambia la versión de los datos.
+    Las tareas se ejecutan en un pool acotado de hilos, en orden de frecuencia de acceso
+    registrada (persistida en disco para sobrevivir reinicios), sin bloquear la interfaz.
+    Solo se precalientan las `MAX_PRECALENTADAS` más pedidas; las cuentas envejecen y se
+    recortan a `MAX_ACCESOS` claves para que el conjunto no crezca sin límite."""
+
+    def __init__(self, calcular, max_hilos=2, archivo_accesos=None):
+        self._calcular = calcular
+        self._max_hilos = max_hilos
+        self._archivo = archivo_accesos or os.path.join(DIR_CACHE, "accesos.json")
+        self._lock = threading.Lock()
+        self._accesos = Counter()
+        self._sin_guardar = 0
+        self._version = None
+        self._total = 0
+        self._hechos = 0
+        self._errores = 0
+        self._activo = False
+        self._cargar_accesos()
+
+    # ---------- frecuencia de acceso ----------
+    def _cargar_accesos(self):
+        try:
+            with open(self._archivo, encoding="utf-8") as f:
+                self._accesos.update({clave: int(n) for clave, n in json.load(f).items()})
+        except (OSError, ValueError):
+            pass
+        self._recortar()
+
+    def _recortar(self):
+        """Envejece y acota las cuentas (con el lock tomado)."""
+        if self._accesos and max(self._accesos.values()) > TOPE_CUENTA:
+            self._accesos = Counter({clave: n // 2 for clave, n in self._accesos.items() if n > 1})
+        if len(self._accesos) > MAX_ACCESOS:
+            self._accesos = Counter(dict(self._accesos.most_common(MAX_ACCESOS)))
+
+    def _guardar_accesos(self):
+        try:
+            os.makedirs(os.path.dirname(self._archivo) or ".", exist_ok=True)
+            with self._lock:
+                self._recortar()
+                accesos = dict(self._accesos)
+            temporal = f"{self._archivo}.{os.getpid()}.tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(accesos, f, ensure_ascii=False)
+            os.replace(temporal, self._archivo)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _clave(nombre, args):
+        return json.dumps([nombre, list(args)], ensure_ascii=False)
+
+    def registrar(self, nombre, args=()):
+        """Registra un acceso a la vista `nombre` con argumentos `args`."""
+        with self._lock:
+            self._accesos[self._clave(nombre, args)] += 1
+            self._sin_guardar += 1
+            guardar = self._sin_guardar >= GUARDAR_CADA
+            if guardar:
+                self._sin_guardar = 0
+        if guardar:
+            self._guardar_accesos()
+
+    # ---------- precalentado ----------
+    def asegurar(self, version, candidatas):
+        """Si la versión de los datos cambió, lanza el precalentado de las `MAX_PRECALENTADAS`
+        vistas más pedidas y vuelve inmediatamente. `candidatas` (lista de (nombre, args) en
+        orden de prioridad por defecto) completa la lista mientras haya pocos accesos registrados."""
+        with self._lock:
+            if version == self._version:
+                return
+            self._version = version
+            self._recortar()
+            tareas, vistas = [], set()
+            for clave, _ in self._accesos.most_common(MAX_PRECALENTADAS):
+                nombre, args = json.loads(clave)
+                tareas.append((nombre, _tuplas(args)))
+                vistas.add(clave)
+            for nombre, args in candidatas:
+                if len(tareas) >= MAX_PRECALENTADAS:
+                    break
+                if self._clave(nombre, args) not in vistas:
+                    tareas.append((nombre, tuple(args)))
+                    vistas.add(self._clave(nombre, args))
+            self._total = len(tareas)
+            self._hechos = 0
+            self._errores = 0
+            self._activo = True
+        threading.Thread(target=self._ejecutar, args=(version, tareas), daemon=True).start()
+
+    def _ejecutar(self, version, tareas):
+        def tarea(nombre, args):
+            if self._version != version:
+                return  # llegó una versión más nueva: se descarta lo pendiente
+            try:
+                self._calcular(nombre, tuple(args))
+            except Exception:
+                with self._lock:
+                    self._errores += 1
+            with self._lock:
+                self._hechos += 1
+
+        with ThreadPoolExecutor(max_workers=self._max_hilos, thread_name_prefix="precalentador") as pool:
+            for nombre, args in tareas:
+                pool.submit(tarea, nombre, args)
+        with self._lock:
+            if self._version == version:
+                self._activo = False
+        self._guardar_accesos()
+
+    def estado(self):
+        """(activo, hechas, total, errores) del último precalentado."""
+        with self._lock:
+            return self._activo, self._hechos, self._total, self._errores
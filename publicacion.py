@@ -0,0 +1,141 @@
+"""Publicación de la base por instantáneas: las cargas nunca escriben sobre la base que lee la app.
+
+Uso:
+    python publicacion.py preparar [--db football_nueva.db]    # copia de trabajo (staging)
+    python publicacion.py publicar [--db football_nueva.db]    # índices, resúmenes y reemplazo
+
+Un cargador escribe en la copia de staging (o usa `with carga() as conn:`), y al publicar la
+copia se indexa, se analiza, se compacta con `VACUUM INTO` junto a la base y se reemplaza la
+base con `os.replace`, que es atómico. Las conexiones abiertas siguen leyendo la instantánea
+anterior hasta cerrarse; las nuevas abren la publicada. Nadie lee una base a medio cargar.
+"""
+import argparse
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from base_datos import DB, archivo_por_base
+from carreras import AlmacenCarreras, ruta_almacen
+
+# =====================================
+# ÍNDICES DE LA INSTANTÁNEA PUBLICADA
+# =====================================
+INDICES = {
+    "idx_goles_partido": "goles (partido_id)",
+    "idx_goles_jugador": "goles (jugador)",
+    "idx_tarjetas_partido": "tarjetas (partido_id)",
+    "idx_tarjetas_jugador": "tarjetas (jugador)",
+    "idx_partidos_local": "partidos (equipo_local)",
+    "idx_partidos_visitante": "partidos (equipo_visitante)",
+    "idx_partidos_arbitro": "partidos (arbitro)",
+}
+
+
+def ruta_staging(db=DB):
+    return archivo_por_base("staging", db, ".db")
+
+
+def _ruta_origen(staging):
+    """Archivo al lado de la copia de staging con la ruta absoluta de la base de la que salió."""
+    return staging + ".origen"
+
+
+def preparar_staging(db=DB, staging=None):
+    """Copia la base publicada a la de staging (con la API de backup: lectura consistente)."""
+    staging = staging or ruta_staging(db)
+    os.makedirs(os.path.dirname(staging) or ".", exist_ok=True)
+    origen = sqlite3.connect(db)
+    destino = sqlite3.connect(staging)
+    try:
+        origen.backup(destino)
+    finally:
+        destino.close()
+        origen.close()
+    with open(_ruta_origen(staging), "w", encoding="utf-8") as f:
+        f.write(os.path.abspath(db))
+    return staging
+
+
+def _indexar(conn):
+    for nombre, columnas in INDICES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {nombre} ON {columnas}")
+    conn.execute("ANALYZE")
+    conn.commit()
+    problema = conn.execute("PRAGMA quick_check").fetchone()[0]
+    if problema != "ok":
+        raise sqlite3.DatabaseError(f"La base de staging no pasó el control de integridad: {problema}")
+
+
+def publicar(db=DB, staging=None):
+    """Indexa la base de staging, la compacta junto a `db` y la pone en su lugar atómicamente.
+    Antes del reemplazo se pone al día la tabla de carreras con los datos nuevos, así el perfil
+    de jugador ya está agregado cuando la app ve la instantánea. Devuelve la duración en segundos."""
+    inicio = time.perf_counter()
+    staging = staging or ruta_staging(db)
+    if not os.path.exists(staging):
+        raise FileNotFoundError(f"No existe la base de staging {staging} (python publicacion.py preparar)")
+    try:
+        with open(_ruta_origen(staging), encoding="utf-8") as f:
+            origen = f.read().strip()
+    except OSError:
+        origen = None  # copia armada a mano: se confía en quien la indicó
+    if origen is not None and origen != os.path.abspath(db):
+        raise ValueError(f"La base de staging {staging} se preparó desde {origen}, no desde {os.path.abspath(db)}.")
+    for sufijo in ("-journal", "-wal"):
+        if os.path.exists(db + sufijo):
+            raise RuntimeError(f"{db}{sufijo} existe: hay escrituras sin terminar sobre la base publicada.")
+
+    conn = sqlite3.connect(staging, timeout=30)
+    try:
+        _indexar(conn)
+        nueva = f"{db}.{os.getpid()}.publicando"
+        if os.path.exists(nueva):
+            os.remove(nueva)
+        conn.execute("VACUUM INTO ?", (nueva,))
+    finally:
+        conn.close()
+
+    try:
+        instantanea = sqlite3.connect(nueva)
+        instantanea.execute("PRAGMA journal_mode=DELETE")
+        instantanea.close()
+        AlmacenCarreras(nueva, ruta=ruta_almacen(db)).actualizar()
+        with open(nueva, "rb+") as archivo:
+            os.fsync(archivo.fileno())
+        os.replace(nueva, db)
+    except BaseException:
+        if os.path.exists(nueva):
+            os.remove(nueva)
+        raise
+    return time.perf_counter() - inicio
+
+
+@contextmanager
+def carga(db=DB):
+    """Conexión a una copia nueva de staging; al salir sin error se confirma y se publica."""
+    staging = preparar_staging(db)
+    conn = sqlite3.connect(staging, timeout=30)
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    publicar(db, staging)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Publicación de la base por instantáneas.")
+    parser.add_argument("accion", choices=["preparar", "publicar"])
+    parser.add_argument("--db", default=DB, help=f"Base publicada (por defecto: {DB})")
+    parser.add_argument("--staging", default=None, help="Base de staging (por defecto: .cache/staging_<base>_<hash>.db)")
+    args = parser.parse_args()
+
+    if args.accion == "preparar":
+        print(f"✅ Copia de staging en {preparar_staging(args.db, args.staging)}")
+    else:
+        segundos = publicar(args.db, args.staging)
+        print(f"✅ {args.db} publicada en {segundos:.2f} s")
@@ -0,0 +1,188 @@
+import threading
+import pandas as pd
+
+from base_datos import DB, version_db, leer_partidos, huella_partidos, partidos_por_equipo
+
+# =====================================
+# MOTOR DE RACHAS Y RÉCORDS POR EQUIPO
+# =====================================
+COLUMNAS_ESTADO = [
+    "PJ",
+    "invicto_actual", "invicto_actual_desde",
+    "invicto_max", "invicto_max_desde", "invicto_max_hasta",
+    "sin_ganar_actual", "sin_ganar_actual_desde",
+    "sin_ganar_max", "sin_ganar_max_desde", "sin_ganar_max_hasta",
+    "goleada_dif", "goleada",
+    "mas_goles_total", "mas_goles",
+    "ultimo_orden",
+]
+
+
+def _estado_vacio():
+    return pd.DataFrame(columns=COLUMNAS_ESTADO).rename_axis("equipo")
+
+
+def _describir_partido(filas):
+    """Texto corto de un partido desde el punto de vista del equipo: '5-0 vs Rival (dd/mm/yyyy)'."""
+    return (filas["gf"].astype(str) + "-" + filas["gc"].astype(str)
+            + " vs " + filas["rival"] + " (" + filas["fecha"] + ")")
+
+
+def _rachas(largo, cond, previo_largo, previo_desde):
+    """Largo de la racha vigente en cada fila (vectorizado para todos los equipos a la vez).
+    `cond` indica si el partido continúa la racha; las rachas en curso del estado previo
+    se continúan en las primeras filas de cada equipo."""
+    equipo = largo["equipo"]
+    cond = pd.Series(cond, index=largo.index)
+    corte = ~cond
+    nuevo_equipo = equipo.ne(equipo.shift())
+    grupo = (corte | nuevo_equipo).cumsum()
+
+    cuenta = cond.astype("int64").groupby(grupo).cumsum()
+    desde = largo["fecha"].where(cond).groupby(grupo).transform("first")
+
+    # Filas anteriores al primer corte del equipo: continúan la racha del estado previo
+    sin_corte = corte.astype("int64").groupby(equipo).cumsum().eq(0)
+    arrastre = equipo.map(previo_largo).fillna(0).astype("int64")
+    arrastre_desde = equipo.map(previo_desde)
+    continua = sin_corte & arrastre.gt(0)
+    cuenta = cuenta + arrastre.where(sin_corte, 0)
+    desde = desde.where(~continua, arrastre_desde)
+    return cuenta, desde
+
+
+def _mejor_racha(largo, cuenta, desde, previo_max):
+    """Racha máxima por equipo dentro del tramo nuevo, conservando la previa ante empates."""
+    idx = cuenta.groupby(largo["equipo"]).idxmax()
+    mejor = pd.DataFrame({
+        "max": cuenta.loc[idx].values,
+        "desde": desde.loc[idx].values,
+        "hasta": largo["fecha"].loc[idx].values,
+    }, index=idx.index)
+    supera = mejor["max"] > previo_max.reindex(mejor.index).fillna(-1)
+    return mejor, supera
+
+
+def _extender(estado, tramo):
+    """Aplica un tramo de partidos (posteriores a los ya procesados) al estado por equipo."""
+    largo = partidos_por_equipo(tramo)
+    if largo.empty:
+        return estado
+
+    equipos = pd.Index(largo["equipo"].unique())
+    nuevo = estado.reindex(estado.index.union(equipos))
+    nuevo["PJ"] = nuevo["PJ"].fillna(0).astype("int64")
+
+    dif = (largo["gf"] - largo["gc"]).to_numpy()
+    por_equipo = largo.groupby("equipo")
+    nuevo.loc[equipos, "PJ"] += por_equipo.size().reindex(equipos).values
+    nuevo.loc[equipos, "ultimo_orden"] = por_equipo["orden"].max().reindex(equipos).values
+
+    for prefijo, cond in (("invicto", dif >= 0), ("sin_ganar", dif <= 0)):
+        cuenta, desde = _rachas(
+            largo, cond,
+            estado.get(f"{prefijo}_actual", pd.Series(dtype="int64")),
+            estado.get(f"{prefijo}_actual_desde", pd.Series(dtype=object)),
+        )
+        ultimos = largo.groupby("equipo").tail(1).index
+        nuevo.loc[largo.loc[ultimos, "equipo"].values, f"{prefijo}_actual"] = cuenta.loc[ultimos].values
+        nuevo.loc[largo.loc[ultimos, "equipo"].values, f"{prefijo}_actual_desde"] = desde.loc[ultimos].values
+
+        mejor, supera = _mejor_racha(largo, cuenta, desde, nuevo[f"{prefijo}_max"])
+        mejor = mejor[supera]
+        nuevo.loc[mejor.index, f"{prefijo}_max"] = mejor["max"].values
+        nuevo.loc[mejor.index, f"{prefijo}_max_desde"] = mejor["desde"].values
+        nuevo.loc[mejor.index, f"{prefijo}_max_hasta"] = mejor["hasta"].values
+
+    # Mayor goleada (solo victorias) y partido con más goles
+    largo["dif"] = dif
+    largo["total"] = largo["gf"] + largo["gc"]
+    for col_valor, col_estado, col_texto, filtro in (
+        ("dif", "goleada_dif", "goleada", largo["dif"] > 0),
+        ("total", "mas_goles_total", "mas_goles", None),
+    ):
+        candidatos = largo if filtro is None else largo[filtro]
+        if candidatos.empty:
+            continue
+        idx = candidatos.groupby("equipo")[col_valor].idxmax()
+        filas = largo.loc[idx.values]
+        previo = nuevo.loc[filas["equipo"].values, col_estado].fillna(-1).to_numpy()
+        supera = filas[col_valor].to_numpy() > previo
+        filas = filas[supera]
+        nuevo.loc[filas["equipo"].values, col_estado] = filas[col_valor].values
+        nuevo.loc[filas["equipo"].values, col_texto] = _describir_partido(filas).values
+
+    for col in ("invicto_actual", "invicto_max", "sin_ganar_actual", "sin_ganar_max",
+                "goleada_dif", "mas_goles_total", "ultimo_orden"):
+        nuevo[col] = nuevo[col].fillna(0).astype("int64")
+    return nuevo.rename_axis("equipo")
+
+
+class MotorRecords:
+    """Mantiene las rachas y récords de todos los equipos, cacheados por versión de la base.
+    Cuando llegan partidos nuevos (ids mayores y fechas posteriores) solo procesa ese tramo;
+    ante ediciones o partidos cargados fuera de orden recalcula todo."""
+
+    def __init__(self, db=DB):
+        self.db = db
+        self._lock = threading.Lock()
+        self._version = None
+        self._ultimo_id = 0
+        self._huella = None
+        self._estado = _estado_vacio()
+
+    def _reconstruir(self):
+        self._ultimo_id = 0
+        self._estado = _estado_vacio()
+
+    def actualizar(self):
+        """Sincroniza el estado con la base. Devuelve True si hubo cambios."""
+        version = version_db(self.db)
+        if version == self._version:
+            return False
+        with self._lock:
+            if version == self._version:
+                return False
+            if self._ultimo_id and huella_partidos(self.db, self._ultimo_id) != self._huella:
+                self._reconstruir()
+
+            tramo = leer_partidos(self.db, self._ultimo_id)
+            if not tramo.empty and not self._estado.empty:
+                # Si algún partido nuevo es anterior al último procesado del equipo, no se puede extender
+                previo = self._estado["ultimo_orden"]
+                min_local = tramo.groupby("equipo_local")["orden"].min()
+                min_visit = tramo.groupby("equipo_visitante")["orden"].min()
+                minimos = pd.concat([min_local, min_visit]).groupby(level=0).min()
+                if (minimos < previo.reindex(minimos.index).fillna(0)).any():
+                    self._reconstruir()
+                    tramo = leer_partidos(self.db, 0)
+
+            if not tramo.empty:
+                self._estado = _extender(self._estado, tramo)
+                self._ultimo_id = int(max(self._ultimo_id, tramo["id"].max()))
+            self._huella = huella_partidos(self.db, self._ultimo_id)
+            self._version = version
+            return True
+
+    def tabla(self):
+        """Récords por equipo, listos para mostrar."""
+        self.actualizar()
+        estado = self._estado
+        if estado.empty:
+            return pd.DataFrame()
+        return pd.DataFrame({
+            "Equipo": estado.index,
+            "PJ": estado["PJ"].values,
+            "Invicto Máx": estado["invicto_max"].values,
+            "Invicto Desde": estado["invicto_max_desde"].values,
+            "Invicto Hasta": estado["invicto_max_hasta"].values,
+            "Sin Ganar Máx": estado["sin_ganar_max"].values,
+            "Sin Ganar Desde": estado["sin_ganar_max_desde"].values,
+            "Sin Ganar Hasta": estado["sin_ganar_max_hasta"].values,
+            "Invicto Actual": estado["invicto_actual"].values,
+            "Sin Ganar Actual": estado["sin_ganar_actual"].values,
+            "Mayor Goleada": estado["goleada"].fillna("-").values,
+            "Partido con más Goles": estado["mas_goles"].fillna("-").values,
+            "_goleada_dif": estado["goleada_dif"].values,
+            "_mas_goles_total": estado["mas_goles_total"].values,
+        }).sort_values("Invicto Máx", ascending=False, kind="stable").reset_index(drop=True)
@@ -0,0 +1,207 @@
+import os
+import threading
+from collections import OrderedDict
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations
+import sqlite3
+import numpy as np
+import pandas as pd
+
+from base_datos import DB, version_db, calcular_puntos, grupo_instancia
+
+# =====================================
+# PROYECCIÓN DE CAMPEONATOS (MONTE CARLO)
+# =====================================
+TAMANIO_LOTE = 10000
+ENCOGIMIENTO = 3.0  # partidos "ficticios" con promedio de liga para suavizar ataque/defensa
+PROYECCIONES_EN_MEMORIA = 32  # cada versión de la base y cada combinación de parámetros es una entrada
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def datos_campeonato(anio, campeonato, db=DB):
+    """Partidos jugados de la fase regular de un campeonato, zona de cada equipo
+    y fixture restante inferido (cruces de cada zona que aún no se jugaron todas las ruedas)."""
+    conn = sqlite3.connect(db)
+    df = pd.read_sql_query("""
+        SELECT
+            p.id,
+            p.instancia,
+            p.equipo_local,
+            p.equipo_visitante,
+            p.goles_local,
+            p.goles_visitante
+        FROM partidos p
+        WHERE SUBSTR(p.fecha, 7, 4) = ? AND p.campeonato = ?
+          AND p.equipo_local IS NOT NULL AND p.equipo_local <> ''
+          AND p.equipo_visitante IS NOT NULL AND p.equipo_visitante <> ''
+    """, conn, params=(str(anio), campeonato))
+    conn.close()
+
+    df["grupo"] = df["instancia"].map(grupo_instancia)
+    jugados = df[df["grupo"].notna()].reset_index(drop=True)
+
+    # Zona de cada equipo: la de sus partidos de zona (los interzonales no la definen)
+    de_zona = jugados[jugados["grupo"] != "General"]
+    zonas = pd.concat([
+        de_zona[["equipo_local", "grupo"]].rename(columns={"equipo_local": "equipo"}),
+        de_zona[["equipo_visitante", "grupo"]].rename(columns={"equipo_visitante": "equipo"}),
+    ]).groupby("equipo")["grupo"].agg(lambda s: s.mode().iloc[0])
+    equipos = pd.unique(jugados[["equipo_local", "equipo_visitante"]].values.ravel())
+    zona_equipo = {e: zonas.get(e, "General") for e in equipos}
+
+    # Fixture restante: dentro de cada zona, todos contra todos tantas ruedas como el máximo ya observado
+    restantes = []
+    intra = jugados[jugados["equipo_local"].map(zona_equipo) == jugados["equipo_visitante"].map(zona_equipo)]
+    cruces = intra.apply(lambda r: frozenset((r["equipo_local"], r["equipo_visitante"])), axis=1).value_counts() \
+        if not intra.empty else pd.Series(dtype="int64")
+    ruedas = int(cruces.max()) if not cruces.empty else 1
+    for zona in sorted(set(zona_equipo.values())):
+        miembros = sorted(e for e, z in zona_equipo.items() if z == zona)
+        for a, b in combinations(miembros, 2):
+            faltan = ruedas - int(cruces.get(frozenset((a, b)), 0))
+            for rueda in range(faltan):
+                restantes.append((a, b) if rueda % 2 == 0 else (b, a))
+    fixture = pd.DataFrame(restantes, columns=["equipo_local", "equipo_visitante"])
+    return jugados, zona_equipo, fixture
+
+
+def posiciones_actuales(jugados, zona_equipo, anio):
+    """Tabla actual con la misma regla de puntos de `calcular_puntos` (2 o 3 por victoria)."""
+    tabla = {e: {"Zona": z, "PJ": 0, "Puntos": 0, "GF": 0, "GC": 0} for e, z in zona_equipo.items()}
+    for local, visitante, gl, gv in jugados[["equipo_local", "equipo_visitante", "goles_local", "goles_visitante"]].itertuples(index=False):
+        for equipo, gf, gc in ((local, gl, gv), (visitante, gv, gl)):
+            tabla[equipo]["PJ"] += 1
+            tabla[equipo]["Puntos"] += calcular_puntos(gl, gv, local, visitante, equipo, anio)[0]
+            tabla[equipo]["GF"] += gf
+            tabla[equipo]["GC"] += gc
+    df = pd.DataFrame.from_dict(tabla, orient="index").rename_axis("Equipo").reset_index()
+    df["DG"] = df["GF"] - df["GC"]
+    return df
+
+
+def _simular_lote(semilla, n, lam_local, lam_visitante, idx_local, idx_visitante,
+                  base_puntos, base_dg, base_gf, grupos, puntos_victoria):
+    """Simula `n` finales de campeonato y devuelve la frecuencia de cada posición (dentro de su grupo)
+    por equipo, junto con la suma de puntos finales. Se ejecuta en un proceso del pool."""
+    rng = np.random.default_rng(semilla)
+    equipos = len(base_puntos)
+    gl = rng.poisson(lam_local, size=(n, len(lam_local)))
+    gv = rng.poisson(lam_visitante, size=(n, len(lam_visitante)))
+
+    pts_l = np.where(gl > gv, puntos_victoria, np.where(gl == gv, 1, 0))
+    pts_v = np.where(gv > gl, puntos_victoria, np.where(gl == gv, 1, 0))
+
+    # Matrices de incidencia partido → equipo para acumular con productos matriciales
+    inc_l = np.zeros((len(lam_local), equipos))
+    inc_v = np.zeros((len(lam_local), equipos))
+    inc_l[np.arange(len(lam_local)), idx_local] = 1
+    inc_v[np.arange(len(lam_local)), idx_visitante] = 1
+
+    puntos = base_puntos + pts_l @ inc_l + pts_v @ inc_v
+    dg = base_dg + (gl - gv) @ inc_l + (gv - gl) @ inc_v
+    gf = base_gf + gl @ inc_l + gv @ inc_v
+
+    # Orden: puntos, diferencia de gol, goles a favor y sorteo
+    clave = puntos * 1e8 + (dg + 5000) * 1e4 + gf + rng.random((n, equipos))
+    frecuencias = np.zeros((equipos, equipos), dtype=np.int64)
+    for grupo in np.unique(grupos):
+        miembros = np.flatnonzero(grupos == grupo)
+        ranking = np.argsort(-clave[:, miembros], axis=1)
+        posiciones = np.empty_like(ranking)
+        np.put_along_axis(posiciones, ranking, np.arange(len(miembros)), axis=1)
+        for j, equipo in enumerate(miembros):
+            frecuencias[equipo, :len(miembros)] += np.bincount(posiciones[:, j], minlength=len(miembros))
+    return frecuencias, puntos.sum(axis=0)
+
+
+def _obtener_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def proyectar_campeonato(anio, campeonato, simulaciones=100000, semilla=0,
+                         clasifican=4, descienden=1, db=DB, progreso=None):
+    """Probabilidades de terminar primero, clasificar y quedar en zona de descenso de cada equipo.
+    Resultados cacheados por (campeonato, versión de la base, parámetros). Con la misma semilla
+    el resultado es idéntico sin importar la cantidad de procesos."""
+    clave = (db, str(anio), campeonato, version_db(db), simulaciones, semilla, clasifican, descienden)
+    with _cache_lock:
+        if clave in _cache:
+            _cache.move_to_end(clave)
+            if progreso:
+                progreso(1, 1)
+            return _cache[clave]
+
+    jugados, zona_equipo, fixture = datos_campeonato(anio, campeonato, db)
+    if jugados.empty:
+        return pd.DataFrame(), fixture
+    tabla = posiciones_actuales(jugados, zona_equipo, anio)
+    puntos_victoria = calcular_puntos(1, 0, "L", "V", "L", anio)[0]
+
+    # Fuerza de ataque/defensa por equipo, suavizada hacia el promedio del campeonato
+    media_local = jugados["goles_local"].mean()
+    media_visitante = jugados["goles_visitante"].mean()
+    media = (media_local + media_visitante) / 2 or 1.0
+    ataque = ((tabla["GF"] + ENCOGIMIENTO * media) / (tabla["PJ"] + ENCOGIMIENTO) / media).to_numpy()
+    defensa = ((tabla["GC"] + ENCOGIMIENTO * media) / (tabla["PJ"] + ENCOGIMIENTO) / media).to_numpy()
+    indice = {e: i for i, e in enumerate(tabla["Equipo"])}
+    idx_local = fixture["equipo_local"].map(indice).to_numpy(dtype=np.int64)
+    idx_visitante = fixture["equipo_visitante"].map(indice).to_numpy(dtype=np.int64)
+    lam_local = media_local * ataque[idx_local] * defensa[idx_visitante]
+    lam_visitante = media_visitante * ataque[idx_visitante] * defensa[idx_local]
+    grupos = pd.factorize(tabla["Zona"])[0]
+
+    lotes = [TAMANIO_LOTE] * (simulaciones // TAMANIO_LOTE)
+    if simulaciones % TAMANIO_LOTE:
+        lotes.append(simulaciones % TAMANIO_LOTE)
+    semillas = np.random.SeedSequence(semilla).spawn(len(lotes))
+    argumentos = (lam_local, lam_visitante, idx_local, idx_visitante,
+                  tabla["Puntos"].to_numpy(), tabla["DG"].to_numpy(), tabla["GF"].to_numpy(),
+                  grupos, puntos_victoria)
+
+    equipos = len(tabla)
+    frecuencias = np.zeros((equipos, equipos), dtype=np.int64)
+    suma_puntos = np.zeros(equipos)
+    pool = _obtener_pool()
+    futuros = [pool.submit(_simular_lote, s, n, *argumentos) for s, n in zip(semillas, lotes)]
+    for hechos, futuro in enumerate(as_completed(futuros), start=1):
+        f, p = futuro.result()
+        frecuencias += f
+        suma_puntos += p
+        if progreso:
+            progreso(hechos, len(futuros))
+
+    tamanio_grupo = tabla.groupby("Zona")["Equipo"].transform("size").to_numpy()
+    clasifica = np.array([frecuencias[i, :min(clasifican, tamanio_grupo[i])].sum() for i in range(equipos)])
+    desciende = np.array([
+        frecuencias[i, max(tamanio_grupo[i] - descienden, 0):tamanio_grupo[i]].sum() for i in range(equipos)
+    ])
+    resultado = pd.DataFrame({
+        "Zona": tabla["Zona"],
+        "Equipo": tabla["Equipo"],
+        "PJ": tabla["PJ"],
+        "Puntos": tabla["Puntos"],
+        "DG": tabla["DG"],
+        "Pts Esperados": suma_puntos / simulaciones,
+        "% Primero": 100 * frecuencias[:, 0] / simulaciones,
+        "% Clasifica": 100 * clasifica / simulaciones,
+        "% Descenso": 100 * desciende / simulaciones,
+    }).sort_values(["Zona", "Pts Esperados", "Puntos"], ascending=[True, False, False]).reset_index(drop=True)
+
+    with _cache_lock:
+        _cache[clave] = (resultado, fixture)
+        _cache.move_to_end(clave)
+        while len(_cache) > PROYECCIONES_EN_MEMORIA:
+            _cache.popitem(last=False)
+    return resultado, fixture
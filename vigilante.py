@@ -0,0 +1,211 @@
+import os
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+
+import pandas as pd
+
+from base_datos import DB
+
+# =====================================
+# VIGILANCIA DE CAMBIOS EN LA BASE
+# =====================================
+INTERVALO = float(os.environ.get("LDDS_INTERVALO_VIGILANCIA", "2"))
+
+
+def _firma_archivo(db):
+    """Inodo, mtime y tamaño de la base y de su WAL: si nada de esto cambió, no hace falta consultar."""
+    firma = []
+    for ruta in (db, db + "-wal"):
+        try:
+            st_archivo = os.stat(ruta)
+            firma.append((st_archivo.st_ino, st_archivo.st_mtime_ns, st_archivo.st_size))
+        except OSError:
+            firma.append(None)
+    return tuple(firma)
+
+
+def _suma_hash(df, por):
+    """Suma (módulo 2^64) del hash de cada fila agrupada por `por`: no depende del orden."""
+    if df.empty:
+        return pd.Series(dtype="uint64")
+    hashes = pd.util.hash_pandas_object(df.drop(columns=[por]), index=False)
+    return hashes.groupby(df[por].values).sum()
+
+
+def leer_huellas(conn, ids=None):
+    """Huella de cada partido (sus datos, goles y tarjetas) y sus dos equipos, indexado por id.
+    Con `ids` solo se leen esos partidos."""
+    filtro, params = "", ()
+    if ids is not None:
+        ids = list(ids)
+        filtro, params = f"IN ({','.join('?' * len(ids))})", ids
+    partidos = pd.read_sql_query(f"""
+        SELECT id, fecha, equipo_local, goles_local, equipo_visitante, goles_visitante,
+               campeonato, instancia, lugar, arbitro
+        FROM partidos {"WHERE id " + filtro if filtro else ""}
+    """, conn, params=params).set_index("id")
+    goles = pd.read_sql_query(f"""
+        SELECT partido_id, equipo, jugador FROM goles {"WHERE partido_id " + filtro if filtro else ""}
+    """, conn, params=params)
+    tarjetas = pd.read_sql_query(f"""
+        SELECT partido_id, equipo, jugador, tipo FROM tarjetas {"WHERE partido_id " + filtro if filtro else ""}
+    """, conn, params=params)
+
+    huella = pd.util.hash_pandas_object(partidos, index=True)
+    huella = huella.add(_suma_hash(goles, "partido_id").reindex(huella.index, fill_value=0), fill_value=0)
+    huella = huella.add(_suma_hash(tarjetas, "partido_id").reindex(huella.index, fill_value=0), fill_value=0)
+    return pd.DataFrame({
+        "huella": huella.astype("uint64"),
+        "equipo_local": partidos["equipo_local"],
+        "equipo_visitante": partidos["equipo_visitante"],
+    })
+
+
+class VigilanteDB:
+    """Detecta cambios en la base en segundo plano y publica tokens de versión.
+
+    El control es barato: primero mtime/tamaño del archivo (y su WAL) y `PRAGMA data_version`
+    sobre una conexión propia; solo si alguno cambió se recalcula la huella de cada partido
+    para saber qué ids se agregaron, editaron o borraron. Se lleva una versión global y una
+    por equipo, de modo que las vistas de un equipo solo se invalidan si cambió uno de sus partidos."""
+
+    def __init__(self, db=DB, intervalo=INTERVALO):
+        self.db = db
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._version = 0
+        self._por_equipo = Counter()
+        self._ultimo_cambio = None
+        self._suscriptores = []
+        self._firma = None
+        self._inodo = None
+        self._data_version = None
+        self._huellas = None
+        self._huella_global = 0
+        self._huella_por_equipo = {}
+        self._conn = None
+        self._hilo = None
+
+    # ---------- versiones ----------
+    def version(self, equipos=None):
+        """Token de versión: global si `equipos` es None; si no, el de esos equipos."""
+        with self._lock:
+            if equipos is None:
+                return self._version
+            return tuple(self._por_equipo[e] for e in equipos)
+
+    def huella(self, equipos=None):
+        """Como `version`, pero calculada del contenido (suma de las huellas de los partidos):
+        es la misma en cualquier proceso que lea los mismos datos, y sirve de clave persistente."""
+        with self._lock:
+            if equipos is None:
+                return self._huella_global
+            return tuple(self._huella_por_equipo.get(e, 0) for e in equipos)
+
+    def ultimo_cambio(self):
+        """(versión, ids de partidos, equipos afectados, momento) del último cambio detectado."""
+        with self._lock:
+            return self._ultimo_cambio
+
+    def suscribir(self, funcion):
+        """Registra `funcion(ids, equipos)`, llamada en el hilo del vigilante ante cada cambio."""
+        with self._lock:
+            self._suscriptores.append(funcion)
+
+    # ---------- detección ----------
+    def _conectar(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db, check_same_thread=False)
+        return self._conn
+
+    def _hay_novedades(self):
+        firma = _firma_archivo(self.db)
+        inodo = firma[0][0] if firma[0] else None
+        if self._conn is not None and inodo != self._inodo:
+            # Se publicó otra instantánea (publicacion.py): la conexión sigue leyendo la anterior
+            self._conn.close()
+            self._conn = None
+        self._inodo = inodo
+        try:
+            data_version = self._conectar().execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error:
+            self._conn = None
+            data_version = None
+        novedades = firma != self._firma or data_version != self._data_version
+        self._firma, self._data_version = firma, data_version
+        return novedades
+
+    def revisar(self):
+        """Un ciclo de control. Devuelve (ids, equipos) cambiados, o None si no hubo cambios."""
+        if not self._hay_novedades():
+            return None
+        try:
+            huellas = leer_huellas(self._conectar())
+        except (sqlite3.Error, pd.errors.DatabaseError):
+            self._conn = None
+            self._firma = None  # reintentar en el próximo ciclo
+            return None
+        anteriores, self._huellas = self._huellas, huellas
+        por_equipo = pd.concat([
+            huellas.groupby("equipo_local")["huella"].sum(),
+            huellas.groupby("equipo_visitante")["huella"].sum(),
+        ]).groupby(level=0).sum()
+        with self._lock:
+            self._huella_global = int(huellas["huella"].sum())
+            self._huella_por_equipo = {e: int(h) for e, h in por_equipo.items()}
+        if anteriores is None:
+            return None  # primera lectura: es la línea de base
+
+        antes = set(zip(anteriores.index, anteriores["huella"]))
+        ahora = set(zip(huellas.index, huellas["huella"]))
+        ids = sorted({int(i) for i, _ in antes ^ ahora})
+        if not ids:
+            return None
+        filas = pd.concat([
+            anteriores[anteriores.index.isin(ids)],
+            huellas[huellas.index.isin(ids)],
+        ])
+        equipos = sorted({e for e in filas[["equipo_local", "equipo_visitante"]].values.ravel()
+                          if isinstance(e, str) and e})
+
+        with self._lock:
+            self._version += 1
+            for equipo in equipos:
+                self._por_equipo[equipo] += 1
+            self._ultimo_cambio = (self._version, ids, equipos, time.time())
+            suscriptores = list(self._suscriptores)
+        for funcion in suscriptores:
+            try:
+                funcion(ids, equipos)
+            except Exception:
+                # El motor queda desactualizado hasta el próximo cambio: que al menos quede el rastro
+                nombre = getattr(funcion, "__qualname__", repr(funcion))
+                print(f"⚠️ Falló el suscriptor {nombre} del vigilante (partidos {ids}):", file=sys.stderr)
+                traceback.print_exc()
+        return ids, equipos
+
+    # ---------- hilo ----------
+    def iniciar(self):
+        """Toma la línea de base y arranca el hilo de control (una sola vez)."""
+        with self._lock:
+            if self._hilo is not None:
+                return self
+            self._hilo = threading.Thread(target=self._ciclo, name="vigilante-db", daemon=True)
+        self.revisar()
+        self._hilo.start()
+        return self
+
+    def _ciclo(self):
+        while True:
+            time.sleep(self.intervalo)
+            try:
+                self.revisar()
+            except Exception:
+                # Se reintenta con una conexión nueva en la próxima vuelta, pero sin tragarse el error
+                print(f"⚠️ Falló la revisión del vigilante de {self.db}:", file=sys.stderr)
+                traceback.print_exc()
+                self._conn = None
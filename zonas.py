@@ -0,0 +1,107 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from base_datos import DB
+
+# =====================================
+# ZONAS: AGREGADOS A PARTIR DE LOS ACUMULADOS POR EQUIPO
+# =====================================
+SIN_ZONA = "Sin zona"
+COLUMNAS_TABLA = ["PJ", "PG", "PE", "PP", "GF", "GC", "Puntos"]
+
+
+def leer_zonas(db=DB):
+    """Dimensión de zonas codificada con enteros: (nombres, {equipo: código}).
+    El código es la posición en `nombres`; los equipos sin zona cargada no están en el dict."""
+    conn = sqlite3.connect(db)
+    filas = conn.execute("""
+        SELECT equipo, zona FROM equipos_zonas
+        WHERE equipo IS NOT NULL AND zona IS NOT NULL AND TRIM(zona) <> ''
+    """).fetchall()
+    conn.close()
+    nombres = sorted({zona for _, zona in filas})
+    codigo = {zona: i for i, zona in enumerate(nombres)}
+    return tuple(nombres) + (SIN_ZONA,), {equipo: codigo[zona] for equipo, zona in filas}
+
+
+def _codigos(equipos, zonas):
+    nombres, por_equipo = zonas
+    sin_zona = len(nombres) - 1
+    return np.fromiter((por_equipo.get(e, sin_zona) for e in equipos), dtype=np.int16, count=len(equipos))
+
+
+def tabla_equipos(acumulados, zonas):
+    """Una fila por equipo con su zona: posiciones, goles a favor por jugadores y tarjetas."""
+    tabla = acumulados["tabla"]
+    equipos = sorted(set(tabla) | set(acumulados["tarjetas"]))
+    df = pd.DataFrame(
+        [[tabla.get(e, {}).get(c, 0) for c in COLUMNAS_TABLA] for e in equipos],
+        columns=COLUMNAS_TABLA, index=pd.Index(equipos, name="Equipo"), dtype="int64",
+    )
+    df["DG"] = df["GF"] - df["GC"]
+    df["Amonestaciones"] = [acumulados["tarjetas"].get(e, {}).get("Amonestado", 0) for e in equipos]
+    df["Expulsiones"] = [acumulados["tarjetas"].get(e, {}).get("Expulsado", 0) for e in equipos]
+    df["zona"] = _codigos(equipos, zonas)
+    return df
+
+
+def tabla_por_zona(acumulados, zonas):
+    """Totales por zona (sumando las filas de sus equipos) y promedios por partido."""
+    nombres = zonas[0]
+    df = tabla_equipos(acumulados, zonas)
+    por_zona = df.groupby("zona").agg(
+        Equipos=("PJ", "size"), **{c: (c, "sum") for c in COLUMNAS_TABLA + ["DG", "Amonestaciones", "Expulsiones"]}
+    )
+    pj = por_zona["PJ"].where(por_zona["PJ"] > 0)
+    por_zona["Pts/PJ"] = (por_zona["Puntos"] / pj).round(2)
+    por_zona["Goles/PJ"] = (por_zona["GF"] / pj).round(2)
+    por_zona["Tarjetas/PJ"] = ((por_zona["Amonestaciones"] + por_zona["Expulsiones"]) / pj).round(2)
+    por_zona.index = pd.Index([nombres[i] for i in por_zona.index], name="Zona")
+    return por_zona.sort_values("Pts/PJ", ascending=False).reset_index()
+
+
+def posiciones_zona(acumulados, zonas, zona):
+    """Tabla de posiciones de los equipos de una zona (mismo orden que la general)."""
+    df = tabla_equipos(acumulados, zonas)
+    df = df[df["zona"] == zonas[0].index(zona)].drop(columns="zona")
+    df = df.sort_values(["Puntos", "DG", "GF"], ascending=False, kind="stable")
+    return df[["PJ", "PG", "PE", "PP", "GF", "GC", "DG", "Puntos", "Amonestaciones", "Expulsiones"]].reset_index()
+
+
+def goleadores_zona(acumulados, zonas, zona, limite=10):
+    """Goleadores de los equipos de una zona (goles con cada club de la zona)."""
+    codigo = zonas[0].index(zona)
+    goleadores = acumulados["goleadores"]
+    equipos = [e for e, c in zip(goleadores, _codigos(list(goleadores), zonas)) if c == codigo]
+    filas = [(jugador, equipo, goles) for equipo in equipos for jugador, goles in goleadores[equipo].items()]
+    df = pd.DataFrame(filas, columns=["Jugador", "Equipo", "Goles"])
+    return df.sort_values(["Goles", "Jugador"], ascending=[False, True], kind="stable").head(limite).reset_index(drop=True)
+
+
+def cruces_por_zona(acumulados, zonas):
+    """Enfrentamientos agregados por par de zonas, desde los acumulados por cruce de equipos.
+    Una fila por (Zona A, Zona B) con A <= B: las filas con A == B son los partidos dentro de la zona."""
+    nombres = zonas[0]
+    cruces = acumulados["cruces"]
+    if not cruces:
+        return pd.DataFrame()
+    pares = list(cruces)
+    df = pd.DataFrame([[cruces[p][c] for c in ("PJ", "GA", "GB", "VA", "E", "VB")] for p in pares],
+                      columns=["PJ", "GA", "GB", "VA", "E", "VB"])
+    df["za"] = _codigos([a for a, _ in pares], zonas)
+    df["zb"] = _codigos([b for _, b in pares], zonas)
+    # Se orienta cada cruce para que la zona A sea la de menor código
+    invertir = (df["za"] > df["zb"]).to_numpy()
+    for x, y in (("za", "zb"), ("GA", "GB"), ("VA", "VB")):
+        df[x], df[y] = np.where(invertir, df[y], df[x]), np.where(invertir, df[x], df[y])
+    total = df.groupby(["za", "zb"], as_index=False)[["PJ", "VA", "E", "VB", "GA", "GB"]].sum()
+    total.insert(0, "Tipo", np.where(total["za"] == total["zb"], "Dentro de la zona", "Entre zonas"))
+    total.insert(1, "Zona A", [nombres[i] for i in total["za"]])
+    total.insert(2, "Zona B", [nombres[i] for i in total["zb"]])
+    total["% Empates"] = (100 * total["E"] / total["PJ"]).round(1)
+    total["Goles/PJ"] = ((total["GA"] + total["GB"]) / total["PJ"]).round(2)
+    return total.drop(columns=["za", "zb"]).rename(columns={
+        "VA": "Gana A", "E": "Empates", "VB": "Gana B", "GA": "Goles A", "GB": "Goles B",
+    }).sort_values(["Tipo", "Zona A", "Zona B"], kind="stable").reset_index(drop=True)